@@ -1,21 +1,171 @@
 # Library yang digunakan oleh client
 import asyncio
 import os
+import sys
 import json
 import argparse
+import gzip
+import hashlib
+import logging
+import mimetypes
 import aiohttp_jinja2
 import jinja2
 from aiohttp import web, WSMsgType
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+sys.path.append(os.path.dirname(BASE_DIR))
+
+from common.codec import CODECS, get_codec
+from common.mux import MuxPool
+from common.logs import get_logger, setup_logging, shutdown_logging, parse_sample_rates
+
+web_logger = get_logger("client.web")
+tcp_logger = get_logger("client.tcp")
+progress_logger = get_logger("client.progress")
 
 SERVER_TCP_HOST = '127.0.0.1' 
 SERVER_TCP_PORT = 50000
+SERVER_PROTOCOL = 'json'
+# 'fast': baris JSON diteruskan sebagai bytes tanpa decode/parse dan digabung per frame WebSocket; 'line': satu pesan per frame (cara lama)
+RELAY_MODE = 'fast'
+# Diisi jika --mux N: semua browser berbagi N koneksi TCP ke server
+MUX_POOL = None
+# --dev: template dan file statis dibaca ulang jika berubah di disk
+DEV_MODE = False
+
+# Log per keystroke / per tick dipilah ke client.progress (bisa di-sampling) hanya dengan melihat awalan tetap pesan
+# (json.dumps server: '{"type": ...', JSON.stringify browser: '{"type":...'); relay cepat melakukannya hanya jika log DEBUG aktif.
+RELAY_CHUNK = 65536
+RELAY_MAX_PENDING = 1 << 20
+SERVER_PROGRESS_PREFIX = b'{"type": "room_progress"'
+SERVER_PROGRESS_TEXT = SERVER_PROGRESS_PREFIX.decode()
+BROWSER_INPUT_PREFIX = '{"type":"input"'
+
+# Halaman dan file statis disimpan di memori sebagai respons siap kirim: body asli plus varian gzip (dan brotli jika
+# modul brotli terpasang) yang dikompresi sekali saat dimuat. ETag diambil dari hash isi; request dengan If-None-Match
+# yang cocok dijawab 304 tanpa body. Varian dipilih dari Accept-Encoding (br > gzip > tanpa kompresi).
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Accept-Encoding sebagai {encoding: q}. Encoding dengan q=0 ditolak; "*" berlaku untuk encoding yang tidak disebut.
+def parse_accept_encoding(header: str) -> dict:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+class CachedAsset:
+    __slots__ = ("etag", "tags", "content_type", "cache_control", "variants", "mtime")
+
+    def __init__(self, body: bytes, content_type: str, cache_control: str, mtime: float = 0.0):
+        self.etag = hashlib.sha1(body).hexdigest()[:16]
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.mtime = mtime
+        self.variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.variants["gzip"] = gzip.compress(body, 9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+        self.tags = {encoding: self.tag(encoding) for encoding in self.variants}
+
+    # Setiap varian punya ETag sendiri (akhiran encoding), tetapi semuanya menunjuk isi yang sama
+    def tag(self, encoding: str) -> str:
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+    # If-None-Match cocok jika salah satu tag (tanpa awalan lemah W/) sama persis dengan ETag salah satu varian.
+    def not_modified(self, request) -> bool:
+        header = request.headers.get("If-None-Match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        for tag in header.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in self.tags.values():
+                return True
+        return False
+
+    # Varian dengan q tertinggi di antara br dan gzip (br menang jika sama); tanpa kompresi jika keduanya ditolak.
+    def choose_encoding(self, request) -> str:
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        best, best_q = "identity", 0.0
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants:
+                q = accepted.get(encoding, accepted.get("*", 0.0))
+                if q > best_q:
+                    best, best_q = encoding, q
+        return best
+
+    def respond(self, request) -> web.Response:
+        encoding = self.choose_encoding(request)
+        headers = {"Cache-Control": self.cache_control, "Vary": "Accept-Encoding", "ETag": self.tags[encoding]}
+        if self.not_modified(request):
+            return web.Response(status=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        charset = "utf-8" if self.content_type.startswith("text/") or self.content_type.endswith(("javascript", "json")) else None
+        return web.Response(body=self.variants[encoding], content_type=self.content_type, charset=charset, headers=headers)
+
+def load_static(name: str) -> CachedAsset:
+    path = os.path.join(STATIC_DIR, name)
+    with open(path, "rb") as handle:
+        body = handle.read()
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    return CachedAsset(body, content_type, REVALIDATE if DEV_MODE else IMMUTABLE, os.path.getmtime(path))
+
+# Template tidak punya konteks per request, jadi dirender sekali; URL file statis diberi versi (?v=etag)
+# sehingga file statis boleh di-cache browser selamanya.
+def render_index(app) -> CachedAsset:
+    path = os.path.join(TEMPLATE_DIR, "index.html")
+    html = aiohttp_jinja2.get_env(app).get_template("index.html").render(assets=app["static"])
+    return CachedAsset(html.encode("utf-8"), "text/html", REVALIDATE, os.path.getmtime(path))
 
-# Fungsi yang berguna untuk merender template index.html agar dapat ditampilkan ke dalam website
+def refresh_assets(app) -> None:
+    changed = False
+    for name, asset in list(app["static"].items()):
+        if os.path.getmtime(os.path.join(STATIC_DIR, name)) != asset.mtime:
+            app["static"][name] = load_static(name)
+            changed = True
+    if changed or os.path.getmtime(os.path.join(TEMPLATE_DIR, "index.html")) != app["index"].mtime:
+        app["index"] = render_index(app)
+
+# Fungsi yang berguna untuk menyajikan index.html (sudah dirender dan dikompresi saat startup) ke browser
 async def handle_index(request):
-    return aiohttp_jinja2.render_template('index.html', request, {})
+    if DEV_MODE:
+        refresh_assets(request.app)
+    return request.app["index"].respond(request)
+
+async def handle_static(request):
+    if DEV_MODE:
+        refresh_assets(request.app)
+    asset = request.app["static"].get(request.match_info["name"])
+    if asset is None:
+        raise web.HTTPNotFound()
+    return asset.respond(request)
 
 # Fungsi yang dibuat untuk sebagai pengendali komunikasi dua arah dari client ke server, maupun sebaliknya
 # Didalamnya ada dua fungsi browser_to_tcp dan tcp_to_browser
@@ -25,20 +175,25 @@ async def tcp_bridge_handler(request):
     """
     Jembatan: WebSocket (Browser) <--> TCP Socket (Server)
     """
+    if MUX_POOL is not None:
+        return await mux_bridge_handler(request)
+
     username = request.match_info.get('username')
-    print(f"[CLIENT-WEB] Browser connected: {username}")
+    web_logger.info("Browser connected: %s", username)
 
     ws_browser = web.WebSocketResponse()
     await ws_browser.prepare(request)
 
     writer = None
     try:
-        print(f"[CLIENT-TCP] Connecting to {SERVER_TCP_HOST}:{SERVER_TCP_PORT}...")
+        tcp_logger.debug("Connecting to %s:%s...", SERVER_TCP_HOST, SERVER_TCP_PORT)
         reader, writer = await asyncio.open_connection(SERVER_TCP_HOST, SERVER_TCP_PORT)
-        print("[CLIENT-TCP] Connected.")
+        tcp_logger.debug("Connected.")
 
-        login_payload = json.dumps({"type": "login", "username": username}) 
-        print(f"[CLIENT-TCP] >> Sending Login: {login_payload}")
+        # Login selalu dikirim sebagai JSON line; field "protocol" memilih codec untuk pesan berikutnya
+        codec = get_codec(SERVER_PROTOCOL)
+        login_payload = json.dumps({"type": "login", "username": username, "protocol": codec.name}) 
+        tcp_logger.debug(">> Sending Login: %s", login_payload)
         writer.write((login_payload + "\n").encode())
         await writer.drain()
 
@@ -48,53 +203,72 @@ async def tcp_bridge_handler(request):
             async for msg in ws_browser:
                 if msg.type == WSMsgType.TEXT:
 
+                    data = None
                     try:
                         data = json.loads(msg.data)
                     except:
                         pass
                     
                     if data and data.get("type") == "client_ip":
-                        writer.write((json.dumps({
+                        writer.write(codec.encode({
                             "type": "client_ip",
                             "ip": data.get("ip")
-                            }) + "\n").encode())
+                            }))
                         await writer.drain()
                         continue
 
-                    if "progress" not in msg.data:
-                        print(f"[CLIENT-TCP] >> Sending to Server: {msg.data}")
+                    channel = progress_logger if msg.data.startswith(BROWSER_INPUT_PREFIX) else tcp_logger
+                    channel.debug(">> Sending to Server: %s", msg.data)
                     
-                    tcp_msg = msg.data + "\n"
-                    writer.write(tcp_msg.encode())
+                    if codec.name == "json":
+                        writer.write((msg.data + "\n").encode())
+                    elif data:
+                        writer.write(codec.encode(data))
                     await writer.drain()
                 elif msg.type == WSMsgType.ERROR:
-                    print(f'[CLIENT-WEB] ws_browser connection closed with exception {ws_browser.exception()}')
+                    web_logger.warning("ws_browser connection closed with exception %s", ws_browser.exception())
 
         # Fungsi yang bertujuan untuk mentranslasi data dari server ke dalam browser
         async def tcp_to_browser():
             """Membaca dari TCP Server, kirim ke Browser"""
             while True:
-                data = await reader.readline()
-                if not data:
-                    print("[CLIENT-TCP] Server closed connection.")
-                    break
-                text_data = data.decode().strip()
+                if codec.name == "json":
+                    data = await reader.readline()
+                    if not data:
+                        tcp_logger.info("Server closed connection.")
+                        break
+                    text_data = data.decode().strip()
+                else:
+                    # Frame biner diterjemahkan kembali ke JSON karena browser hanya memahami JSON
+                    try:
+                        message = await codec.read(reader)
+                    except ValueError as e:
+                        tcp_logger.warning("Frame tidak valid dari server: %s", e)
+                        continue
+                    if message is None:
+                        tcp_logger.info("Server closed connection.")
+                        break
+                    text_data = json.dumps(message)
                 if text_data:
-                    if "opponent_progress" not in text_data:
-                        print(f"[CLIENT-TCP] << Received from Server: {text_data}")
+                    channel = progress_logger if text_data.startswith(SERVER_PROGRESS_TEXT) else tcp_logger
+                    channel.debug("<< Received from Server: %s", text_data)
                         
                     await ws_browser.send_str(text_data)
 
+        if codec.name == "json" and RELAY_MODE == "fast":
+            tasks = [relay_browser_to_tcp(ws_browser, writer), relay_tcp_to_browser(reader, ws_browser)]
+        else:
+            tasks = [browser_to_tcp(), tcp_to_browser()]
+
         await asyncio.wait(
-            [asyncio.create_task(browser_to_tcp()), 
-             asyncio.create_task(tcp_to_browser())],
+            [asyncio.create_task(task) for task in tasks],
             return_when=asyncio.FIRST_COMPLETED
         )
 
     except Exception as e:
-        print(f"[CLIENT] Bridge Error: {e}")
+        web_logger.error("Bridge Error: %s", e)
     finally:
-        print(f"[CLIENT] Disconnecting session for {username}...")
+        web_logger.debug("Disconnecting session for %s...", username)
         if writer:
             writer.close()
             try:
@@ -102,21 +276,139 @@ async def tcp_bridge_handler(request):
             except:
                 pass
         await ws_browser.close()
-        print("[CLIENT] Done.")
+        web_logger.debug("Done.")
+        return ws_browser
+
+# Relay cepat browser -> server (JSON): teks WebSocket langsung ditulis sebagai satu baris tanpa json.loads.
+# client_ip tidak perlu perlakuan khusus karena di mode JSON bentuknya sudah sama dengan yang diharapkan server.
+# Hanya pesan yang berisi newline (akan memecah baris) yang di-parse dan di-encode ulang.
+async def relay_browser_to_tcp(ws_browser, writer):
+    debug = tcp_logger.isEnabledFor(logging.DEBUG)
+    async for msg in ws_browser:
+        if msg.type == WSMsgType.TEXT:
+            text = msg.data
+            if "\n" in text:
+                try:
+                    text = json.dumps(json.loads(text))
+                except ValueError:
+                    continue
+            if debug:
+                channel = progress_logger if text.startswith(BROWSER_INPUT_PREFIX) else tcp_logger
+                channel.debug(">> Sending to Server: %s", text)
+            writer.write(text.encode() + b"\n")
+            await writer.drain()
+        elif msg.type == WSMsgType.ERROR:
+            web_logger.warning("ws_browser connection closed with exception %s", ws_browser.exception())
+
+# Relay cepat server -> browser (JSON): membaca semua bytes yang sudah tersedia, lalu semua baris lengkap
+# dikirim sebagai satu frame teks WebSocket (dipisah "\n", tanpa decode ke str). Sisa baris yang belum
+# lengkap disimpan sampai read berikutnya. Browser memecah frame per baris (lihat ws.onmessage di index.html).
+async def relay_tcp_to_browser(reader, ws_browser):
+    debug = tcp_logger.isEnabledFor(logging.DEBUG)
+    pending = b""
+    while True:
+        chunk = await reader.read(RELAY_CHUNK)
+        if not chunk:
+            tcp_logger.info("Server closed connection.")
+            break
+        data = pending + chunk if pending else chunk
+        end = data.rfind(b"\n")
+        if end < 0:
+            if len(data) > RELAY_MAX_PENDING:
+                tcp_logger.warning("Baris dari server melebihi %d byte, koneksi ditutup.", RELAY_MAX_PENDING)
+                break
+            pending = data
+            continue
+        pending = data[end + 1:]
+        frame = data[:end]
+        if debug:
+            for line in frame.split(b"\n"):
+                channel = progress_logger if line.startswith(SERVER_PROGRESS_PREFIX) else tcp_logger
+                channel.debug("<< Received from Server: %s", line)
+        await ws_browser.send_frame(frame, WSMsgType.TEXT)
+
+# Versi multiplex dari tcp_bridge_handler: browser mendapat session logis di salah satu koneksi pool,
+# sehingga tidak ada connect TCP baru per halaman. Pesan browser diteruskan sebagai JSON satu baris.
+async def mux_bridge_handler(request):
+    username = request.match_info.get('username')
+    web_logger.info("Browser connected: %s (mux)", username)
+
+    ws_browser = web.WebSocketResponse()
+    await ws_browser.prepare(request)
+
+    stream = None
+    try:
+        stream = await MUX_POOL.open()
+        stream.send({"type": "login", "username": username})
+
+        async def browser_to_tcp():
+            async for msg in ws_browser:
+                if msg.type == WSMsgType.TEXT:
+                    # Newline di dalam pesan akan memecah frame, jadi pesan seperti itu di-encode ulang
+                    text = msg.data
+                    if "\n" in text:
+                        try:
+                            text = json.dumps(json.loads(text))
+                        except ValueError:
+                            continue
+
+                    channel = progress_logger if text.startswith(BROWSER_INPUT_PREFIX) else tcp_logger
+                    channel.debug(">> Sending to Server: %s", text)
+                    stream.send_text(text)
+                    await stream.drain()
+                elif msg.type == WSMsgType.ERROR:
+                    web_logger.warning("ws_browser connection closed with exception %s", ws_browser.exception())
+
+        async def tcp_to_browser():
+            while True:
+                # Relay cepat: semua pesan yang sudah mengantre digabung menjadi satu frame WebSocket
+                if RELAY_MODE == "fast":
+                    lines = await stream.recv_many()
+                else:
+                    text_data = await stream.recv()
+                    lines = None if text_data is None else [text_data]
+                if lines is None:
+                    tcp_logger.info("Server closed session.")
+                    break
+                for text_data in lines:
+                    channel = progress_logger if text_data.startswith(SERVER_PROGRESS_TEXT) else tcp_logger
+                    channel.debug("<< Received from Server: %s", text_data)
+                await ws_browser.send_str("\n".join(lines))
+
+        await asyncio.wait(
+            [asyncio.create_task(browser_to_tcp()), 
+             asyncio.create_task(tcp_to_browser())],
+            return_when=asyncio.FIRST_COMPLETED
+        )
+
+    except Exception as e:
+        web_logger.error("Bridge Error: %s", e)
+    finally:
+        web_logger.debug("Disconnecting session for %s...", username)
+        if stream:
+            stream.close()
+        await ws_browser.close()
         return ws_browser
 
 # fungsi untuk menginisialisasi aplikasi pada pertama kali saat client dijalankan
 async def init_app():
     app = web.Application()
     aiohttp_jinja2.setup(app, loader=jinja2.FileSystemLoader(TEMPLATE_DIR))
+    app["static"] = {name: load_static(name) for name in sorted(os.listdir(STATIC_DIR))
+                     if os.path.isfile(os.path.join(STATIC_DIR, name))}
+    app["index"] = render_index(app)
     app.router.add_get('/', handle_index)
+    app.router.add_get('/static/{name}', handle_static)
     app.router.add_get('/stream/{username}', tcp_bridge_handler)
     return app
 
 # fungsi yang memanggil init_app pada saat program dijalankan
 def main():
     print(f"--- CONFIGURATION ---")
-    print(f"Target TCP Server : {SERVER_TCP_HOST}:{SERVER_TCP_PORT}")
+    print(f"Target TCP Server : {SERVER_TCP_HOST}:{SERVER_TCP_PORT} ({SERVER_PROTOCOL})")
+    print(f"Relay             : {RELAY_MODE}")
+    if MUX_POOL is not None:
+        print(f"Multiplex         : {MUX_POOL.size} koneksi bersama")
     print(f"Web Client URL    : http://localhost:8000")
     print(f"---------------------")
     web.run_app(init_app(), port=8000)
@@ -127,10 +419,25 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Game Client Bridge')
     parser.add_argument('--host', action="store", dest="host", required=True, help="Target TCP Server Host")
     parser.add_argument('--port', action="store", dest="port", type=int, required=True, help="Target TCP Server Port")
+    parser.add_argument('--protocol', action="store", dest="protocol", choices=sorted(CODECS), default="json", help="Bridge to server wire protocol")
+    parser.add_argument('--relay', action="store", dest="relay", choices=("fast", "line"), default="fast", help="JSON relay mode: fast forwards raw bytes and batches buffered lines per WebSocket frame, line parses every message")
+    parser.add_argument('--mux', action="store", dest="mux", type=int, default=0, help="Share N pooled TCP connections between all browsers (0 = one connection per browser, JSON only)")
+    parser.add_argument('--dev', action="store_true", dest="dev", help="Reload the page template and static files when they change on disk")
+    parser.add_argument('--log-level', action="store", dest="log_level", default="INFO", help="Log level (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument('--log-sample', action="append", dest="log_sample", metavar="CATEGORY=RATE", help="Sample a log category, e.g. client.progress=0.01")
     
     given_args = parser.parse_args()
     
     SERVER_TCP_HOST = given_args.host
     SERVER_TCP_PORT = given_args.port
-    
-    main()
+    SERVER_PROTOCOL = given_args.protocol
+    RELAY_MODE = given_args.relay
+    DEV_MODE = given_args.dev
+    if given_args.mux > 0:
+        MUX_POOL = MuxPool(SERVER_TCP_HOST, SERVER_TCP_PORT, given_args.mux)
+
+    setup_logging(given_args.log_level, parse_sample_rates(given_args.log_sample))
+    try:
+        main()
+    finally:
+        shutdown_logging()
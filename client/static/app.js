@@ -0,0 +1,443 @@
+const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+let ws;
+let username = '';
+let targetText = '';
+let startTime = 0;
+let timerInterval = null;
+let wpmUpdateInterval = null;
+let roomPlayers = [];
+let mySeat = 0;
+let oppRows = {};
+// Isi kotak ketik yang terakhir dikirim ke server (server menghitung progress/WPM dari delta input)
+let sentInput = '';
+// Leaderboard yang sedang ditampilkan dan versinya; leaderboard_update hanya berisi perubahan dari versi base
+let leaderboard = [];
+let leaderboardVersion = null;
+
+const els = {
+    alertBar: document.getElementById('connection-alert'),
+    loginSec: document.getElementById('username-section'),
+    mainLayout: document.getElementById('main-layout'),
+    menuState: document.getElementById('game-menu'),
+    loadingState: document.getElementById('game-loading'),
+    playState: document.getElementById('game-play'),
+    inputUser: document.getElementById('username'),
+    btnStart: document.getElementById('start-btn'),
+    inputTyping: document.getElementById('typing-input'),
+    btnPlay: document.getElementById('play-btn'),
+    queueCount: document.getElementById('queue-count'),
+    loadingMsg: document.getElementById('loading-msg'),
+    textDisplay: document.getElementById('text-target'),
+    leaderboard: document.getElementById('leaderboard-list'),
+    countdown: document.getElementById('countdown'),
+    displayName: document.getElementById('display-username'),
+    myNameHud: document.getElementById('my-name-hud'),
+    myWpm: document.getElementById('my-wpm'),
+    myBar: document.getElementById('my-progress-bar'),
+    myPercent: document.getElementById('my-percent'),
+    oppList: document.getElementById('opp-list'),
+    timerDisplay: document.getElementById('timer-display')
+};
+
+els.btnStart.onclick = () => {
+    username = els.inputUser.value.trim();
+    if(!username) return alert("Username tidak boleh kosong!");
+    els.loginSec.classList.add('hidden');
+    els.mainLayout.classList.remove('hidden');
+    els.displayName.textContent = username;
+    els.myNameHud.textContent = username;
+    initSocket();
+};
+
+els.btnPlay.onclick = () => {
+    switchState('loading');
+    if(ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: "req_matchmaking" }));
+    }
+};
+
+function getLocalIPs(callback){
+    let ips = []
+    let pc = new RTCPeerConnection({iceServers: [{urls: "stun:stun.l.google.com:19302"}]});
+
+    pc.createDataChannel("dummy");
+
+    pc.onicecandidate = (event) => {
+        if(!event || !event.candidate) return;
+        let candidate = event.candidate.candidate;
+
+        // ambil ip forward ipv4
+        let ipMatch = candidate.match(/(\d{1,3}\.){3}\d{1,3}/);
+        if (!ipMatch) return;
+
+        let ip = ipMatch[0];
+
+        if (!ips.includes(ip)) {
+            ips.push(ip);
+        }
+    };
+
+    pc.createOffer()
+        .then(o => pc.setLocalDescription(o))
+        .catch(err => console.error(err));
+
+    setTimeout(() => callback(ips), 1000)
+
+};
+
+function initSocket() {
+    ws = new WebSocket(`${wsProtocol}//${window.location.host}/stream/${username}`);
+    
+    ws.onopen = () => {
+        getLocalIPs((ip) => {
+				    ws.send(JSON.stringify({
+				    	type: "client_ip",
+					    ip: ip
+				    }));
+
+                console.log(ip);
+			    })
+        console.log("WebSocket Connected");
+        els.alertBar.classList.add('hidden'); 
+    };
+    
+    // Bridge bisa menggabungkan beberapa pesan JSON dalam satu frame, dipisah newline
+    ws.onmessage = (e) => {
+        for (const line of e.data.split("\n")) {
+            if (line) handleMessage(JSON.parse(line));
+        }
+    };
+    
+    ws.onclose = (e) => {
+        console.warn("WebSocket Closed:", e);
+        showConnectionError();
+    };
+
+    ws.onerror = (e) => {
+        console.error("WebSocket Error:", e);
+        showConnectionError();
+    };
+}
+
+function showConnectionError() {
+    els.alertBar.classList.remove('hidden');
+    els.inputTyping.disabled = true;
+    stopTimer();
+}
+
+function handleMessage(msg) {
+    if (msg.type === 'res_leaderboard' || msg.type === 'leaderboard_update') {
+        updateLeaderboard(msg);
+    }
+    else if (msg.status === 'waiting') {
+        els.queueCount.textContent = msg.waiting_count || 1;
+        els.loadingMsg.textContent = msg.message;
+    }
+    else if (msg.status === 'matched') {
+        els.loadingMsg.textContent = "Lawan ditemukan!";
+        roomPlayers = msg.players || [username, msg.opponent];
+        mySeat = msg.seat ?? 0;
+        renderOpponents();
+        setTimeout(() => switchState('play'), 500);
+    }
+    else if (msg.type === 'countdown') {
+        els.countdown.classList.remove('hidden');
+        els.countdown.textContent = msg.value;
+    }
+    else if (msg.type === 'start_game') {
+        els.countdown.textContent = "GO!";
+        targetText = msg.text;
+        startTimer(msg.duration || 90); 
+        startGameLogic();
+        setTimeout(() => els.countdown.classList.add('hidden'), 1000);
+    }
+    else if (msg.type === 'room_progress') {
+        // Satu pesan berisi progress seluruh kursi di room
+        (msg.progress || []).forEach((value, seat) => {
+            const row = oppRows[seat];
+            if (!row) return;
+            const prog = Math.round(value || 0);
+            row.bar.style.width = `${prog}%`;
+            row.percent.textContent = `${prog}%`;
+            row.wpm.textContent = (msg.wpm || [])[seat] || 0;
+        });
+    }
+    else if (msg.status === 'player_left') {
+        const row = oppRows[msg.seat];
+        if (row) row.name.textContent = `${msg.username} (keluar)`;
+    }
+    else if (msg.type === 'game_over') {
+        endGameLogic(msg);
+    }
+    else if (msg.status === 'opponent_disconnected') {
+        alert("Lawan terputus!");
+        resetGameUI();
+    }
+}
+
+function switchState(state) {
+    els.menuState.classList.add('hidden');
+    els.loadingState.classList.add('hidden');
+    els.playState.classList.add('hidden');
+
+    if (state === 'menu') els.menuState.classList.remove('hidden');
+    if (state === 'loading') els.loadingState.classList.remove('hidden');
+    if (state === 'play') els.playState.classList.remove('hidden');
+}
+
+function startTimer(durationSeconds) {
+    clearInterval(timerInterval); 
+    let timeLeft = durationSeconds;
+    updateTimerDisplay(timeLeft);
+
+    timerInterval = setInterval(() => {
+        timeLeft--;
+        updateTimerDisplay(timeLeft);
+        
+        if (timeLeft <= 0) {
+            clearInterval(timerInterval);
+            els.inputTyping.disabled = true; 
+        }
+    }, 1000);
+}
+
+function stopTimer() {
+    clearInterval(timerInterval);
+    clearInterval(wpmUpdateInterval); 
+}
+
+function updateTimerDisplay(seconds) {
+    const m = Math.floor(seconds / 60).toString().padStart(2, '0');
+    const s = (seconds % 60).toString().padStart(2, '0');
+    els.timerDisplay.textContent = `${m}:${s}`;
+    if(seconds <= 10) els.timerDisplay.parentElement.classList.add('text-red-500');
+    else els.timerDisplay.parentElement.classList.remove('text-red-500');
+}
+
+function startGameLogic() {
+    renderText();
+    els.inputTyping.disabled = false;
+    els.inputTyping.value = '';
+    els.inputTyping.focus();
+    sentInput = '';
+    
+    els.myBar.style.width = '0%';
+    els.myPercent.textContent = '0%';
+    els.myWpm.textContent = '0';
+    
+    renderOpponents();
+    
+    startTime = Date.now();
+
+    clearInterval(wpmUpdateInterval);
+    wpmUpdateInterval = setInterval(() => {
+        if (!els.inputTyping.disabled) {
+            updateStats(false); 
+        }
+    }, 1000);
+}
+
+function endGameLogic(msg) {
+    stopTimer();
+    els.inputTyping.disabled = true;
+    els.countdown.classList.remove('hidden');
+    
+    let mainText = "";
+    let subText = "";
+
+    if (msg.reason === "timeout") {
+        mainText = `<span class="text-orange-500 text-5xl">WAKTU HABIS!</span>`;
+        if (msg.result === 'won') subText = "Kamu Menang (Progress Lebih Jauh)";
+        else if (msg.result === 'lost') subText = "Kamu Kalah (Lawan Lebih Jauh)";
+        else subText = "SERI (Progress Sama)";
+    } else {
+        mainText = msg.result === 'won' 
+            ? '<span class="text-green-500 text-6xl">MENANG!</span>' 
+            : '<span class="text-red-500 text-6xl">KALAH!</span>';
+    }
+    if (msg.ranking && msg.ranking.length > 2) {
+        subText = `${subText ? subText + ' · ' : ''}Peringkat ${msg.rank} dari ${msg.ranking.length}`;
+    }
+        
+    els.countdown.innerHTML = `
+        <div class="text-center bg-gray-900 p-10 rounded-xl border border-gray-600">
+            ${mainText}<br>
+            <div class="text-xl text-gray-300 mt-2">${subText}</div>
+            <div class="text-2xl text-white mt-4 font-mono">Final Speed: ${msg.wpm} WPM</div>
+        </div>`;
+    
+    setTimeout(() => {
+        els.countdown.classList.add('hidden');
+        resetGameUI();
+    }, 5000);
+}
+
+// Satu baris progress untuk setiap lawan di room, diindeks berdasarkan nomor kursi
+function renderOpponents() {
+    els.oppList.innerHTML = '';
+    oppRows = {};
+    roomPlayers.forEach((name, seat) => {
+        if (seat === mySeat) return;
+        const div = document.createElement('div');
+        div.className = "flex flex-col";
+        div.innerHTML = `
+            <div class="flex justify-between text-sm mb-1">
+                <span class="text-red-400 font-bold flex items-center">
+                    😈 LAWAN: <span class="opp-name ml-1 text-white"></span>
+                </span>
+                <div class="flex gap-3 text-sm">
+                    <span class="text-gray-400"><span class="opp-wpm text-white font-bold text-base">0</span> WPM</span>
+                    <span class="opp-percent text-red-400 font-bold text-base w-12 text-right">0%</span>
+                </div>
+            </div>
+            <div class="w-full bg-gray-700 rounded-full h-4 overflow-hidden">
+                <div class="opp-bar bg-red-500 h-full transition-all duration-300 shadow-[0_0_10px_rgba(239,68,68,0.7)]" style="width: 0%"></div>
+            </div>`;
+        const row = {
+            name: div.querySelector('.opp-name'),
+            wpm: div.querySelector('.opp-wpm'),
+            percent: div.querySelector('.opp-percent'),
+            bar: div.querySelector('.opp-bar')
+        };
+        row.name.textContent = name;
+        oppRows[seat] = row;
+        els.oppList.appendChild(div);
+    });
+}
+
+function resetGameUI() {
+    stopTimer();
+    switchState('menu');
+    els.queueCount.textContent = '0';
+    els.inputTyping.value = '';
+}
+
+// Menerapkan res_leaderboard (daftar penuh atau not_modified) dan leaderboard_update (delta atau daftar penuh).
+// Delta yang base-nya bukan versi kita berarti ada update yang terlewat: minta ulang daftar penuh.
+function updateLeaderboard(msg) {
+    const data = msg.data || msg.leaderboard;
+    if (data) {
+        leaderboard = data;
+        leaderboardVersion = msg.version ?? null;
+        renderLeaderboard(leaderboard);
+        return;
+    }
+    if (msg.not_modified || msg.version === leaderboardVersion) return;
+    if (msg.base !== leaderboardVersion || leaderboardVersion === null) {
+        ws.send(JSON.stringify({ type: "req_leaderboard", version: leaderboardVersion }));
+        return;
+    }
+    const removed = new Set(msg.removed || []);
+    leaderboard = leaderboard.filter(d => !removed.has(d.username));
+    (msg.inserted || []).forEach(d => leaderboard.splice(d.rank - 1, 0, { username: d.username, wpm: d.wpm }));
+    leaderboardVersion = msg.version;
+    renderLeaderboard(leaderboard);
+}
+
+function renderLeaderboard(data) {
+    if (!data) return;
+    els.leaderboard.innerHTML = '';
+    data.forEach((d, i) => {
+        const li = document.createElement('li');
+        let rankColor = "text-gray-400";
+        if (i === 0) rankColor = "text-yellow-400";
+        if (i === 1) rankColor = "text-gray-300";
+        if (i === 2) rankColor = "text-orange-400";
+
+        li.className = "flex justify-between items-center bg-gray-700/50 p-3 rounded hover:bg-gray-700 transition-colors";
+        li.innerHTML = `
+            <div>
+                <span class="font-bold mr-3 ${rankColor}">#${i+1}</span>
+                <span class="font-semibold text-white">${d.username}</span>
+            </div>
+            <span class="font-mono text-indigo-300 font-bold">${d.wpm} WPM</span>
+        `;
+        els.leaderboard.appendChild(li);
+    });
+}
+
+function renderText() {
+    els.textDisplay.innerHTML = '';
+    const input = els.inputTyping.value;
+    targetText.split('').forEach((char, i) => {
+        const span = document.createElement('span');
+        span.textContent = char;
+        if (i < input.length) {
+            span.className = input[i] === char 
+                ? "text-green-400 border-b-2 border-green-500" 
+                : "text-red-400 bg-red-900/50 border-b-2 border-red-500";
+        } else {
+            span.className = "text-gray-500";
+        }
+        els.textDisplay.appendChild(span);
+    });
+}
+
+function updateStats(checkFinish = true) {
+    const inputVal = els.inputTyping.value;
+    const targetVal = targetText;
+    
+    const inputWords = inputVal.split(' ');
+    const targetWords = targetVal.split(' ');
+    
+    let correctCharsFromWords = 0;
+    
+    for (let i = 0; i < inputWords.length; i++) {
+        if (i >= targetWords.length) break;
+        
+        const currentInputWord = inputWords[i];
+        const currentTargetWord = targetWords[i];
+        
+        if (currentInputWord === currentTargetWord) {
+            correctCharsFromWords += currentInputWord.length;
+            
+            const isLastWord = (i === inputWords.length - 1);
+            const hasTrailingSpace = inputVal.endsWith(' ');
+            
+            if (!isLastWord || (isLastWord && hasTrailingSpace)) {
+                 if (i < targetWords.length - 1) {
+                     correctCharsFromWords++; 
+                 }
+            }
+        }
+    }
+
+    const elapsedMinutes = Math.max((Date.now() - startTime) / 60000, 0.0001);
+    const wpm = Math.round((correctCharsFromWords / 5) / elapsedMinutes);
+    
+    const progress = Math.min(100, (correctCharsFromWords / targetText.length) * 100);
+    const progressInt = Math.floor(progress);
+
+    els.myWpm.textContent = wpm;
+    els.myBar.style.width = `${progress}%`;
+    els.myPercent.textContent = `${progressInt}%`;
+
+    // Finish ditentukan server dari input yang dikirim; di sini hanya mengunci kotak ketik
+    if (checkFinish && inputVal === targetText) {
+        els.inputTyping.disabled = true;
+        clearInterval(wpmUpdateInterval); 
+    }
+}
+
+// Mengirim perubahan kotak ketik sebagai delta: mulai posisi pos, sisa input diganti dengan text.
+// Server membatasi satu delta 64 karakter, jadi perubahan besar dipecah.
+function sendInput() {
+    const value = els.inputTyping.value;
+    if (value === sentInput || !ws || ws.readyState !== WebSocket.OPEN) return;
+    let pos = 0;
+    const common = Math.min(value.length, sentInput.length);
+    while (pos < common && value[pos] === sentInput[pos]) pos++;
+    do {
+        ws.send(JSON.stringify({ type: "input", pos: pos, text: value.slice(pos, pos + 64) }));
+        pos += 64;
+    } while (pos < value.length);
+    sentInput = value;
+}
+
+els.inputTyping.addEventListener('paste', (e) => e.preventDefault());
+
+els.inputTyping.oninput = () => {
+    renderText(); 
+    sendInput();
+    updateStats(true); 
+};
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import struct
+from typing import Optional
+
+# Codec protokol TCP yang dipakai bersama oleh server dan client bridge.
+#
+# Mode "json" (default): satu pesan JSON per baris, diakhiri "\n".
+# Mode "binary": setiap frame = panjang (uint16, big-endian, menghitung byte tipe + body) + tipe (1 byte) + body.
+# Tipe yang sering dikirim memakai field lebar tetap; pesan lain dibungkus sebagai JSON di dalam frame TYPE_JSON.
+#
+# Mode dipilih lewat field "protocol" pada pesan login (yang selalu dikirim sebagai JSON line).
+# Setelah login, kedua arah memakai mode yang dipilih.
+
+TYPE_PROGRESS = 0x01
+TYPE_FINISH = 0x02
+TYPE_OPPONENT_PROGRESS = 0x03
+TYPE_COUNTDOWN = 0x04
+TYPE_REQ_MATCHMAKING = 0x05
+TYPE_REQ_LEADERBOARD = 0x06
+TYPE_CANCEL_MATCHMAKING = 0x07
+TYPE_ROOM_PROGRESS = 0x08
+TYPE_INPUT = 0x09
+TYPE_JSON = 0x7F
+
+HEADER = struct.Struct(">HB")
+PROGRESS_BODY = struct.Struct(">HH")   # progress dalam seperseratus persen (0-10000), wpm
+WPM_BODY = struct.Struct(">H")
+COUNTDOWN_BODY = struct.Struct(">B")
+INPUT_POS = struct.Struct(">H")       # posisi awal delta, diikuti teks UTF-8
+MAX_FRAME = 0xFFFF
+
+# Pesan tanpa field tambahan: cukup satu byte tipe
+_EMPTY_TYPES = {
+    "req_matchmaking": TYPE_REQ_MATCHMAKING,
+    "req_leaderboard": TYPE_REQ_LEADERBOARD,
+    "cancel_matchmaking": TYPE_CANCEL_MATCHMAKING,
+}
+_EMPTY_NAMES = {code: name for name, code in _EMPTY_TYPES.items()}
+
+# Baris JSON yang lebih panjang dari limit StreamReader (--max-line di server).
+class LineTooLong(ValueError):
+    pass
+
+def _u16(value) -> int:
+    return max(0, min(0xFFFF, int(round(value or 0))))
+
+# Delta input yang bisa dikirim sebagai TYPE_INPUT tanpa mengubah isinya. Input dengan field lain atau pos di luar
+# uint16 (mis. dari client yang rusak) tetap dikirim sebagai JSON agar server yang memvalidasinya.
+def _is_plain_input(payload: dict) -> bool:
+    pos, text = payload.get("pos"), payload.get("text")
+    return (len(payload) == 3 and type(pos) is int and 0 <= pos <= 0xFFFF and isinstance(text, str))
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, payload: dict) -> bytes:
+        return (json.dumps(payload) + "\n").encode()
+
+    def decode(self, line: bytes) -> dict:
+        return json.loads(line)
+
+    # Membaca satu pesan. None berarti koneksi sudah ditutup; ValueError untuk JSON yang rusak,
+    # LineTooLong jika baris melebihi limit reader.
+    async def read(self, reader: asyncio.StreamReader) -> Optional[dict]:
+        try:
+            line = await reader.readline()
+        except ValueError as exc:
+            raise LineTooLong(str(exc)) from exc
+        if not line:
+            return None
+        return self.decode(line)
+
+class BinaryCodec:
+    name = "binary"
+
+    def encode(self, payload: dict) -> bytes:
+        msg_type = payload.get("type")
+        if msg_type == "progress" or msg_type == "opponent_progress":
+            code = TYPE_PROGRESS if msg_type == "progress" else TYPE_OPPONENT_PROGRESS
+            body = PROGRESS_BODY.pack(_u16((payload.get("progress") or 0) * 100), _u16(payload.get("wpm")))
+        elif msg_type == "room_progress":
+            # Satu pasangan (progress, wpm) per kursi pemain, urut sesuai daftar "players" pada pesan matched
+            values = []
+            for progress, wpm in zip(payload.get("progress", ()), payload.get("wpm", ())):
+                values.append(_u16((progress or 0) * 100))
+                values.append(_u16(wpm))
+            code, body = TYPE_ROOM_PROGRESS, struct.pack(f">{len(values)}H", *values)
+        elif msg_type == "finish":
+            code, body = TYPE_FINISH, WPM_BODY.pack(_u16(payload.get("wpm")))
+        elif msg_type == "input" and _is_plain_input(payload):
+            code, body = TYPE_INPUT, INPUT_POS.pack(payload["pos"]) + payload["text"].encode()
+        elif msg_type == "countdown":
+            code, body = TYPE_COUNTDOWN, COUNTDOWN_BODY.pack(int(payload.get("value", 0)) & 0xFF)
+        elif msg_type in _EMPTY_TYPES and len(payload) == 1:
+            code, body = _EMPTY_TYPES[msg_type], b""
+        else:
+            code, body = TYPE_JSON, json.dumps(payload, separators=(",", ":")).encode()
+
+        if len(body) + 1 > MAX_FRAME:
+            raise ValueError("Frame terlalu besar")
+        return HEADER.pack(len(body) + 1, code) + body
+
+    def decode(self, code: int, body: bytes) -> dict:
+        if code == TYPE_PROGRESS or code == TYPE_OPPONENT_PROGRESS:
+            progress, wpm = PROGRESS_BODY.unpack(body)
+            msg_type = "progress" if code == TYPE_PROGRESS else "opponent_progress"
+            return {"type": msg_type, "progress": progress / 100, "wpm": wpm}
+        if code == TYPE_ROOM_PROGRESS:
+            if len(body) % PROGRESS_BODY.size:
+                raise ValueError("Panjang frame room_progress tidak valid")
+            values = struct.unpack(f">{len(body) // 2}H", body)
+            return {"type": "room_progress", "progress": [p / 100 for p in values[0::2]], "wpm": list(values[1::2])}
+        if code == TYPE_FINISH:
+            return {"type": "finish", "wpm": WPM_BODY.unpack(body)[0]}
+        if code == TYPE_INPUT:
+            if len(body) < INPUT_POS.size:
+                raise ValueError("Panjang frame input tidak valid")
+            return {"type": "input", "pos": INPUT_POS.unpack_from(body)[0], "text": body[INPUT_POS.size:].decode()}
+        if code == TYPE_COUNTDOWN:
+            return {"type": "countdown", "value": COUNTDOWN_BODY.unpack(body)[0]}
+        if code in _EMPTY_NAMES:
+            return {"type": _EMPTY_NAMES[code]}
+        if code == TYPE_JSON:
+            return json.loads(body)
+        raise ValueError(f"Tipe frame tidak dikenal: {code}")
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[dict]:
+        try:
+            length, code = HEADER.unpack(await reader.readexactly(HEADER.size))
+            body = await reader.readexactly(length - 1) if length > 1 else b""
+        except asyncio.IncompleteReadError:
+            return None
+        if length == 0:
+            raise ValueError("Panjang frame tidak valid")
+        try:
+            return self.decode(code, body)
+        except struct.error as exc:
+            raise ValueError(f"Body frame tidak valid: {exc}")
+
+CODECS = {
+    JsonCodec.name: JsonCodec(),
+    BinaryCodec.name: BinaryCodec(),
+}
+DEFAULT_CODEC = CODECS[JsonCodec.name]
+
+# Mengambil codec berdasarkan nama yang dikirim client; nama tidak dikenal jatuh ke JSON.
+def get_codec(name: Optional[str]):
+    return CODECS.get(name or JsonCodec.name, DEFAULT_CODEC)
@@ -0,0 +1,78 @@
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional
+
+# Sistem logging bersama untuk server dan client bridge.
+# Semua record masuk ke QueueHandler (non-blocking), lalu ditulis ke stdout oleh QueueListener di thread terpisah,
+# sehingga backpressure terminal/pipe tidak menghentikan event loop.
+
+LOG_FORMAT = "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Filter sampling per kategori (nama logger). Rate 0.01 berarti 1 dari 100 record dicetak.
+# Memakai counter deterministik, bukan random, agar hasil mudah dibandingkan.
+class SamplingFilter(logging.Filter):
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.counters: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self._rate_for(record.name)
+        if rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        count = self.counters.get(record.name, 0) + 1
+        self.counters[record.name] = count
+        return count % round(1 / rate) == 0
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+# Mengubah argumen CLI "kategori=rate" menjadi dict.
+def parse_sample_rates(items) -> Dict[str, float]:
+    rates = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        rates[name.strip()] = float(value)
+    return rates
+
+# Memasang logging non-blocking. Dipanggil sekali dari entry point (server.py / client.py).
+def setup_logging(level: str = "INFO", sample_rates: Optional[Dict[str, float]] = None, stream=None) -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    handler = logging.handlers.QueueHandler(log_queue)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+# Menghentikan listener dan memastikan semua record di antrean sudah tertulis.
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def get_logger(category: str) -> logging.Logger:
+    return logging.getLogger(category)
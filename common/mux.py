@@ -0,0 +1,171 @@
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+# Multiplexing banyak session logis di atas satu koneksi TCP bridge -> server.
+#
+# Baris pertama koneksi adalah {"type": "mux"} (pengganti login). Setelah itu kedua arah memakai frame
+#   "<id channel> <json>\n"
+# Id channel dipilih bridge, unik per koneksi. Pesan pertama sebuah channel harus login;
+# {"type": "disconnect"} dari bridge menutup channel, {"type": "session_closed"} dari server berarti
+# server yang menutupnya (misalnya client terlalu lambat). Mode ini selalu memakai JSON.
+
+MUX_HELLO = b'{"type": "mux"}\n'
+DISCONNECT = b'{"type":"disconnect"}\n'
+SESSION_CLOSED = b'{"type":"session_closed"}\n'
+
+def encode_frame(cid: int, line: bytes) -> bytes:
+    return b"%d %s" % (cid, line)
+
+# Memisahkan id channel dan body; ValueError jika frame rusak.
+def decode_frame(line: bytes) -> Tuple[int, bytes]:
+    cid, _, body = line.partition(b" ")
+    return int(cid), body
+
+# Satu session logis di sisi bridge. Pesan dari server masuk ke antrean; None berarti session ditutup.
+# Jika browser terlalu lambat dan antrean melewati max_pending, session ditutup (setara eviction di server).
+class MuxStream:
+
+    def __init__(self, link: "MuxLink", cid: int, max_pending: int = 1024):
+        self.link = link
+        self.cid = cid
+        self.max_pending = max_pending
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    # Mengirim satu pesan JSON (tanpa newline) apa adanya.
+    def send_text(self, text: str) -> None:
+        if not self.closed:
+            self.link.write(encode_frame(self.cid, text.encode() + b"\n"))
+
+    def send(self, payload: dict) -> None:
+        self.send_text(json.dumps(payload))
+
+    async def drain(self) -> None:
+        await self.link.drain()
+
+    async def recv(self) -> Optional[str]:
+        return await self.queue.get()
+
+    # Menunggu satu pesan lalu mengambil semua pesan lain yang sudah mengantre; None jika session ditutup.
+    # Penanda tutup (None) yang ikut terambil dikembalikan ke antrean untuk panggilan berikutnya.
+    async def recv_many(self) -> Optional[List[str]]:
+        first = await self.queue.get()
+        if first is None:
+            return None
+        lines = [first]
+        while not self.queue.empty():
+            text = self.queue.get_nowait()
+            if text is None:
+                self.queue.put_nowait(None)
+                break
+            lines.append(text)
+        return lines
+
+    def feed(self, text: Optional[str]) -> None:
+        if self.closed:
+            return
+        if text is None or self.queue.qsize() >= self.max_pending:
+            self.closed = True
+            self.link.streams.pop(self.cid, None)
+            if text is not None:
+                self.link.write(encode_frame(self.cid, DISCONNECT))
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(text)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.link.streams.pop(self.cid, None)
+        self.link.write(encode_frame(self.cid, DISCONNECT))
+        self.queue.put_nowait(None)
+
+# Satu koneksi TCP persisten ke server yang membawa banyak MuxStream.
+class MuxLink:
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.task: Optional[asyncio.Task] = None
+        self.streams: Dict[int, MuxStream] = {}
+        self.next_cid = 1
+
+    @property
+    def alive(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing() and self.task is not None and not self.task.done()
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(MUX_HELLO)
+        self.task = asyncio.create_task(self._read())
+
+    def open(self) -> MuxStream:
+        stream = MuxStream(self, self.next_cid)
+        self.streams[stream.cid] = stream
+        self.next_cid += 1
+        return stream
+
+    def write(self, data: bytes) -> None:
+        if self.writer and not self.writer.is_closing():
+            self.writer.write(data)
+
+    async def drain(self) -> None:
+        if self.writer and not self.writer.is_closing():
+            await self.writer.drain()
+
+    async def close(self) -> None:
+        if self.task:
+            self.task.cancel()
+        if self.writer:
+            self.writer.close()
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    cid, body = decode_frame(line)
+                except ValueError:
+                    continue
+                stream = self.streams.get(cid)
+                if stream is None:
+                    continue
+                stream.feed(None if body == SESSION_CLOSED else body.decode().rstrip("\n"))
+        except ConnectionError:
+            pass
+        finally:
+            for stream in list(self.streams.values()):
+                stream.feed(None)
+            self.streams.clear()
+
+# Pool berisi maksimal size koneksi; session baru ditempatkan di koneksi hidup dengan session paling sedikit.
+# Koneksi dibuka saat dibutuhkan dan dibuka ulang jika terputus.
+class MuxPool:
+
+    def __init__(self, host: str, port: int, size: int = 4):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.links: List[MuxLink] = []
+        self.lock = asyncio.Lock()
+
+    async def open(self) -> MuxStream:
+        async with self.lock:
+            self.links = [link for link in self.links if link.alive]
+            if len(self.links) < self.size:
+                link = MuxLink(self.host, self.port)
+                await link.connect()
+                self.links.append(link)
+            link = min(self.links, key=lambda l: len(l.streams))
+        return link.open()
+
+    async def close(self) -> None:
+        for link in self.links:
+            await link.close()
+        self.links.clear()
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(SERVER_DIR), "client"))
+
+import aiohttp
+import aiohttp_jinja2
+from aiohttp import web
+
+import client as bridge
+
+# Benchmark route halaman utama bridge (tanpa server game): render template per request (cara lama, route /lama)
+# vs. halaman yang dirender dan dikompresi sekali di memori (route /), dengan dan tanpa gzip/brotli, serta revalidasi
+# If-None-Match yang dijawab 304. Client aiohttp dengan --concurrency request bersamaan selama --duration detik.
+# Contoh: python benchmarks/bench_bridge_index.py --duration 5 --concurrency 32
+
+async def handle_legacy(request):
+    return aiohttp_jinja2.render_template('index.html', request, {"assets": request.app["static"]})
+
+async def hammer(url, headers, duration, concurrency):
+    done = 0
+    received = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(session):
+        nonlocal done, received
+        while time.perf_counter() < stop_at:
+            async with session.get(url, headers=headers, auto_decompress=False) as response:
+                body = await response.read()
+                done += 1
+                received += len(body)
+
+    async with aiohttp.ClientSession() as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return done / elapsed, received / max(done, 1)
+
+async def run(duration, concurrency, port):
+    app = await bridge.init_app()
+    app.router.add_get('/lama', handle_legacy)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    index = app["index"]
+    cases = [
+        ("render per request", "/lama", {}),
+        ("cache, tanpa kompresi", "/", {"Accept-Encoding": "identity"}),
+        ("cache, gzip", "/", {"Accept-Encoding": "gzip"}),
+    ]
+    if "br" in index.variants:
+        cases.append(("cache, brotli", "/", {"Accept-Encoding": "br"}))
+    cases.append(("cache, 304", "/", {"Accept-Encoding": "gzip", "If-None-Match": f'"{index.etag}-gzip"'}))
+
+    print(f"durasi {duration}s per kasus | concurrency {concurrency} | brotli: {'ya' if bridge.brotli else 'tidak terpasang'}")
+    print(f"{'kasus':>22} | {'req/s':>8} | {'byte/respons':>12}")
+    try:
+        for name, path, headers in cases:
+            rate, size = await hammer(f"http://127.0.0.1:{port}{path}", headers, duration, concurrency)
+            print(f"{name:>22} | {rate:>8.0f} | {size:>12.0f}")
+    finally:
+        await runner.cleanup()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark route halaman utama bridge')
+    parser.add_argument('--duration', type=float, default=5.0, help="Lama setiap kasus (detik)")
+    parser.add_argument('--concurrency', type=int, default=32, help="Jumlah request bersamaan")
+    parser.add_argument('--port', type=int, default=51800, help="Port HTTP bridge yang dijalankan benchmark")
+    given_args = parser.parse_args()
+    asyncio.run(run(given_args.duration, given_args.concurrency, given_args.port))
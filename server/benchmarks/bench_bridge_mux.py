@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from common.mux import MuxPool
+
+# Benchmark sisi bridge -> server: satu koneksi TCP per browser (cara lama) vs. pool koneksi multiplex (client.py --mux N).
+# n session dibuka dengan paralelisme --concurrency; latensi setup = connect (jika ada) + login sampai res_leaderboard diterima.
+# Setelah semua session terbuka (idle), dihitung file descriptor yang dipakai proses bridge (benchmark ini) dan server.
+# Contoh: python benchmarks/bench_bridge_mux.py --sessions 1000 5000 --pool 4
+
+def count_fds(pid="self") -> int:
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return -1
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server tidak bisa dihubungi di port {port}")
+
+async def open_direct(port, name):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((json.dumps({"type": "login", "username": name}) + "\n").encode())
+    await reader.readline()
+    return writer
+
+async def open_mux(pool, name):
+    stream = await pool.open()
+    stream.send({"type": "login", "username": name})
+    await stream.recv()
+    return stream
+
+async def run_case(mode, port, sessions, concurrency, pool_size, server_pid):
+    pool = MuxPool("127.0.0.1", port, pool_size) if mode == "mux" else None
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with limit:
+            started = time.perf_counter()
+            handle = await (open_mux(pool, f"mux{i}") if pool else open_direct(port, f"direct{i}"))
+            latencies.append(time.perf_counter() - started)
+            return handle
+
+    fds_before = count_fds()
+    started = time.perf_counter()
+    handles = await asyncio.gather(*(one(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.5)
+    result = {
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p99": sorted(latencies)[int(len(latencies) * 0.99) - 1],
+        "bridge_fds": count_fds() - fds_before,
+        "server_fds": count_fds(server_pid),
+    }
+
+    for handle in handles:
+        handle.close()
+    if pool:
+        await pool.close()
+    await asyncio.sleep(1.0)
+    return result
+
+def main(sizes, concurrency, pool_size, port):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, max(sizes) * 2 + 512)), hard))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--host", "127.0.0.1", "--port", str(port), "--log-level", "WARNING"],
+            cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            print(f"pool mux: {pool_size} koneksi | concurrency: {concurrency}")
+            print(f"{'session':>8} | {'mode':>6} | {'total':>8} | {'p50':>8} | {'p99':>8} | {'fd bridge':>9} | {'fd server':>9}")
+            for n in sizes:
+                for mode in ("direct", "mux"):
+                    r = asyncio.run(run_case(mode, port, n, concurrency, pool_size, server.pid))
+                    print(f"{n:>8} | {mode:>6} | {r['elapsed']:>7.2f}s | {r['p50'] * 1000:>6.1f}ms | {r['p99'] * 1000:>6.1f}ms | "
+                          f"{r['bridge_fds']:>9} | {r['server_fds']:>9}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark koneksi bridge langsung vs. multiplex')
+    parser.add_argument('--sessions', nargs="+", type=int, default=[1000, 5000], help="Jumlah session browser yang dibuka")
+    parser.add_argument('--concurrency', type=int, default=200, help="Jumlah session yang dibuka bersamaan")
+    parser.add_argument('--pool', type=int, default=4, help="Jumlah koneksi di pool multiplex")
+    parser.add_argument('--port', type=int, default=51600, help="Port server yang dijalankan benchmark")
+    given_args = parser.parse_args()
+    main(given_args.sessions, given_args.concurrency, given_args.pool, given_args.port)
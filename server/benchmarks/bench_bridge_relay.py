@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(SERVER_DIR), "client"))
+
+import aiohttp
+from aiohttp import web
+
+import client as bridge
+
+# Benchmark throughput bridge saja (tanpa server game): server TCP palsu + bridge aiohttp + client WebSocket dalam satu proses.
+# - downstream: server palsu menulis --messages baris room_progress dalam burst berisi --burst baris, client menghitung baris yang diterima
+# - upstream  : client WebSocket mengirim --messages pesan progress, server palsu menghitung baris yang diterima
+# Dibandingkan relay "line" (decode/parse per pesan, satu frame per pesan) dan "fast" (bytes apa adanya, baris digabung per frame).
+# Contoh: python benchmarks/bench_bridge_relay.py --messages 200000 --burst 1 8 64
+
+PROGRESS_LINE = (json.dumps({
+    "type": "room_progress",
+    "progress": [42, 57, 13, 88],
+    "wpm": [61, 74, 20, 95]
+}) + "\n").encode()
+BROWSER_PROGRESS = json.dumps({"type": "progress", "progress": 57, "wpm": 74}, separators=(",", ":"))
+
+class FakeServer:
+
+    def __init__(self, messages: int, burst: int):
+        self.messages = messages
+        self.burst = burst
+        self.received = 0
+        self.done = asyncio.Event()
+        self.mode = "downstream"
+
+    async def handle(self, reader, writer):
+        await reader.readline()
+        if self.mode == "downstream":
+            chunk = PROGRESS_LINE * self.burst
+            sent = 0
+            while sent < self.messages:
+                n = min(self.burst, self.messages - sent)
+                writer.write(chunk if n == self.burst else PROGRESS_LINE * n)
+                sent += n
+                await writer.drain()
+        while not self.done.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            self.received += 1
+            if self.received >= self.messages:
+                self.done.set()
+        writer.close()
+
+async def run_case(relay, direction, messages, burst, bridge_port, tcp_port):
+    fake = FakeServer(messages, burst)
+    fake.mode = direction
+    tcp_server = await asyncio.start_server(fake.handle, "127.0.0.1", tcp_port)
+
+    bridge.SERVER_TCP_HOST = "127.0.0.1"
+    bridge.SERVER_TCP_PORT = tcp_port
+    bridge.SERVER_PROTOCOL = "json"
+    bridge.RELAY_MODE = relay
+    runner = web.AppRunner(await bridge.init_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", bridge_port)
+    await site.start()
+
+    frames = 0
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{bridge_port}/stream/bench") as ws:
+                started = time.perf_counter()
+                if direction == "downstream":
+                    lines = 0
+                    while lines < messages:
+                        msg = await ws.receive()
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        frames += 1
+                        lines += msg.data.count("\n") + 1
+                else:
+                    for _ in range(messages):
+                        await ws.send_str(BROWSER_PROGRESS)
+                    await fake.done.wait()
+                    frames = messages
+                elapsed = time.perf_counter() - started
+                fake.done.set()
+    finally:
+        await runner.cleanup()
+        tcp_server.close()
+        await tcp_server.wait_closed()
+    return elapsed, frames
+
+def main(messages, bursts, bridge_port, tcp_port):
+    print(f"{messages} pesan per kasus, ukuran baris {len(PROGRESS_LINE)} byte")
+    print(f"{'arah':>10} | {'burst':>5} | {'relay':>5} | {'waktu':>8} | {'msg/s':>10} | {'frame WS':>9}")
+    for direction in ("downstream", "upstream"):
+        for burst in (bursts if direction == "downstream" else [1]):
+            for relay in ("line", "fast"):
+                elapsed, frames = asyncio.run(run_case(relay, direction, messages, burst, bridge_port, tcp_port))
+                print(f"{direction:>10} | {burst:>5} | {relay:>5} | {elapsed:>7.2f}s | {messages / elapsed:>10.0f} | {frames:>9}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark throughput relay bridge WebSocket <-> TCP')
+    parser.add_argument('--messages', type=int, default=100000, help="Jumlah pesan per kasus")
+    parser.add_argument('--burst', nargs="+", type=int, default=[1, 8, 64], help="Jumlah baris yang ditulis server palsu sekaligus")
+    parser.add_argument('--bridge-port', type=int, default=51700, help="Port HTTP bridge yang dijalankan benchmark")
+    parser.add_argument('--tcp-port', type=int, default=51701, help="Port server TCP palsu")
+    given_args = parser.parse_args()
+    main(given_args.messages, given_args.burst, given_args.bridge_port, given_args.tcp_port)
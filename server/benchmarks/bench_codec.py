@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import timeit
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from common.codec import CODECS, HEADER
+
+# Microbenchmark codec protokol: biaya encode/decode per pesan dan jumlah byte di kabel per tipe pesan.
+# Contoh: python benchmarks/bench_codec.py --number 200000
+
+SAMPLES = {
+    "progress": {"type": "progress", "progress": 47.61904761904762, "wpm": 83},
+    "opponent_progress": {"type": "opponent_progress", "progress": 47.61904761904762, "wpm": 83},
+    "room_progress": {"type": "room_progress", "progress": [47.61904761904762, 12.5, 88.0, 3.25] * 2, "wpm": [83, 40, 97, 22] * 2},
+    "finish": {"type": "finish", "wpm": 101},
+    "countdown": {"type": "countdown", "value": 3},
+    "req_matchmaking": {"type": "req_matchmaking"},
+    "game_over": {"type": "game_over", "reason": "finish", "result": "won", "wpm": 96,
+                  "leaderboard": [{"username": f"user{i}", "wpm": 150 - i} for i in range(10)]},
+}
+
+def decoder_for(codec, data: bytes):
+    if codec.name == "json":
+        return lambda: codec.decode(data)
+    _, code = HEADER.unpack_from(data)
+    body = data[HEADER.size:]
+    return lambda: codec.decode(code, body)
+
+def main(number: int) -> None:
+    print(f"{'message':<18} {'codec':<7} {'bytes':>6} {'encode ns':>10} {'decode ns':>10}")
+    for name, payload in SAMPLES.items():
+        for codec in CODECS.values():
+            data = codec.encode(payload)
+            encode_ns = timeit.timeit(lambda: codec.encode(payload), number=number) / number * 1e9
+            decode_ns = timeit.timeit(decoder_for(codec, data), number=number) / number * 1e9
+            print(f"{name:<18} {codec.name:<7} {len(data):>6} {encode_ns:>10.0f} {decode_ns:>10.0f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark codec protokol')
+    parser.add_argument('--number', type=int, default=100_000, help="Jumlah iterasi per pengukuran")
+    given_args = parser.parse_args()
+    main(given_args.number)
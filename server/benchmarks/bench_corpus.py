@@ -0,0 +1,89 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.corpus import Corpus, compile_corpus, read_passages
+from services.typing_engine import TargetText
+
+# Benchmark korpus teks: list str di memori (cara text_pool, dibaca dari file teks saat startup) vs. file korpus mmap.
+# Untuk setiap ukuran dibuat n teks sintetis (--words kata per teks) di file teks sementara, lalu diukur:
+# waktu kompilasi korpus, waktu startup (baca file teks / buka korpus), memori heap Python setelah startup
+# (tracemalloc; halaman mmap tidak dihitung karena dibagi dengan page cache), dan latensi memilih teks acak
+# sampai TargetText siap dipakai room (cache LRU korpus praktis selalu miss pada korpus besar).
+# Contoh: python benchmarks/bench_corpus.py --passages 10000 100000 300000
+
+WORDS = ("the quick brown fox jumps over lazy dog while typing races reward steady rhythm accuracy and calm focus "
+         "Literature history climate energy friendship discipline technology, water; rivers. Minecraft 2024 AI").split()
+
+def write_passages(path, n, words, rng):
+    with open(path, "w", encoding="utf-8") as handle:
+        for _ in range(n):
+            handle.write(" ".join(rng.choice(WORDS) for _ in range(words)) + "\n")
+
+def measure_picks(pick, picks):
+    t0 = time.perf_counter()
+    for _ in range(picks):
+        pick()
+    return (time.perf_counter() - t0) / picks
+
+# Startup diukur tanpa tracemalloc (yang memperlambat alokasi), memori heap diukur dengan memuat ulang.
+def load(open_pool):
+    t0 = time.perf_counter()
+    first = open_pool()
+    startup = time.perf_counter() - t0
+    if isinstance(first, Corpus):
+        first.close()
+    tracemalloc.start()
+    pool = open_pool()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return pool, startup, memory
+
+def run_list(text_path, picks, rng):
+    pool, startup, memory = load(lambda: list(read_passages([text_path])))
+    latency = measure_picks(lambda: TargetText(rng.choice(pool)), picks)
+    return startup, memory, latency
+
+def run_corpus(corpus_path, picks, rng):
+    corpus, startup, memory = load(lambda: Corpus(corpus_path, cache_size=256))
+    latency = measure_picks(lambda: corpus.target(corpus.pick(rng.randrange(len(corpus.tiers)), rng)), picks)
+    corpus.close()
+    return startup, memory, latency
+
+def main(sizes, words, picks, seed):
+    rng = random.Random(seed)
+    print(f"{words} kata per teks | {picks} pemilihan acak per kasus")
+    print(f"{'teks':>8} | {'mode':>6} | {'kompilasi':>9} | {'file':>8} | {'startup':>9} | {'heap':>9} | {'pilih+TargetText':>16}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            text_path = os.path.join(workdir, f"teks_{n}.txt")
+            corpus_path = os.path.join(workdir, f"korpus_{n}.bin")
+            write_passages(text_path, n, words, rng)
+
+            t0 = time.perf_counter()
+            compile_corpus(read_passages([text_path]), corpus_path)
+            compile_time = time.perf_counter() - t0
+
+            startup, memory, latency = run_list(text_path, picks, rng)
+            print(f"{n:>8} | {'list':>6} | {'-':>9} | {os.path.getsize(text_path) / 1e6:>6.1f}MB | {startup * 1000:>7.1f}ms | "
+                  f"{memory / 1e6:>7.1f}MB | {latency * 1e6:>14.1f}us")
+            startup, memory, latency = run_corpus(corpus_path, picks, rng)
+            print(f"{n:>8} | {'korpus':>6} | {compile_time:>8.2f}s | {os.path.getsize(corpus_path) / 1e6:>6.1f}MB | {startup * 1000:>7.1f}ms | "
+                  f"{memory / 1e6:>7.1f}MB | {latency * 1e6:>14.1f}us")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark korpus teks di memori vs. file korpus mmap')
+    parser.add_argument('--passages', nargs="+", type=int, default=[10000, 100000, 300000], help="Jumlah teks")
+    parser.add_argument('--words', type=int, default=45, help="Jumlah kata per teks")
+    parser.add_argument('--picks', type=int, default=20000, help="Jumlah pemilihan teks acak yang diukur")
+    parser.add_argument('--seed', type=int, default=1, help="Seed random")
+    given_args = parser.parse_args()
+    main(given_args.passages, given_args.words, given_args.picks, given_args.seed)
@@ -0,0 +1,99 @@
+import asyncio
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from sqlalchemy import insert
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from extensions import Base, DB_PROFILES, create_engines
+from models.score import Score
+from models.user_best import UserBest
+from services.score_writer import ScoreWriter, upsert_best_stmt
+
+# Benchmark throughput tulis dan baca untuk setiap profil database di extensions.DB_PROFILES.
+# - single : satu transaksi per skor (pola _record_score lama)
+# - batched: group commit lewat ScoreWriter
+# - read   : query leaderboard paralel dari pool read-only sambil ada penulisan berjalan
+# Contoh: python benchmarks/bench_db_profiles.py --writes 2000 --readers 4 --seconds 3
+
+async def bench_single(session_factory, count: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(count):
+        async with session_factory() as session:
+            async with session.begin():
+                await session.execute(insert(Score), [{"username": f"single{i % 500}", "wpm": i % 150}])
+                await session.execute(upsert_best_stmt(), [{"username": f"single{i % 500}", "best_wpm": i % 150, "achieved_at": None}])
+    return count / (time.perf_counter() - t0)
+
+async def bench_batched(session_factory, count: int) -> float:
+    writer = ScoreWriter(session_factory)
+    writer.start()
+    t0 = time.perf_counter()
+    for i in range(count):
+        await writer.submit(f"batch{i % 500}", i % 150)
+    await writer.close()
+    return count / (time.perf_counter() - t0)
+
+async def bench_reads(write_factory, read_factory, readers: int, seconds: float) -> float:
+    query = select(UserBest.username, UserBest.best_wpm).order_by(UserBest.best_wpm.desc(), UserBest.username).limit(10)
+    stop = time.perf_counter() + seconds
+    done = 0
+
+    async def reader():
+        nonlocal done
+        while time.perf_counter() < stop:
+            async with read_factory() as session:
+                (await session.execute(query)).all()
+            done += 1
+
+    async def background_writer():
+        i = 0
+        while time.perf_counter() < stop:
+            async with write_factory() as session:
+                async with session.begin():
+                    await session.execute(insert(Score), [{"username": f"bg{i % 500}", "wpm": i % 150}])
+            i += 1
+
+    await asyncio.gather(background_writer(), *(reader() for _ in range(readers)))
+    return done / seconds
+
+async def run_profile(profile: str, writes: int, readers: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        writer_engine, reader_engine = create_engines(path, profile, read_pool_size=readers)
+        async with writer_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        write_factory = sessionmaker(bind=writer_engine, class_=AsyncSession, expire_on_commit=False)
+        read_factory = sessionmaker(bind=reader_engine, class_=AsyncSession, expire_on_commit=False)
+
+        single = await bench_single(write_factory, writes)
+        batched = await bench_batched(write_factory, writes * 10)
+        reads = await bench_reads(write_factory, read_factory, readers, seconds)
+
+        await writer_engine.dispose()
+        await reader_engine.dispose()
+
+    print(f"{profile:<8} | single {single:10.0f} rows/s | batched {batched:10.0f} rows/s | read {reads:10.0f} queries/s")
+
+async def main(profiles, writes, readers, seconds):
+    print("=== BENCHMARK PROFIL DATABASE ===")
+    for profile in profiles:
+        await run_profile(profile, writes, readers, seconds)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark profil SQLite')
+    parser.add_argument('--profiles', nargs="+", choices=sorted(DB_PROFILES), default=list(DB_PROFILES), help="Profil yang diuji")
+    parser.add_argument('--writes', type=int, default=2000, help="Jumlah transaksi tulis tunggal")
+    parser.add_argument('--readers', type=int, default=4, help="Jumlah pembaca paralel")
+    parser.add_argument('--seconds', type=float, default=3.0, help="Durasi uji baca")
+    given_args = parser.parse_args()
+    asyncio.run(main(given_args.profiles, given_args.writes, given_args.readers, given_args.seconds))
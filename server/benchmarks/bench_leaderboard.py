@@ -0,0 +1,85 @@
+import asyncio
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from extensions import Base, run_migrations
+from models.score import Score
+from models.user_best import UserBest
+
+# Benchmark latensi query leaderboard:
+# - "aggregate": GROUP BY username + max(wpm) atas seluruh tabel scores (cara lama)
+# - "user_best": bounded index scan pada tabel user_best (cara baru)
+# Contoh: python benchmarks/bench_leaderboard.py --rows 10000 100000 1000000
+
+def populate(path: str, rows: int, users: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = 100_000
+    rng = random.Random(rows)
+    for start in range(0, rows, batch):
+        size = min(batch, rows - start)
+        conn.executemany(
+            "INSERT INTO scores (username, wpm) VALUES (?, ?)",
+            ((f"user{rng.randrange(users)}", rng.randint(10, 180)) for _ in range(size))
+        )
+    conn.commit()
+    conn.close()
+
+async def time_query(engine, query, repeat: int) -> float:
+    samples = []
+    async with engine.connect() as conn:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            (await conn.execute(query)).all()
+            samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+async def run(rows: int, repeat: int) -> None:
+    users = max(100, min(rows // 20, 200_000))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        populate(path, rows, users)
+
+        t0 = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations, True)
+        backfill = time.perf_counter() - t0
+
+        max_wpm = func.max(Score.wpm).label("max_wpm")
+        old_query = select(Score.username, max_wpm).group_by(Score.username).order_by(max_wpm.desc()).limit(10)
+        new_query = select(UserBest.username, UserBest.best_wpm).order_by(UserBest.best_wpm.desc(), UserBest.username).limit(10)
+
+        old_ms = await time_query(engine, old_query, max(1, min(repeat, 5) if rows > 1_000_000 else repeat))
+        new_ms = await time_query(engine, new_query, repeat)
+        await engine.dispose()
+
+    print(f"{rows:>10} rows | {users:>7} users | backfill {backfill:8.2f}s | aggregate {old_ms:10.3f} ms | user_best {new_ms:8.3f} ms | x{old_ms / max(new_ms, 1e-6):.0f}")
+
+async def main(row_counts, repeat):
+    print("=== BENCHMARK LEADERBOARD (median latency) ===")
+    for rows in row_counts:
+        await run(rows, repeat)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark query leaderboard')
+    parser.add_argument('--rows', nargs="+", type=int, default=[10_000, 100_000], help="Jumlah baris scores yang diuji")
+    parser.add_argument('--repeat', type=int, default=20, help="Jumlah pengulangan query")
+    given_args = parser.parse_args()
+    asyncio.run(main(given_args.rows, given_args.repeat))
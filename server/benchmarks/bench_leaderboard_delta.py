@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.leaderboard_cache import LeaderboardCache
+
+# Benchmark ukuran leaderboard_update: daftar top-N penuh di setiap skor (cara lama) vs. delta berversi.
+# Cache diisi --users user dengan WPM acak, lalu --scores skor kemenangan acak dicatat satu per satu seperti _finish_game:
+# - full  : setiap skor menghasilkan broadcast berisi top-N penuh (dulu dikirim walaupun top-N tidak berubah)
+# - delta : broadcast hanya jika top-N berubah, isinya removed/inserted dari versi sebelumnya
+# Byte dihitung dari JSON satu baris yang dikirim ke satu client; kolom res_leaderboard membandingkan
+# login dengan daftar penuh vs. balasan not_modified untuk client yang versinya masih sama.
+# Contoh: python benchmarks/bench_leaderboard_delta.py --sizes 10 100 1000 --users 50000
+
+def encode(payload):
+    return len(json.dumps(payload)) + 1
+
+def run(size, users, scores, rng):
+    cache = LeaderboardCache(size)
+    cache.rebuild([(f"player{i}", rng.randint(20, 110)) for i in range(users)])
+    full_bytes = delta_bytes = delta_count = 0
+    elapsed = 0.0
+    for _ in range(scores):
+        cache.record(f"player{rng.randrange(users * 2)}", rng.randint(40, 140))
+        full_bytes += encode({"type": "leaderboard_update", "leaderboard": cache.top(size)})
+        t0 = time.perf_counter()
+        delta = cache.delta()
+        elapsed += time.perf_counter() - t0
+        if delta["base"] != delta["version"]:
+            delta_bytes += encode({"type": "leaderboard_update", **delta})
+            delta_count += 1
+    login_full = encode({"type": "res_leaderboard", "data": cache.top(size), "version": cache.version})
+    login_cached = encode({"type": "res_leaderboard", "version": cache.version, "not_modified": True})
+    return full_bytes, delta_bytes, delta_count, elapsed / scores, login_full, login_cached
+
+def main(sizes, users, scores, seed):
+    print(f"{users} user | {scores} skor baru")
+    print(f"{'top-N':>6} | {'full B/skor':>11} | {'delta B/skor':>12} | {'broadcast':>9} | {'hemat':>6} | {'delta()':>8} | "
+          f"{'res_leaderboard':>15} | {'not_modified':>12}")
+    for size in sizes:
+        full_bytes, delta_bytes, delta_count, delta_time, login_full, login_cached = run(size, users, scores, random.Random(seed))
+        print(f"{size:>6} | {full_bytes / scores:>11.0f} | {delta_bytes / scores:>12.1f} | {delta_count / scores:>8.1%} | "
+              f"{full_bytes / max(delta_bytes, 1):>5.0f}x | {delta_time * 1e6:>6.1f}us | {login_full:>14}B | {login_cached:>11}B")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark byte leaderboard_update: daftar penuh vs. delta berversi')
+    parser.add_argument('--sizes', nargs="+", type=int, default=[10, 100, 1000], help="Ukuran top-N")
+    parser.add_argument('--users', type=int, default=50000, help="Jumlah user di leaderboard")
+    parser.add_argument('--scores', type=int, default=5000, help="Jumlah skor baru yang dicatat")
+    parser.add_argument('--seed', type=int, default=1, help="Seed random")
+    given_args = parser.parse_args()
+    main(given_args.sizes, given_args.users, given_args.scores, given_args.seed)
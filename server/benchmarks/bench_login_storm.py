@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+# Benchmark badai login (misalnya semua pemain bridge reconnect bersamaan setelah bridge restart).
+# Server dijalankan dua kali: tanpa admission control, lalu dengan --accept-rate/--accept-burst/--login-timeout.
+# Setiap kasus: --half-open koneksi dibuka tanpa pernah login, lalu --clients koneksi connect + login bersamaan.
+# Dilaporkan: login berhasil dan ditolak, latensi connect -> res_leaderboard (p50/p99/maks), lama badai,
+# dan jumlah koneksi half-open yang masih terbuka setelah --login-timeout (reaper).
+# Contoh: python benchmarks/bench_login_storm.py --clients 2000 --half-open 500 --accept-rate 500 --accept-burst 200
+
+async def login(index, port, latencies):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return False
+    try:
+        writer.write((json.dumps({"type": "login", "username": f"storm{index}"}) + "\n").encode())
+        line = await asyncio.wait_for(reader.readline(), 30)
+        if not line:
+            return False
+        latencies.append(time.perf_counter() - started)
+        return True
+    except (asyncio.TimeoutError, ConnectionError):
+        return False
+    finally:
+        writer.close()
+
+async def still_open(reader):
+    try:
+        return await asyncio.wait_for(reader.read(1), 0.05) != b""
+    except asyncio.TimeoutError:
+        return True
+    except ConnectionError:
+        return False
+
+# Koneksi half-open dibuka sesuai laju accept (pace detik per koneksi) agar semuanya diterima server,
+# lalu ditunggu refill detik sampai token bucket penuh lagi sebelum badai login.
+async def storm(port, clients, half_open, login_timeout, pace, refill):
+    idle = []
+    for _ in range(half_open):
+        idle.append(await asyncio.open_connection("127.0.0.1", port))
+        await asyncio.sleep(pace)
+    await asyncio.sleep(refill)
+
+    latencies = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login(i, port, latencies) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    await asyncio.sleep(max(login_timeout + 1.5 - elapsed, 0))
+    remaining = sum(await asyncio.gather(*(still_open(reader) for reader, _ in idle)))
+    for _, writer in idle:
+        writer.close()
+    latencies.sort()
+    return sum(results), elapsed, latencies, remaining
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server tidak bisa dihubungi di port {port}")
+
+def run_case(port, extra_args, clients, half_open, login_timeout, pace, refill):
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "WARNING", *extra_args],
+            cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            time.sleep(0.5)
+            return asyncio.run(storm(port, clients, half_open, login_timeout, pace, refill))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+def main(clients, half_open, port, accept_rate, accept_burst, login_timeout):
+    cases = [
+        ("tanpa batas", ["--login-timeout", "0"], 0.0, 0.0),
+        ("admission", ["--accept-rate", str(accept_rate), "--accept-burst", str(accept_burst),
+                       "--login-timeout", str(login_timeout)], 1 / accept_rate, accept_burst / accept_rate),
+    ]
+    print(f"login bersamaan: {clients} | koneksi half-open: {half_open} | accept-rate {accept_rate}/s, burst {accept_burst}")
+    print(f"{'kasus':>12} | {'login':>6} | {'ditolak':>7} | {'p50':>8} | {'p99':>8} | {'maks':>8} | {'badai':>7} | {'half-open sisa':>14}")
+    for index, (name, extra_args, pace, refill) in enumerate(cases):
+        ok, elapsed, latencies, remaining = run_case(port + index, extra_args, clients, half_open, login_timeout, pace, refill)
+        print(f"{name:>12} | {ok:>6} | {clients - ok:>7} | {percentile(latencies, 0.5) * 1000:>6.0f}ms | "
+              f"{percentile(latencies, 0.99) * 1000:>6.0f}ms | {(latencies[-1] if latencies else 0) * 1000:>6.0f}ms | "
+              f"{elapsed:>6.2f}s | {remaining:>14}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark badai login dengan dan tanpa admission control')
+    parser.add_argument('--clients', type=int, default=2000, help="Jumlah koneksi yang login bersamaan")
+    parser.add_argument('--half-open', type=int, default=500, help="Jumlah koneksi yang dibuka tanpa login")
+    parser.add_argument('--port', type=int, default=50700, help="Port awal server uji")
+    parser.add_argument('--accept-rate', type=float, default=500, help="--accept-rate untuk kasus admission")
+    parser.add_argument('--accept-burst', type=int, default=200, help="--accept-burst untuk kasus admission")
+    parser.add_argument('--login-timeout', type=float, default=2.0, help="--login-timeout untuk kasus admission")
+    given_args = parser.parse_args()
+    main(given_args.clients, given_args.half_open, given_args.port, given_args.accept_rate, given_args.accept_burst,
+         given_args.login_timeout)
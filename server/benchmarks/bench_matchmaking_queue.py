@@ -0,0 +1,70 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.matchmaking_queue import MatchQueue
+
+# Benchmark antrean matchmaking: list lama vs. MatchQueue.
+# Skenario: n pemain masuk antrean (dengan cek "sudah antre?"), setengahnya membatalkan secara acak,
+# sebagian kecil koneksi sudah tertutup, lalu sisanya dikeluarkan satu per satu.
+# Contoh: python benchmarks/bench_matchmaking_queue.py --sizes 10000 50000 100000
+
+class FakeWriter:
+    __slots__ = ("closing",)
+
+    def __init__(self, closing: bool):
+        self.closing = closing
+
+    def is_closing(self) -> bool:
+        return self.closing
+
+def run_list(players, cancels) -> float:
+    t0 = time.perf_counter()
+    queue = []
+    for p in players:
+        if p not in queue:
+            queue.append(p)
+    for p in cancels:
+        if p in queue:
+            queue.remove(p)
+    while queue:
+        p = queue.pop(0)
+        if p.is_closing():
+            continue
+    return time.perf_counter() - t0
+
+def run_match_queue(players, cancels) -> float:
+    t0 = time.perf_counter()
+    queue = MatchQueue()
+    for p in players:
+        if p not in queue:
+            queue.push(p)
+    for p in cancels:
+        queue.discard(p)
+    while queue:
+        p = queue.popleft()
+        if p.is_closing():
+            continue
+    return time.perf_counter() - t0
+
+def main(sizes, skip_list_above):
+    print(f"{'players':>8} | {'list':>10} | {'MatchQueue':>10}")
+    for n in sizes:
+        rng = random.Random(n)
+        players = [FakeWriter(rng.random() < 0.05) for _ in range(n)]
+        cancels = rng.sample(players, n // 2)
+        list_time = f"{run_list(players, cancels):9.3f}s" if n <= skip_list_above else "   skipped"
+        print(f"{n:>8} | {list_time:>10} | {run_match_queue(players, cancels):9.3f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark antrean matchmaking')
+    parser.add_argument('--sizes', nargs="+", type=int, default=[10_000, 50_000, 100_000], help="Jumlah pemain dalam antrean")
+    parser.add_argument('--skip-list-above', type=int, default=50_000, help="Lewati implementasi list untuk ukuran di atas nilai ini")
+    given_args = parser.parse_args()
+    main(given_args.sizes, given_args.skip_list_above)
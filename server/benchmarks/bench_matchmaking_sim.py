@@ -0,0 +1,88 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.matchmaking_engine import MatchmakingEngine
+
+# Simulasi matchmaking berbasis rating dengan waktu virtual.
+# Pemain datang dengan laju --rate per detik, rating ~ Normal(--mean, --stdev).
+# Dilaporkan: latensi match (lama menunggu), rentang rating dalam satu room, dan biaya CPU per operasi.
+# Contoh: python benchmarks/bench_matchmaking_sim.py --players 100000 --rate 2000 --room-size 8
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main(players, rate, mean, stdev, sweep_interval, seed, room_size):
+    rng = random.Random(seed)
+    engine = MatchmakingEngine()
+    waits, gaps = [], []
+    peak_waiting = 0
+    ratings = {}
+
+    now = 0.0
+    next_sweep = sweep_interval
+    cpu = 0.0
+    ops = 0
+
+    def record(group, at):
+        for member in group:
+            waits.append(at - ratings[member][1])
+        group_ratings = [ratings[member][0] for member in group]
+        gaps.append(max(group_ratings) - min(group_ratings))
+
+    for player in range(players):
+        now += rng.expovariate(rate)
+        while next_sweep <= now:
+            t0 = time.perf_counter()
+            groups = engine.sweep(next_sweep, room_size)
+            cpu += time.perf_counter() - t0
+            ops += 1
+            for group in groups:
+                record(group, next_sweep)
+            next_sweep += sweep_interval
+
+        rating = min(200.0, max(5.0, rng.gauss(mean, stdev)))
+        ratings[player] = (rating, now)
+
+        t0 = time.perf_counter()
+        partners = engine.find_group(rating, now, room_size - 1)
+        if len(partners) == room_size - 1:
+            for partner in partners:
+                engine.remove(partner)
+        else:
+            engine.add(player, rating, now)
+        cpu += time.perf_counter() - t0
+        ops += 1
+
+        if len(partners) == room_size - 1:
+            record([player, *partners], now)
+        peak_waiting = max(peak_waiting, len(engine))
+
+    matched = len(waits)
+    print("=== SIMULASI MATCHMAKING ===")
+    print(f"pemain          : {players} (laju {rate}/s, rating {mean}±{stdev}, room {room_size})")
+    print(f"dipasangkan     : {matched} ({matched / players:.1%}), masih menunggu {len(engine)}, puncak antrean {peak_waiting}")
+    print(f"latensi match   : p50 {percentile(waits, 50):.2f}s | p90 {percentile(waits, 90):.2f}s | p99 {percentile(waits, 99):.2f}s | max {max(waits or [0]):.2f}s")
+    print(f"rentang rating  : p50 {percentile(gaps, 50):.2f} | p90 {percentile(gaps, 90):.2f} | p99 {percentile(gaps, 99):.2f} | max {max(gaps or [0]):.2f}")
+    print(f"biaya CPU       : {cpu / max(ops, 1) * 1e6:.1f} µs/operasi ({ops} operasi)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulasi matchmaking berbasis rating')
+    parser.add_argument('--players', type=int, default=100_000, help="Jumlah pemain yang datang")
+    parser.add_argument('--rate', type=float, default=2000.0, help="Kedatangan pemain per detik")
+    parser.add_argument('--mean', type=float, default=60.0, help="Rata-rata rating (WPM)")
+    parser.add_argument('--stdev', type=float, default=20.0, help="Simpangan baku rating")
+    parser.add_argument('--sweep-interval', type=float, default=1.0, help="Interval sweep (detik)")
+    parser.add_argument('--seed', type=int, default=1, help="Seed random")
+    parser.add_argument('--room-size', type=int, default=2, help="Jumlah pemain per room")
+    given_args = parser.parse_args()
+    main(given_args.players, given_args.rate, given_args.mean, given_args.stdev, given_args.sweep_interval, given_args.seed, given_args.room_size)
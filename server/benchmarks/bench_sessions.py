@@ -0,0 +1,90 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.session import SessionRegistry
+
+# Benchmark memori state per koneksi untuk n koneksi idle yang sudah login.
+# - dicts   : susunan lama, state tersebar di beberapa dict/set yang dikunci StreamWriter
+#             (player_usernames, outbound, active_connections, game_states, waiting_events)
+# - session : satu Session (__slots__) per koneksi di SessionRegistry dengan id integer
+# Writer dan antrean keluar (objek pengganti) dibuat sama persis di kedua skenario; yang diukur adalah tambahan memori
+# di atasnya, ditambah waktu membersihkan semua koneksi (disconnect).
+# Contoh: python benchmarks/bench_sessions.py --connections 50000
+
+class FakeWriter:
+
+    def is_closing(self) -> bool:
+        return False
+
+class FakeQueue:
+    __slots__ = ("writer",)
+
+    def __init__(self, writer):
+        self.writer = writer
+
+def make_connections(n):
+    writers = [FakeWriter() for _ in range(n)]
+    return writers, [FakeQueue(w) for w in writers]
+
+def run_dicts(writers, queues):
+    player_usernames, outbound, game_states, waiting_events = {}, {}, {}, {}
+    active_connections = set()
+    for i, (writer, queue) in enumerate(zip(writers, queues)):
+        outbound[writer] = queue
+        player_usernames[writer] = f"user{i}"
+        active_connections.add(writer)
+    state = (player_usernames, outbound, game_states, waiting_events, active_connections)
+
+    def cleanup():
+        for writer in writers:
+            active_connections.discard(writer)
+            player_usernames.pop(writer, None)
+            outbound.pop(writer, None)
+            game_states.pop(writer, None)
+            waiting_events.pop(writer, None)
+    return state, cleanup
+
+def run_sessions(writers, queues):
+    registry = SessionRegistry()
+    for i, (writer, queue) in enumerate(zip(writers, queues)):
+        registry.login(registry.open(writer, queue), f"user{i}")
+
+    def cleanup():
+        for session in list(registry):
+            registry.close(session)
+    return registry, cleanup
+
+def measure(n, impl):
+    gc.collect()
+    tracemalloc.start()
+    writers, queues = make_connections(n)
+    base = tracemalloc.get_traced_memory()[0]
+    state, cleanup = impl(writers, queues)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    cleanup()
+    elapsed = time.perf_counter() - t0
+    return used, elapsed, state
+
+def main(sizes):
+    print(f"{'koneksi':>8} | {'impl':>7} | {'memori':>9} | {'per koneksi':>11} | {'cleanup':>9}")
+    for n in sizes:
+        for name, impl in (("dicts", run_dicts), ("session", run_sessions)):
+            used, elapsed, _ = measure(n, impl)
+            print(f"{n:>8} | {name:>7} | {used / 1024 / 1024:>6.1f} MB | {used / n:>9.0f} B | {elapsed * 1000:>7.1f}ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark memori registry session vs. dict per writer')
+    parser.add_argument('--connections', nargs="+", type=int, default=[10_000, 50_000], help="Jumlah koneksi idle")
+    given_args = parser.parse_args()
+    main(given_args.connections)
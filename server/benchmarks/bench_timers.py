@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.timer_wheel import TimerWheel
+
+# Benchmark timer batas waktu balapan: satu task asyncio.sleep per room (cara lama) vs. satu TimerWheel.
+# Skenario: n room dijadwalkan dengan batas waktu --timeout detik, lalu sebagian (--finish-ratio) selesai lebih awal.
+# Cara lama tidak bisa membatalkan sleep (task tetap hidup sampai timeout); wheel membatalkan timer dalam O(1).
+# Dilaporkan: waktu menjadwalkan, memori yang dipakai, waktu membatalkan, dan jumlah timer yang masih tertunda.
+# Contoh: python benchmarks/bench_timers.py --rooms 1000 10000 50000
+
+async def monitor(timeout, room):
+    await asyncio.sleep(timeout)
+    if room["finished"]:
+        return
+
+async def run_tasks(n, timeout, finish_ratio):
+    rooms = [{"finished": False} for _ in range(n)]
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(monitor(timeout, room)) for room in rooms]
+    await asyncio.sleep(0)
+    schedule = time.perf_counter() - t0
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for room in rooms[:int(n * finish_ratio)]:
+        room["finished"] = True
+    finish = time.perf_counter() - t0
+    pending = sum(1 for task in tasks if not task.done())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return schedule, memory, finish, pending
+
+async def run_wheel(n, timeout, finish_ratio):
+    rooms = [{"finished": False} for _ in range(n)]
+    wheel = TimerWheel()
+    wheel.start()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    timers = [wheel.schedule(timeout, lambda room: None, room) for room in rooms]
+    await asyncio.sleep(0)
+    schedule = time.perf_counter() - t0
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for room, timer in zip(rooms[:int(n * finish_ratio)], timers):
+        room["finished"] = True
+        wheel.cancel(timer)
+    finish = time.perf_counter() - t0
+    pending = len(wheel)
+    await wheel.close()
+    return schedule, memory, finish, pending
+
+def main(sizes, timeout, finish_ratio):
+    print(f"{'rooms':>7} | {'impl':>6} | {'jadwal':>9} | {'memori':>9} | {'selesai':>9} | {'tertunda':>8}")
+    for n in sizes:
+        for name, impl in (("tasks", run_tasks), ("wheel", run_wheel)):
+            schedule, memory, finish, pending = asyncio.run(impl(n, timeout, finish_ratio))
+            print(f"{n:>7} | {name:>6} | {schedule * 1000:>7.1f}ms | {memory / 1024 / 1024:>6.1f} MB | "
+                  f"{finish * 1000:>7.2f}ms | {pending:>8}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark timer per room vs. timer wheel')
+    parser.add_argument('--rooms', nargs="+", type=int, default=[1_000, 10_000, 50_000], help="Jumlah room yang dijadwalkan")
+    parser.add_argument('--timeout', type=float, default=92.0, help="Batas waktu balapan (detik)")
+    parser.add_argument('--finish-ratio', type=float, default=0.9, help="Porsi room yang selesai sebelum batas waktu")
+    given_args = parser.parse_args()
+    main(given_args.rooms, given_args.timeout, given_args.finish_ratio)
@@ -0,0 +1,106 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from services.corpus import BUILTIN_TEXTS
+from services.typing_engine import TargetText, TypingState
+
+# Benchmark biaya validasi ketikan di server per keystroke.
+# Setiap pemain mengetik satu teks dari text pool dengan peluang salah ketik --error-rate (huruf salah lalu backspace);
+# delta input dibuat lebih dulu, lalu diproses bergiliran antar pemain seperti banyak room yang berjalan bersamaan.
+# - incremental: TypingState.apply + progress + jumlah karakter dihitung (yang dipakai GameController)
+# - full       : input disimpan utuh dan dihitung ulang per kata setiap keystroke (algoritma browser lama), O(panjang input)
+# Kapasitas dihitung untuk pemain 60 WPM (5 keystroke per detik) pada satu core.
+# Contoh: python benchmarks/bench_typing.py --players 1000 --error-rate 0.05
+
+def make_deltas(text, error_rate, rng):
+    deltas = []
+    for pos, char in enumerate(text):
+        if rng.random() < error_rate:
+            deltas.append((pos, "#"))
+            deltas.append((pos, ""))
+        deltas.append((pos, char))
+    return deltas
+
+def full_counted(value, text):
+    input_words = value.split(" ")
+    target_words = text.split(" ")
+    counted = 0
+    for i, word in enumerate(input_words):
+        if i >= len(target_words):
+            break
+        if word == target_words[i]:
+            counted += len(word)
+            if (i < len(input_words) - 1 or value.endswith(" ")) and i < len(target_words) - 1:
+                counted += 1
+    return counted
+
+def run_incremental(players):
+    states = [(TypingState(), target) for target, _ in players]
+    streams = [deltas for _, deltas in players]
+    rounds = max(len(deltas) for deltas in streams)
+    checksum = 0
+    t0 = time.perf_counter()
+    for step in range(rounds):
+        for (state, target), deltas in zip(states, streams):
+            if step < len(deltas):
+                pos, text = deltas[step]
+                state.apply(target, pos, text)
+                state.progress(target)
+                checksum += state.counted(target)
+    return time.perf_counter() - t0, checksum
+
+def run_full(players):
+    values = [""] * len(players)
+    rounds = max(len(deltas) for _, deltas in players)
+    checksum = 0
+    t0 = time.perf_counter()
+    for step in range(rounds):
+        for i, (target, deltas) in enumerate(players):
+            if step < len(deltas):
+                pos, text = deltas[step]
+                value = values[i] = values[i][:pos] + text
+                counted = full_counted(value, target.text)
+                counted / target.length * 100
+                checksum += counted
+    return time.perf_counter() - t0, checksum
+
+def main(player_count, error_rate, seed):
+    rng = random.Random(seed)
+    pool = BUILTIN_TEXTS
+    targets = [TargetText(text) for text in pool]
+    t0 = time.perf_counter()
+    for text in pool:
+        TargetText(text)
+    compile_us = (time.perf_counter() - t0) / len(pool) * 1e6
+
+    players = []
+    for _ in range(player_count):
+        target = rng.choice(targets)
+        players.append((target, make_deltas(target.text, error_rate, rng)))
+    keystrokes = sum(len(deltas) for _, deltas in players)
+
+    print(f"pemain: {player_count} | keystroke: {keystrokes} | salah ketik: {error_rate:.0%} | kompilasi teks: {compile_us:.0f} us/teks")
+    print(f"{'metode':>12} | {'total':>8} | {'ns/keystroke':>12} | {'keystroke/s':>12} | {'pemain 60 WPM':>13}")
+    results = {}
+    for name, runner in (("incremental", run_incremental), ("full", run_full)):
+        elapsed, checksum = runner(players)
+        results[name] = checksum
+        rate = keystrokes / elapsed
+        print(f"{name:>12} | {elapsed:>7.2f}s | {elapsed / keystrokes * 1e9:>12.0f} | {rate:>12.0f} | {rate / 5:>13.0f}")
+    if results["incremental"] != results["full"]:
+        print("PERINGATAN: jumlah karakter dihitung berbeda antara kedua metode")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark validasi ketikan per keystroke di server')
+    parser.add_argument('--players', type=int, default=1000, help="Jumlah pemain yang mengetik bersamaan")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Peluang salah ketik per karakter")
+    parser.add_argument('--seed', type=int, default=1, help="Seed random")
+    given_args = parser.parse_args()
+    main(given_args.players, given_args.error_rate, given_args.seed)
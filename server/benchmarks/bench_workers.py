@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+# Load test mode multi-proses: menjalankan server.py dengan --workers N untuk setiap N, lalu membanjiri server dengan
+# pemain sintetis (login -> matchmaking -> kirim --keystrokes pesan progress -> finish -> ulangi).
+# Pembangkit beban berjalan di beberapa proses terpisah agar tidak menjadi bottleneck.
+# Dilaporkan: match selesai per detik, pesan progress yang dikirim per detik, dan room_progress yang diterima per detik.
+# Contoh: python benchmarks/bench_workers.py --workers 1,2,4 --players 400 --duration 20
+# Server dijalankan dengan --typing-mode client karena pemain sintetis mengirim progress/finish, bukan delta input.
+# Catatan: hasil hanya bermakna jika mesin punya core yang cukup untuk worker DAN pembangkit beban.
+
+async def read_until(reader, types, deadline, stats):
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await asyncio.wait_for(reader.readline(), max(deadline - loop.time(), 0.01))
+        if not line:
+            raise ConnectionError("server menutup koneksi")
+        msg = json.loads(line)
+        if msg.get("type") == "room_progress":
+            stats["room_progress"] += 1
+        kind = msg.get("type") or msg.get("status")
+        if kind in types:
+            return msg
+
+async def player(name, port, keystrokes, interval, stop_at, stats):
+    loop = asyncio.get_running_loop()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((json.dumps({"type": "login", "username": name}) + "\n").encode())
+    try:
+        await read_until(reader, {"res_leaderboard"}, stop_at, stats)
+        while loop.time() < stop_at:
+            writer.write(b'{"type":"req_matchmaking"}\n')
+            await read_until(reader, {"start_game"}, stop_at, stats)
+
+            for i in range(keystrokes):
+                progress = (i + 1) * 100 / (keystrokes + 1)
+                writer.write(f'{{"type":"progress","progress":{progress:.2f},"wpm":80}}\n'.encode())
+                stats["progress"] += 1
+                if interval > 0:
+                    await writer.drain()
+                    await asyncio.sleep(interval)
+                elif i % 16 == 15:
+                    await writer.drain()
+            writer.write(b'{"type":"finish","wpm":80}\n')
+
+            result = await read_until(reader, {"game_over", "opponent_disconnected"}, stop_at + 5, stats)
+            if result.get("result") == "won":
+                stats["matches"] += 1
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+def load_process(args):
+    index, players, port, keystrokes, interval, duration = args
+
+    async def run():
+        stats = {"matches": 0, "progress": 0, "room_progress": 0}
+        stop_at = asyncio.get_running_loop().time() + duration
+        await asyncio.gather(*(player(f"load{index}_{i}", port, keystrokes, interval, stop_at, stats) for i in range(players)),
+                             return_exceptions=True)
+        return stats
+
+    return asyncio.run(run())
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server tidak bisa dihubungi di port {port}")
+
+def run_case(workers, players, procs, port, keystrokes, interval, duration):
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SERVER_DIR, "server.py"), "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(workers), "--typing-mode", "client", "--log-level", "WARNING"],
+            cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            time.sleep(0.5)
+            per_proc = [players // procs + (1 if i < players % procs else 0) for i in range(procs)]
+            started = time.perf_counter()
+            with multiprocessing.Pool(procs) as pool:
+                results = pool.map(load_process, [(i, n, port, keystrokes, interval, duration) for i, n in enumerate(per_proc)])
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    total = {key: sum(r[key] for r in results) for key in results[0]}
+    return {key: value / elapsed for key, value in total.items()}
+
+def main(worker_counts, players, procs, port, keystrokes, interval, duration):
+    print(f"cpu: {os.cpu_count()} core | pemain: {players} | proses beban: {procs} | durasi: {duration}s")
+    print(f"{'workers':>7} {'match/s':>9} {'progress/s':>11} {'room_prog/s':>12} {'speedup':>8}")
+    baseline = None
+    for index, workers in enumerate(worker_counts):
+        result = run_case(workers, players, procs, port + index, keystrokes, interval, duration)
+        baseline = baseline or result["progress"] or 1
+        print(f"{workers:>7} {result['matches']:>9.1f} {result['progress']:>11.0f} {result['room_progress']:>12.0f} "
+              f"{result['progress'] / baseline:>7.2f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test server dengan beberapa worker')
+    parser.add_argument('--workers', default="1,2,4", help="Daftar jumlah worker yang diuji, dipisah koma")
+    parser.add_argument('--players', type=int, default=400, help="Jumlah pemain sintetis")
+    parser.add_argument('--procs', type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Jumlah proses pembangkit beban")
+    parser.add_argument('--port', type=int, default=51500, help="Port awal (setiap kasus memakai port berbeda)")
+    parser.add_argument('--keystrokes', type=int, default=200, help="Pesan progress per pemain per match")
+    parser.add_argument('--interval', type=float, default=0.005, help="Jeda antar pesan progress (detik, 0 = secepat mungkin)")
+    parser.add_argument('--duration', type=float, default=20.0, help="Lama setiap kasus (detik)")
+    given_args = parser.parse_args()
+    main([int(n) for n in given_args.workers.split(",")], given_args.players, given_args.procs,
+         given_args.port, given_args.keystrokes, given_args.interval, given_args.duration)
@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import Dict, List, Optional
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.dirname(SERVER_DIR))
+
+from common.codec import get_codec
+from services.typing_engine import TargetText
+
+# Load generator headless untuk server TCP (tanpa browser maupun bridge).
+# Membuka banyak koneksi yang berbicara protokol login / req_matchmaking / input, lalu setiap pemain
+# mengetik teks target dengan kecepatan WPM masing-masing (acak ~ Normal(--wpm, --wpm-stdev)).
+# Dengan --typing progress pemain mengirim progress / finish seperti client lama (server --typing-mode client).
+#
+# Yang diukur:
+# - connect   : waktu dari membuka koneksi sampai res_leaderboard diterima (login round trip)
+# - queue     : waktu dari req_matchmaking sampai pesan matched
+# - relay     : waktu dari input/progress dikirim seorang pemain sampai nilainya terlihat di room_progress milik lawan
+#               (hanya untuk lawan yang dijalankan oleh proses load generator yang sama)
+# - matches/s : room yang selesai (game_over) per detik
+# - rss       : memori proses server (--server-pid, termasuk proses anak pada mode --workers)
+#
+# Ringkasan akhir bisa ditulis sebagai JSON (--json) dan dibandingkan dengan hasil sebelumnya (--compare).
+# Contoh soak 10 menit dengan 2000 koneksi:
+#   python benchmarks/loadgen.py --port 50000 --players 2000 --duration 600 --server-pid 1234 --json hasil.json
+#   python benchmarks/loadgen.py --port 50000 --players 2000 --duration 600 --compare hasil.json
+
+RESERVOIR_SIZE = 100_000
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+# Sampel latensi: data per interval laporan + reservoir berukuran tetap untuk ringkasan seluruh run.
+class Samples:
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.window: List[float] = []
+        self.reservoir: List[float] = []
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.window.append(value)
+        self.count += 1
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(value)
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.reservoir[slot] = value
+
+    def take_window(self) -> List[float]:
+        window, self.window = self.window, []
+        return window
+
+class Stats:
+
+    def __init__(self, seed: int):
+        rng = random.Random(seed)
+        self.connect = Samples(rng)
+        self.queue = Samples(rng)
+        self.relay = Samples(rng)
+        self.connected = 0
+        self.failed = 0
+        self.disconnected = 0
+        self.matches = 0
+        self.progress_sent = 0
+        self.room_progress = 0
+
+# Total RSS proses beserta seluruh turunannya (Linux /proc). None jika tidak tersedia.
+def rss_bytes(pid: int) -> Optional[int]:
+    total = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            try:
+                with open(f"/proc/{current}/task/{current}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+            except OSError:
+                pass
+    except (OSError, ValueError):
+        return None if total == 0 else total
+    return total
+
+class SimPlayer:
+
+    def __init__(self, name: str, wpm: float, generator: "LoadGenerator"):
+        self.name = name
+        self.wpm = wpm
+        self.gen = generator
+        self.codec = get_codec(generator.protocol)
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # Waktu kirim setiap nilai progress (dalam seperseratus persen) untuk mengukur latensi relay
+        self.sent_at: Dict[int, float] = {}
+        self.seen: Dict[int, int] = {}
+        self.players: List[str] = []
+        self.seat = 0
+        self.typing: Optional[asyncio.Task] = None
+        self.queued_at = 0.0
+
+    def send(self, payload: dict) -> None:
+        self.writer.write(self.codec.encode(payload))
+
+    async def run(self) -> None:
+        gen, stats = self.gen, self.gen.stats
+        started = time.monotonic()
+        try:
+            reader, self.writer = await asyncio.wait_for(asyncio.open_connection(gen.host, gen.port), gen.connect_timeout)
+            self.writer.write((json.dumps({"type": "login", "username": self.name, "protocol": gen.protocol}) + "\n").encode())
+            first = await asyncio.wait_for(self.codec.read(reader), gen.connect_timeout)
+            if first is None:
+                raise ConnectionError("login ditolak")
+        except (OSError, asyncio.TimeoutError, ConnectionError, ValueError):
+            stats.failed += 1
+            return
+
+        stats.connect.add(time.monotonic() - started)
+        stats.connected += 1
+        try:
+            self.request_match()
+            while True:
+                try:
+                    message = await self.codec.read(reader)
+                except ValueError:
+                    continue
+                if message is None:
+                    break
+                self.handle(message)
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            stats.connected -= 1
+            if not gen.stopping:
+                stats.disconnected += 1
+            if self.typing:
+                self.typing.cancel()
+            self.writer.close()
+
+    def request_match(self) -> None:
+        if self.gen.stopping:
+            return
+        self.queued_at = time.monotonic()
+        self.send({"type": "req_matchmaking"})
+
+    def handle(self, message: dict) -> None:
+        stats = self.gen.stats
+        kind = message.get("type") or message.get("status")
+
+        if kind == "room_progress":
+            stats.room_progress += 1
+            now = time.monotonic()
+            for seat, value in enumerate(message.get("progress", ())):
+                if seat == self.seat or seat >= len(self.players):
+                    continue
+                key = round((value or 0) * 100)
+                if self.seen.get(seat) == key:
+                    continue
+                self.seen[seat] = key
+                sender = self.gen.players.get(self.players[seat])
+                sent = sender.sent_at.get(key) if sender else None
+                if sent is not None:
+                    stats.relay.add(now - sent)
+        elif kind == "matched":
+            stats.queue.add(time.monotonic() - self.queued_at)
+            self.players = message.get("players") or [self.name, message.get("opponent")]
+            self.seat = message.get("seat", 0)
+            self.seen = {}
+        elif kind == "start_game":
+            self.typing = asyncio.create_task(self.type_text(message.get("text", "")))
+        elif kind == "game_over":
+            self.stop_typing()
+            ranking = message.get("ranking") or []
+            if (ranking and ranking[0].get("username") == self.name) or (not ranking and message.get("result") == "won"):
+                stats.matches += 1
+            asyncio.get_running_loop().call_later(self.gen.think_time, self.request_match)
+        elif kind == "opponent_disconnected":
+            self.stop_typing()
+            asyncio.get_running_loop().call_later(self.gen.think_time, self.request_match)
+
+    def stop_typing(self) -> None:
+        if self.typing:
+            self.typing.cancel()
+            self.typing = None
+
+    # Mengetik satu karakter setiap 60 / (wpm * 5) detik; satu pesan per karakter seperti browser.
+    # Mode input: progress di room_progress hanya berubah di batas kata, jadi waktu kirim dicatat untuk nilai
+    # progress yang akan dihitung server (TargetText yang sama), bukan untuk setiap karakter.
+    async def type_text(self, text: str) -> None:
+        length = max(len(text), 1)
+        target = TargetText(text)
+        delay = 60 / (self.wpm * 5)
+        self.sent_at = {}
+        next_at = time.monotonic()
+        for typed in range(1, length + 1):
+            next_at += delay
+            pause = next_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if self.gen.typing == "input":
+                if target.counted[typed] != target.counted[typed - 1]:
+                    self.sent_at[round(target.counted[typed] / length * 10000)] = time.monotonic()
+                self.send({"type": "input", "pos": typed - 1, "text": text[typed - 1]})
+            else:
+                progress = round(typed / length * 100, 2)
+                self.sent_at[round(progress * 100)] = time.monotonic()
+                self.send({"type": "progress", "progress": progress, "wpm": round(self.wpm)})
+            self.gen.stats.progress_sent += 1
+        if self.gen.typing != "input":
+            self.send({"type": "finish", "wpm": round(self.wpm)})
+
+class LoadGenerator:
+
+    def __init__(self, args):
+        self.host = args.host
+        self.port = args.port
+        self.protocol = args.protocol
+        self.typing = args.typing
+        self.player_count = args.players
+        self.connect_rate = args.connect_rate
+        self.connect_timeout = args.connect_timeout
+        self.duration = args.duration
+        self.report_interval = args.report_interval
+        self.think_time = args.think_time
+        self.server_pid = args.server_pid
+        self.quiet = args.quiet
+        self.prefix = args.prefix or f"load{random.randrange(100000)}"
+
+        self.rng = random.Random(args.seed)
+        self.wpm_mean = args.wpm
+        self.wpm_stdev = args.wpm_stdev
+        self.stats = Stats(args.seed)
+        self.players: Dict[str, SimPlayer] = {}
+        self.timeline: List[dict] = []
+        self.stopping = False
+
+    async def run(self) -> dict:
+        started = time.monotonic()
+        reporter = asyncio.create_task(self.report_loop(started))
+        tasks = []
+
+        # Koneksi dibuka bertahap (--connect-rate per detik) agar tidak membanjiri backlog accept
+        for i in range(self.player_count):
+            wpm = max(10.0, self.rng.gauss(self.wpm_mean, self.wpm_stdev))
+            player = SimPlayer(f"{self.prefix}_{i}", wpm, self)
+            self.players[player.name] = player
+            tasks.append(asyncio.create_task(player.run()))
+            if self.connect_rate > 0:
+                await asyncio.sleep(1 / self.connect_rate)
+            if time.monotonic() - started >= self.duration:
+                break
+
+        await asyncio.sleep(max(0.0, self.duration - (time.monotonic() - started)))
+        self.stopping = True
+        for player in self.players.values():
+            if player.writer:
+                player.writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        reporter.cancel()
+        self.sample(started, final=True)
+        return self.summary(time.monotonic() - started)
+
+    async def report_loop(self, started: float) -> None:
+        if not self.quiet:
+            print(f"{'t':>6} {'conn':>6} {'match/s':>8} {'prog/s':>8} {'relay p50':>10} {'relay p99':>10} {'rss MB':>8}")
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.sample(started)
+
+    # Satu titik timeline: laju per detik sejak titik sebelumnya dan persentil latensi relay di interval itu.
+    def sample(self, started: float, final: bool = False) -> None:
+        now = time.monotonic()
+        stats = self.stats
+        previous = self.timeline[-1] if self.timeline else {"t": 0.0, "matches": 0, "progress_sent": 0}
+        elapsed = max(now - started - previous["t"], 1e-9)
+        relay = stats.relay.take_window()
+        rss = rss_bytes(self.server_pid) if self.server_pid else None
+        point = {
+            "t": round(now - started, 2),
+            "connections": stats.connected,
+            "matches": stats.matches,
+            "progress_sent": stats.progress_sent,
+            "matches_per_s": round((stats.matches - previous["matches"]) / elapsed, 2),
+            "progress_per_s": round((stats.progress_sent - previous["progress_sent"]) / elapsed, 1),
+            "relay_p50_ms": round(percentile(relay, 50) * 1000, 2),
+            "relay_p99_ms": round(percentile(relay, 99) * 1000, 2),
+            "rss_bytes": rss,
+        }
+        self.timeline.append(point)
+        if not self.quiet and not final:
+            rss_mb = f"{rss / 2**20:.1f}" if rss else "-"
+            print(f"{point['t']:>6.0f} {point['connections']:>6} {point['matches_per_s']:>8.1f} {point['progress_per_s']:>8.0f} "
+                  f"{point['relay_p50_ms']:>10.2f} {point['relay_p99_ms']:>10.2f} {rss_mb:>8}")
+
+    def summary(self, elapsed: float) -> dict:
+        stats = self.stats
+        rss = [p["rss_bytes"] for p in self.timeline if p["rss_bytes"]]
+
+        def ms(samples: Samples, pct: float) -> float:
+            return round(percentile(samples.reservoir, pct) * 1000, 2)
+
+        return {
+            "config": {
+                "players": self.player_count, "protocol": self.protocol, "wpm": self.wpm_mean, "wpm_stdev": self.wpm_stdev,
+                "duration": self.duration, "connect_rate": self.connect_rate, "think_time": self.think_time,
+            },
+            "summary": {
+                "elapsed_s": round(elapsed, 2),
+                "connect_failed": stats.failed,
+                "unexpected_disconnects": stats.disconnected,
+                "matches": stats.matches,
+                "matches_per_s": round(stats.matches / elapsed, 2),
+                "progress_per_s": round(stats.progress_sent / elapsed, 1),
+                "room_progress_per_s": round(stats.room_progress / elapsed, 1),
+                "connect_p50_ms": ms(stats.connect, 50),
+                "connect_p99_ms": ms(stats.connect, 99),
+                "queue_p50_ms": ms(stats.queue, 50),
+                "queue_p99_ms": ms(stats.queue, 99),
+                "relay_p50_ms": ms(stats.relay, 50),
+                "relay_p99_ms": ms(stats.relay, 99),
+                "relay_samples": stats.relay.count,
+                "rss_start_mb": round(rss[0] / 2**20, 1) if rss else None,
+                "rss_peak_mb": round(max(rss) / 2**20, 1) if rss else None,
+                "rss_end_mb": round(rss[-1] / 2**20, 1) if rss else None,
+            },
+            "timeline": self.timeline,
+        }
+
+# Menampilkan selisih ringkasan dengan hasil sebelumnya (mis. server versi lama).
+def print_comparison(current: dict, baseline: dict) -> None:
+    print(f"\n{'metric':<24} {'baseline':>12} {'current':>12} {'delta':>9}")
+    for key, value in current["summary"].items():
+        old = baseline.get("summary", {}).get(key)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+            continue
+        delta = f"{(value - old) / old:+.1%}" if old else "-"
+        print(f"{key:<24} {old:>12} {value:>12} {delta:>9}")
+
+def raise_fd_limit(players: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, players + 256))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+def main(args) -> None:
+    raise_fd_limit(args.players)
+    result = asyncio.run(LoadGenerator(args).run())
+
+    if not args.quiet:
+        print("\n=== RINGKASAN ===")
+        for key, value in result["summary"].items():
+            print(f"{key:<24} {value}")
+    if args.json:
+        output = json.dumps(result, indent=2)
+        if args.json == "-":
+            print(output)
+        else:
+            with open(args.json, "w") as f:
+                f.write(output)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(result, json.load(f))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load generator / soak test untuk TCP game server')
+    parser.add_argument('--host', default="127.0.0.1", help="Host server")
+    parser.add_argument('--port', type=int, required=True, help="Port server")
+    parser.add_argument('--players', type=int, default=1000, help="Jumlah koneksi pemain")
+    parser.add_argument('--protocol', choices=["json", "binary"], default="json", help="Protokol yang dipakai pemain")
+    parser.add_argument('--typing', choices=["input", "progress"], default="input", help="Kirim delta input (validasi server) atau progress/finish (client lama)")
+    parser.add_argument('--wpm', type=float, default=60.0, help="Rata-rata kecepatan mengetik (WPM)")
+    parser.add_argument('--wpm-stdev', type=float, default=15.0, help="Simpangan baku kecepatan mengetik")
+    parser.add_argument('--duration', type=float, default=60.0, help="Lama run (detik)")
+    parser.add_argument('--connect-rate', type=float, default=500.0, help="Koneksi baru per detik (0 = sekaligus)")
+    parser.add_argument('--connect-timeout', type=float, default=10.0, help="Batas waktu connect + login (detik)")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Jeda sebelum mencari match berikutnya (detik)")
+    parser.add_argument('--report-interval', type=float, default=5.0, help="Interval laporan berkala (detik)")
+    parser.add_argument('--server-pid', type=int, help="PID server untuk memantau memori (RSS)")
+    parser.add_argument('--prefix', help="Prefix username pemain (default acak)")
+    parser.add_argument('--seed', type=int, default=1, help="Seed random")
+    parser.add_argument('--json', help="Tulis hasil lengkap sebagai JSON ke file ('-' = stdout)")
+    parser.add_argument('--compare', help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument('--quiet', action="store_true", help="Tanpa laporan berkala")
+    main(parser.parse_args())
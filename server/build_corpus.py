@@ -0,0 +1,41 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.corpus import BUILTIN_TEXTS, Corpus, compile_corpus, read_passages
+
+# Skrip untuk mengompilasi file teks (satu teks per baris) menjadi file korpus yang dibaca server lewat --corpus.
+# Teks bawaan server bisa ikut dimasukkan dengan --builtin.
+# Contoh: python build_corpus.py teks/*.txt --builtin -o corpus.bin --tiers 3
+def main(inputs, output, tiers, builtin):
+    print("=== KOMPILASI KORPUS ===")
+    passages = read_passages(inputs)
+    if builtin:
+        # Teks dari file sudah dirapikan oleh read_passages; teks bawaan dirapikan dengan cara yang sama
+        passages = itertools.chain((" ".join(text.split()) for text in BUILTIN_TEXTS), passages)
+
+    started = time.perf_counter()
+    count, per_tier = compile_corpus(passages, output, tiers)
+    elapsed = time.perf_counter() - started
+
+    corpus = Corpus(output)
+    ranges = ", ".join(f"tier {i}: {n} teks (kesulitan {corpus.difficulty(start):.2f}-{corpus.difficulty(start + n - 1):.2f})"
+                       for i, ((start, _), n) in enumerate(zip(corpus.tiers, per_tier)) if n)
+    corpus.close()
+    print(f"[CORPUS] {count} teks ditulis ke {output} ({os.path.getsize(output) / 1e6:.1f} MB) dalam {elapsed:.2f}s")
+    print(f"[CORPUS] {ranges}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kompilasi korpus teks Typing Race')
+    parser.add_argument('inputs', nargs="*", help="File teks, satu teks per baris")
+    parser.add_argument('-o', '--output', action="store", dest="output", default="corpus.bin", help="File korpus yang dihasilkan")
+    parser.add_argument('--tiers', action="store", dest="tiers", type=int, default=3, help="Jumlah tier kesulitan")
+    parser.add_argument('--builtin', action="store_true", dest="builtin", help="Sertakan teks bawaan server")
+    given_args = parser.parse_args()
+    if not given_args.inputs and not given_args.builtin:
+        parser.error("tidak ada teks: berikan file input atau --builtin")
+    main(given_args.inputs, given_args.output, given_args.tiers, given_args.builtin)
@@ -1,194 +1,519 @@
 import asyncio
+import itertools
 import json
 import random
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Set
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from sqlalchemy.future import select
-from sqlalchemy import func 
-from models.score import Score
-
-# Menyimpan pemain, teks target, waktu mulai, progress, WPM, dan winner. Semacam snapshot kondisi game berjalan.
-@dataclass
-class GameState:
-    players: List[asyncio.StreamWriter]
-    target_text: str
+from models.user_best import UserBest
+from services.leaderboard_cache import LeaderboardCache
+from services.score_writer import ScoreWriter
+from services.fanout import Fanout, message_type
+from services.outbound import OutboundQueue, OutboundStats
+from services.matchmaking_engine import MatchmakingEngine, RatingBook
+from services.cluster import LinkedRatingBook, RemotePlayer, WorkerLink
+from services.metrics import Metrics, WAIT_BUCKETS
+from services.timer_wheel import Timer, TimerWheel
+from services.session import Session, SessionRegistry
+from services.mux import MuxChannel
+from services.typing_engine import TargetText, TypingState
+from services.corpus import BUILTIN_TEXTS, Corpus
+from services.admission import Admission
+from common.codec import DEFAULT_CODEC, LineTooLong, get_codec
+from common.mux import decode_frame
+from common.logs import get_logger
+
+logger = get_logger("server")
+progress_logger = get_logger("server.progress")
+
+# Satu room balapan berisi 2 pemain atau lebih: teks target, waktu mulai, progress, WPM, dan winner.
+# Setiap pemain punya nomor kursi (seat) tetap; progress dan WPM disimpan dalam list per kursi
+# agar room_progress bisa dikirim sebagai satu snapshot. Pemain masih berada di room selama player.room menunjuk ke room ini.
+# dirty menandai room yang progress-nya berubah sejak tick terakhir (dikirim oleh scheduler progress).
+# timer adalah timer wheel yang sedang berjalan untuk room ini (tick countdown atau batas waktu balapan).
+# typing berisi state validasi ketikan per kursi (mode typing_mode = "server", lihat services/typing_engine.py).
+@dataclass(eq=False)
+class Room:
+    room_id: int
+    players: List[Session]
+    names: List[str]
+    target: TargetText
     start_time: Optional[float] = None
     finished: bool = False
     winner: Optional[str] = None
-    
-    progress_map: Dict[asyncio.StreamWriter, float] = field(default_factory=dict)
-    wpm_map: Dict[asyncio.StreamWriter, int] = field(default_factory=dict)
+
+    remaining: int = 0
+    progress: List[float] = field(default_factory=list)
+    wpm: List[int] = field(default_factory=list)
+    dirty: bool = False
+    timer: Optional[Timer] = None
+    typing: List[TypingState] = field(default_factory=list)
+
+    def __post_init__(self):
+        for seat, player in enumerate(self.players):
+            player.room = self
+            player.seat = seat
+        self.remaining = len(self.players)
+        self.progress = [0.0] * len(self.players)
+        self.wpm = [0] * len(self.players)
+        self.typing = [TypingState() for _ in self.players]
+
+    @property
+    def target_text(self) -> str:
+        return self.target.text
+
+    # Pemain yang masih terhubung, urut sesuai kursi.
+    def active(self) -> List[Session]:
+        return [p for p in self.players if p.room is self]
+
+    def leave(self, player: Session) -> Optional[int]:
+        if player.room is not self:
+            return None
+        player.room = None
+        self.remaining -= 1
+        return player.seat
 
 class GameController:
 
-    # Dipakai untuk menyiapkan semua struktur data server: antrean pemain, mapping lawan, 
-    # mapping status permainan, daftar text pool, factory session DB, dan set koneksi aktif.
-    def __init__(self, session_factory: Callable):
+    # Dipakai untuk menyiapkan semua struktur data server: registry session koneksi, antrean matchmaking,
+    # room yang sedang berjalan, daftar text pool, dan factory session DB.
+    def __init__(self, session_factory: Callable, read_session_factory: Optional[Callable] = None):
         self.game_duration = 90
-        self.waiting_players: List[asyncio.StreamWriter] = []
-        self.waiting_events: Dict[asyncio.StreamWriter, asyncio.Event] = {}
-        self.opponents: Dict[asyncio.StreamWriter, asyncio.StreamWriter] = {}
-        self.game_states: Dict[asyncio.StreamWriter, GameState] = {}
-        self.player_usernames: Dict[asyncio.StreamWriter, str] = {}
+        self.sessions = SessionRegistry()
+        self.rooms: Dict[int, Room] = {}
+        self.matchmaker: MatchmakingEngine[Session] = MatchmakingEngine()
+        self.matchmaking_sweep_interval = 1.0
+        # Ukuran room: room_size pemain per balapan. Pemain yang sudah menunggu lebih dari room_fill_after detik
+        # boleh memulai room yang belum penuh selama berisi minimal min_room_size pemain.
+        self.room_size = 2
+        self.min_room_size = 2
+        self.room_fill_after = 10.0
+        self.room_ids = itertools.count(1)
+        # Countdown dan batas waktu semua room dijalankan oleh satu timer wheel, bukan task sleep per room.
+        self.timers = TimerWheel()
+        self.matchmaking_task: Optional[asyncio.Task] = None
+        # Batas koneksi, laju accept, batas waktu login, dan session idle (services/admission.py), diperiksa oleh reaper_task.
+        self.admission = Admission()
+        self.reaper_task: Optional[asyncio.Task] = None
+        self.ratings = RatingBook()
         self.session_factory = session_factory
-        self.text_pool = [
-            "Sometimes the problem isn't about time. Not everyone picks the right path for themselves on the first try, and that can be pretty harmful. If you find a path that matches your strengths, you'll go really fast and really far. But the truth is, not everyone can figure that out right away.",
-            "Animal birds are also necessary for environmental balance. Their numbers are decreasing due to hunting and other reasons. This has added to the mess in the food chain. The balance is disturbed and natural imbalance is encouraged.",
-            "Rivers of the Himalayas are perennial, with water usually obtained from melting ice. There is a smooth flow throughout the year. The Himalayas receive heavy rainfall during the monsoon month, causing frequent flooding due to increased water in the rivers.",
-            "Summer is the hottest season of the year although children enjoy it a lot due to the long holiday. It is a very interesting andentertaining season for them as they get a chance to go swimming and enjoy the hilly areas and eat ice cream and theirfavourite fruits.",
-            "Honey bees are a fascinating and important species that play a crucial role in our ecosystem. These small creatures may seem insignificant but they are responsible for the pollination of a significant portion of the worlds food crops.",
-            "Climate change stands as one of the most pressing issues of our time wielding a profound impact on the delicate balance of ecosystems worldwide. One of the most significant consequences of this global phenomenon is its far-reaching effects on biodiversity.",
-            "Water is the lifeblood of our planet essential for all living beings. Yet despite its fundamental importance the world faces an impending water crisis of unprecedented scale. The Global Water Crisis encapsulates a myriad of challenges scarcity pollution unequal distribution and inadequate access to safe drinking water.",
-            "In recent decades, fossil fuels such as coal, oil, and natural gas have remained the primary sources of energy across the globe. However, growing environmental concerns and the finite nature of these resources have prompted several countries to promote alternative, renewable energy sources like solar.",
-            "In true friendship there is skill and determination like that of a best doctor, patience and tenderness like that of a best mother. Every person should try to make such friendship. A scholar believes that if we get a reliable friend, then our life remains safe.",
-            "Literature has been considered as the repast of the elite and the educated. Literature most commonly refers to works of the creative imagination. The literary author is assumed to inhabit the legendary ivory tower which is far removed from the practical concerns of everyday life.",
-            "Discipline is the invisible framework that supports every long-term ambition, and it grows stronger each time we choose consistent effort over comfortable excuses. People often wait for motivation, imagining a burst of energy that will carry them to success, yet motivation is like weather-pleasant when it appears.",
-            "Globalisation has intensified economic and cultural interactions among nations. While some argue that this phenomenon promotes mutual understanding and development, others fear it threatens traditional values and cultural identity. Both perspectives have validity.",
-            "Technology has become an inseparable part of our daily lives, influencing the way we work, communicate, learn, and even think. From the moment we wake up and check our smartphones to the time we go to bed scrolling through social media or watching videos online, technology surrounds us in every possible form. ",
-            "I believe that history should be made a compulsory course in high school because history serves as a window to the past, enabling students to understand the roots of society, the evolution of cultures, and the forces that have shaped the world we live in today.",
-            "Modern communication has transformed dramatically with the rise of digital technology and global connectivity. Every organization now depends on effective collaboration and constant innovation to maintain competitiveness.",
-            "Barbados is an island nation in the eastern Caribbean, known for its white sand beaches, coral reefs, and rich cultural traditions. The capital city, Bridgetown, serves as the political, commercial, and cultural heart of the country.",
-            "Minecraft is a popular sandbox game that allows players to explore, build, and survive in a blocky, pixelated world. Its open-ended gameplay encourages creativity and experimentation, making it one of the most beloved games worldwide.",
-            "The boy's name was Santiago. Dusk was falling as the boy arrived with his herd at an abandoned church. The roof had fallen in long ago, and an enormous sycamore had grown on the spot where the sacristy had once stood.",
-            "Artificial Intelligence has rapidly transforming the functioning of the financial market globally. From high-speed algorithm trading to fraud detection and risk management, AI has become the essential part of the market infrastructure.",
-            "The real task is to observe the storm within: the urge to upgrade, to compare, to display. That same storm heats both the atmosphere and the psyche. When awareness deepens, manipulation loses its hold. The person who knows his phone works perfectly will not bow to an advertisement promising completion through an upgrade."
-        ]
-        self.active_connections: Set[asyncio.StreamWriter] = set()
+        self.read_session_factory = read_session_factory or session_factory
+        self.text_pool = list(BUILTIN_TEXTS)
+        # Teks yang sudah dikompilasi (batas kata) untuk validasi ketikan, dibuat sekali per teks.
+        self.targets: Dict[str, TargetText] = {}
+        # Diisi jika --corpus: teks dipilih dari file korpus (services/corpus.py), text_pool tidak dipakai.
+        # corpus_tier "auto" memilih tier dari rata-rata rating room (0..tier_wpm WPM dibagi rata ke semua tier),
+        # angka berarti selalu tier itu, None berarti acak dari seluruh korpus.
+        self.corpus: Optional[Corpus] = None
+        self.corpus_tier = "auto"
+        self.tier_wpm = 100.0
+        # "server": client mengirim delta input dan server menghitung progress/WPM serta mendeteksi finish.
+        # "client": progress, WPM, dan finish dari client dipercaya apa adanya (client lama).
+        self.typing_mode = "server"
+        self.typing_rejected = 0
+        self.leaderboard_cache = LeaderboardCache()
+        self.score_writer = ScoreWriter(session_factory)
+        self.fanout = Fanout()
+        self.outbound_stats = OutboundStats()
+
+        # Progress dikumpulkan per room lalu dikirim sebagai satu pesan room_progress setiap tick (progress_hz kali per detik).
+        # progress_hz = 0 berarti progress langsung diteruskan setiap kali diterima.
+        self.progress_hz = 10.0
+        self.dirty_rooms: Set[Room] = set()
+        self.progress_task: Optional[asyncio.Task] = None
+        self.progress_received = 0
+        self.progress_forwarded = 0
+
+        # Diisi saat berjalan sebagai worker (--workers N): matchmaking, rating, dan penulisan skor ditangani coordinator.
+        self.cluster: Optional[WorkerLink] = None
+
+        # Diisi oleh enable_metrics (--metrics-port); None berarti instrumentasi nonaktif.
+        self.metrics: Optional[Metrics] = None
+        self.matchmaking_wait = None
+        self.rooms_opened = None
+
+    # Menjadikan controller sebagai worker yang terhubung ke coordinator.
+    def attach_cluster(self, link: WorkerLink) -> None:
+        self.cluster = link
+        self.ratings = LinkedRatingBook(link)
+
+    # Mengaktifkan instrumentasi: fungsi hot path dibungkus pada instance ini saja (bukan class) dengan pengukur durasi,
+    # dan statistik yang sudah ada (antrean keluar, fanout, score writer, cache leaderboard, progress) ikut diekspor.
+    def enable_metrics(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self._safe_send = metrics.timed(self._safe_send, metrics.histogram(
+            "safe_send_seconds", "Time spent in _safe_send (encode + enqueue)"))
+        self._broadcast = metrics.timed(self._broadcast, metrics.histogram(
+            "broadcast_seconds", "Time spent in _broadcast (fanout to a room or all players)"))
+        self._relay_progress = metrics.timed(self._relay_progress, metrics.histogram(
+            "relay_progress_seconds", "Time spent handling one progress message"))
+        self._send_leaderboard = metrics.timed(self._send_leaderboard, metrics.histogram(
+            "send_leaderboard_seconds", "Time spent answering one login or req_leaderboard with the leaderboard"))
+        self._broadcast_leaderboard_update = metrics.timed(self._broadcast_leaderboard_update, metrics.histogram(
+            "broadcast_leaderboard_update_seconds", "Time spent computing and broadcasting one leaderboard delta"))
+        self._record_score = metrics.timed(self._record_score, metrics.histogram(
+            "record_score_seconds", "Time spent recording a winning score"))
+        self.rooms_opened = metrics.counter("rooms_opened", "Race rooms opened by this process")
+
+        metrics.gauge("active_connections", "Logged-in connections", lambda: self.sessions.logged_in)
+        metrics.gauge("open_sessions", "Open TCP connections, including ones that have not logged in", lambda: len(self.sessions))
+        metrics.gauge("active_rooms", "Rooms whose race has not ended yet", lambda: len(self.rooms))
+        metrics.gauge("pending_timers", "Countdown and race timeout timers waiting in the timer wheel", lambda: len(self.timers))
+        metrics.gauge("matchmaking_queue", "Players waiting in the local matchmaking queue", lambda: len(self.matchmaker))
+        metrics.stats("outbound", "Outbound queue statistics", self.outbound_stats.snapshot,
+                      counters=("enqueued", "sent", "coalesced", "evicted"))
+        metrics.stats("fanout", "Fanout statistics", self.fanout.stats, counters=("messages", "deliveries"))
+        self._apply_input = metrics.timed(self._apply_input, metrics.histogram(
+            "apply_input_seconds", "Time spent validating one input delta"))
+        metrics.stats("progress", "Progress relay statistics", self.progress_stats, counters=("received", "forwarded", "rejected"))
+        metrics.stats("leaderboard_cache", "Leaderboard cache statistics", self.leaderboard_cache.stats,
+                      counters=("hits", "misses", "rebuilds"))
+        metrics.stats("admission", "Connection admission statistics", self.admission.stats,
+                      counters=("accepted", "rejected_capacity", "rejected_per_ip", "rejected_rate", "login_timeouts", "oversized", "reaped"))
+        if self.cluster is None:
+            # Dalam mode worker, antrean matchmaking dan penulisan skor diukur oleh coordinator
+            self.matchmaking_wait = metrics.histogram(
+                "matchmaking_wait_seconds", "Time a player spent in the matchmaking queue before a room was opened", WAIT_BUCKETS)
+            metrics.stats("score_writer", "Background score writer statistics", self.score_writer.stats,
+                          counters=("written", "failed", "retries", "commits"))
+
+    # Menyiapkan komponen background controller: cache leaderboard dan penulis skor.
+    async def start(self) -> None:
+        await self.load_leaderboard()
+        self.timers.start()
+        self.reaper_task = asyncio.create_task(self._connection_reaper())
+        if self.cluster is None:
+            await self.load_ratings()
+            self.score_writer.start()
+            self.matchmaking_task = asyncio.create_task(self._matchmaking_sweeper())
+        if self.progress_hz > 0:
+            self.progress_task = asyncio.create_task(self._progress_scheduler())
+
+    # Dipanggil saat server berhenti: menunggu antrean skor selesai ditulis agar tidak ada skor yang hilang.
+    async def shutdown(self) -> None:
+        if self.progress_task:
+            self.progress_task.cancel()
+        if self.matchmaking_task:
+            self.matchmaking_task.cancel()
+        if self.reaper_task:
+            self.reaper_task.cancel()
+        await self.timers.close()
+        if self.cluster:
+            await self.cluster.close()
+            return
+        logger.info("Menulis sisa antrean skor (%d)...", self.score_writer.queue.qsize())
+        await self.score_writer.close()
+
+    # Memuat rating matchmaking (rata-rata WPM per user) dari database.
+    async def load_ratings(self) -> None:
+        try:
+            await self.ratings.load(self.read_session_factory)
+            logger.info("Rating matchmaking dimuat: %d user.", len(self.ratings.ratings))
+        except Exception as exc:
+            logger.error("Gagal memuat rating matchmaking: %s", exc)
+
+    # Memuat cache leaderboard dari database. Dipanggil sekali setelah init_db saat server start.
+    async def load_leaderboard(self) -> None:
+        try:
+            await self.leaderboard_cache.load(self.read_session_factory)
+            logger.info("Cache leaderboard dimuat: %d user.", len(self.leaderboard_cache.best))
+        except Exception as exc:
+            logger.error("Gagal memuat cache leaderboard: %s", exc)
 
     #Fungsi utama menangani koneksi TCP setiap klien.
     #Untuk login user, menerima pesan, routing pesan ke handler lain, dan menangani disconnect.
+    #Koneksi yang diawali {"type": "mux"} adalah koneksi multiplex dari bridge (lihat _serve_mux).
+    #Koneksi yang tidak lolos admission control langsung ditutup; baris login ditunggu maksimal login_timeout detik (reaper).
     async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         addr = writer.get_extra_info('peername')
-        print(f"[SERVER] Koneksi baru masuk dari {addr}...") 
+        ip = addr[0] if isinstance(addr, tuple) else str(addr)
+        loop = asyncio.get_running_loop()
+        reason = self.admission.admit(ip, loop.time())
+        if reason is not None:
+            logger.debug("Koneksi dari %s ditolak (%s).", addr, reason)
+            writer.transport.abort()
+            return
+
+        logger.debug("Koneksi baru masuk dari %s...", addr)
         username = "Unknown"
+        session = None
 
         try:
-            line = await reader.readline()
+            self.admission.pending[writer] = loop.time()
+            try:
+                line = await reader.readline()
+            except ValueError:
+                self.admission.oversized += 1
+                logger.warning("Baris login dari %s melebihi %d byte", addr, self.admission.max_line)
+                return
+            finally:
+                self.admission.pending.pop(writer, None)
             if not line: return
 
             try:
                 
-                login_msg = json.loads(line.decode().strip())
+                login_msg = json.loads(line)
                 if login_msg.get('type') == 'login':
                     username = login_msg.get('username')
-                    self.player_usernames[writer] = username
-                    self.active_connections.add(writer)
-                    
-                    print(f"[SERVER] User '{username}' berhasil masuk. Total online: {len(self.active_connections)}")
-                    
-                    lb_data = await self._get_leaderboard()
-                    await self._safe_send(writer, {"type": "res_leaderboard", "data": lb_data})
+                    codec = get_codec(login_msg.get('protocol'))
+                    session = self.sessions.open(writer, OutboundQueue(writer, self.outbound_stats))
+                    await self._login(session, login_msg, codec)
+                elif login_msg.get('type') == 'mux':
+                    await self._serve_mux(reader, writer)
+                    return
                 else:
-                    print(f"[SERVER] Format login salah dari {addr}")
+                    logger.warning("Format login salah dari %s", addr)
                     return
             except json.JSONDecodeError:
-                print(f"[SERVER] Gagal decode JSON login dari {addr}")
+                logger.warning("Gagal decode JSON login dari %s", addr)
                 return
 
             while True:
-                line = await reader.readline()
+                try:
+                    message = await codec.read(reader)
+                except LineTooLong:
+                    self.admission.oversized += 1
+                    logger.warning("Pesan dari %s melebihi %d byte, koneksi diputus", username, self.admission.max_line)
+                    break
+                except ValueError:
+                    continue
+                if message is None: break
+                session.last_seen = loop.time()
+
+                channel = progress_logger if message.get("type") == "progress" else logger
+                channel.debug("<< Diterima dari %s: %s", username, message)
+                await self._process_general_message(session, message)
+
+        except Exception as e:
+            logger.error("Error pada %s: %s", username, e)
+        finally:
+            if session:
+                await self._close_session(session)
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except: pass
+            self.admission.release(ip)
+            logger.debug("Koneksi user '%s' ditutup sepenuhnya.", username)
+
+    # Mencatat user yang login, memilih codec koneksinya, lalu mengirim leaderboard awal.
+    async def _login(self, session: Session, login_msg: dict, codec) -> None:
+        username = login_msg.get('username')
+        self.sessions.login(session, username)
+        session.outbound.codec = codec
+        session.last_seen = asyncio.get_running_loop().time()
+        
+        logger.info("User '%s' berhasil masuk (%s). Total online: %d", username, codec.name, self.sessions.logged_in)
+        
+        await self._send_leaderboard(session, login_msg.get("leaderboard_version"))
+
+    # Menangani disconnect session lalu mengirim sisa antrean keluarnya (mis. game_over) sebelum ditutup.
+    async def _close_session(self, session: Session) -> None:
+        outbound = session.outbound
+        await self._handle_disconnect(session)
+        if outbound:
+            await outbound.close()
+
+    # Koneksi multiplex dari bridge: banyak session logis dalam satu koneksi TCP, frame "<id channel> <json>".
+    # Pesan pertama sebuah channel harus login; setiap channel mendapat Session dan OutboundQueue sendiri
+    # dengan MuxChannel sebagai pengganti StreamWriter. Koneksi putus = semua session di dalamnya disconnect.
+    async def _serve_mux(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info('peername')
+        channels: Dict[int, Session] = {}
+        logger.info("Bridge multiplex terhubung dari %s", addr)
+
+        # Server menutup channel (client terlalu lambat): session dibersihkan di task terpisah
+        def channel_closed(cid: int) -> None:
+            session = channels.pop(cid, None)
+            if session:
+                asyncio.create_task(self._close_session(session))
+
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Baris melebihi max_line: hanya baris ini yang dibuang, koneksi bridge tetap dipakai
+                    self.admission.oversized += 1
+                    continue
                 if not line: break
                 try:
-                    decoded_line = line.decode().strip()
-            
-                    if "progress" not in decoded_line: 
-                        print(f"[SERVER] << Diterima dari {username}: {decoded_line}")
-                    
-                    message = json.loads(decoded_line)
-                    await self._process_general_message(writer, message)
-                except json.JSONDecodeError:
+                    cid, body = decode_frame(line)
+                    message = json.loads(body)
+                except ValueError:
                     continue
 
+                session = channels.get(cid)
+                msg_type = message.get("type")
+                try:
+                    if session is None:
+                        if msg_type == "login":
+                            mux_channel = MuxChannel(writer, cid, channel_closed)
+                            session = channels[cid] = self.sessions.open(mux_channel, OutboundQueue(mux_channel, self.outbound_stats))
+                            await self._login(session, message, DEFAULT_CODEC)
+                    elif msg_type == "disconnect":
+                        del channels[cid]
+                        session.writer.detach()
+                        await self._close_session(session)
+                    else:
+                        session.last_seen = loop.time()
+                        channel = progress_logger if msg_type == "progress" else logger
+                        channel.debug("<< Diterima dari %s: %s", session.username, message)
+                        await self._process_general_message(session, message)
+                except Exception as e:
+                    logger.error("Error pada %s: %s", session.username if session else cid, e)
+
         except Exception as e:
-            print(f"[SERVER] Error pada {username}: {e}")
+            logger.error("Error pada bridge multiplex %s: %s", addr, e)
         finally:
-            await self._handle_disconnect(writer)
+            for session in list(channels.values()):
+                session.writer.detach()
+                await self._close_session(session)
             try:
                 writer.close()
                 await writer.wait_closed()
             except: pass
-            print(f"[SERVER] Koneksi user '{username}' ditutup sepenuhnya.")
+            logger.info("Bridge multiplex %s terputus (%d session ditutup).", addr, len(channels))
 
     #Mengenali tipe pesan (“req_leaderboard”, matchmaking, progress, finish, dll), lalu mengarahkan ke fungsi yang tepat.
-    async def _process_general_message(self, writer: asyncio.StreamWriter, message: dict) -> None:
+    async def _process_general_message(self, session: Session, message: dict) -> None:
         msg_type = message.get("type")
 
         if msg_type == "req_leaderboard":
-            leaderboard_data = await self._get_leaderboard()
-            await self._safe_send(writer, {"type": "res_leaderboard", "data": leaderboard_data})
+            await self._send_leaderboard(session, message.get("version"))
         
         elif msg_type == "req_matchmaking":
-            print(f"[SERVER] {self.player_usernames.get(writer)} meminta matchmaking...")
-            asyncio.create_task(self._handle_matchmaking_logic(writer))
+            logger.debug("%s meminta matchmaking...", session.username)
+            asyncio.create_task(self._handle_matchmaking_logic(session))
 
         elif msg_type == "client_ip":
-            print(f"[SERVER] IP Client = {message.get('ip')}")
+            logger.debug("IP Client = %s", message.get('ip'))
             return 
             
         elif msg_type == "cancel_matchmaking":
-            await self._handle_cancel_matchmaking(writer)
+            await self._handle_cancel_matchmaking(session)
             
-        elif msg_type in ["progress", "finish"]:
-            await self._process_game_play_message(writer, message)
-
-    # Mengelola logika “mencarikan lawan”.
-    # Jika antrean kosong → masukkan user.
-    # Jika ada pemain lain → langsung pairing.
-    # Jika lawan disconnect → abaikan dan cari lagi.
-    async def _handle_matchmaking_logic(self, writer: asyncio.StreamWriter):
-        if writer in self.waiting_players:
+        elif msg_type in ["input", "progress", "finish"]:
+            await self._process_game_play_message(session, message)
+
+    # Mengelola logika “mencarikan lawan” berdasarkan rating WPM.
+    # Jika ada room_size - 1 pemain menunggu dengan rating terdekat dalam jendela toleransi → langsung membuat room.
+    # Jika belum ada → masukkan user ke antrean; _matchmaking_sweeper membentuk room setelah jendela melebar.
+    # Jika calon lawan disconnect → keluarkan dari antrean dan cari lagi.
+    async def _handle_matchmaking_logic(self, session: Session):
+        if self.cluster:
+            if not session.queued and session.host is None and session.room is None:
+                self.cluster.enqueue(session)
+            return
+        if session in self.matchmaker:
             return 
 
-        if not self.waiting_players:
-            matched = await self._enqueue_player(writer)
-            if not matched: return
-        else:
-            while self.waiting_players:
-                opponent = self.waiting_players.pop(0)
-                opp_event = self.waiting_events.pop(opponent, None)
-                
-                if not opponent.is_closing():
-                    print(f"[SERVER] Match ditemukan! Memulai game...")
-                    self.opponents[writer] = opponent
-                    self.opponents[opponent] = writer
-                    if opp_event: opp_event.set()
-                    await self._begin_match(opponent, writer)
-                    return
-            await self._enqueue_player(writer)
+        rating = self.ratings.get(session.username)
+        now = asyncio.get_running_loop().time()
+        while True:
+            partners = self.matchmaker.find_group(rating, now, self.room_size - 1)
+            if len(partners) < self.room_size - 1:
+                break
+            closed = [p for p in partners if p.is_closing()]
+            if not closed:
+                logger.debug("Match ditemukan! Memulai game...")
+                self._begin_match(self._open_room([*partners, session]))
+                return
+            for p in closed:
+                self._cleanup_waiting(p)
+        await self._enqueue_player(session)
+
+    # Satu task untuk seluruh antrean: setiap detik membentuk room dari pemain lama yang jendela rating-nya sudah melebar.
+    async def _matchmaking_sweeper(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.matchmaking_sweep_interval)
+            if len(self.matchmaker) < self.min_room_size:
+                continue
+            try:
+                now = loop.time()
+                groups = self.matchmaker.sweep(now, self.room_size, self.min_room_size, self.room_fill_after)
+                for group in groups:
+                    players = [p for p in group if not p.is_closing()]
+                    if len(players) < len(group):
+                        # Pemain yang masih terhubung dikembalikan ke antrean
+                        for p in group:
+                            if p.is_closing():
+                                self._cleanup_waiting(p)
+                            else:
+                                self.matchmaker.add(p, self.ratings.get(p.username), now)
+                        continue
+                    self._begin_match(self._open_room(players))
+            except Exception as exc:
+                logger.error("Matchmaking sweep error: %s", exc)
+
+    # Satu task untuk semua batas waktu koneksi: koneksi yang belum login setelah login_timeout detik, dan session
+    # yang tidak mengirim pesan selama idle_timeout detik selama tidak sedang di room atau antrean matchmaking, ditutup.
+    # Pembersihan session tetap dilakukan oleh loop baca koneksinya (handle_connection / _serve_mux).
+    async def _connection_reaper(self) -> None:
+        loop = asyncio.get_running_loop()
+        admission = self.admission
+        while True:
+            await asyncio.sleep(admission.sweep_interval)
+            try:
+                now = loop.time()
+                for writer in admission.expired_logins(now):
+                    logger.debug("Koneksi %s tidak login dalam %.0f detik.", writer.get_extra_info('peername'), admission.login_timeout)
+                    writer.transport.abort()
+                if not admission.idle_timeout:
+                    continue
+                cutoff = now - admission.idle_timeout
+                idle = [s for s in self.sessions if s.username is not None and s.last_seen < cutoff and s.room is None
+                        and s.waiting is None and not s.queued and s.host is None]
+                for session in idle:
+                    logger.info("Session '%s' idle lebih dari %.0f detik, diputus.", session.username, admission.idle_timeout)
+                    admission.reaped += 1
+                    session.writer.transport.abort()
+            except Exception as exc:
+                logger.error("Connection reaper error: %s", exc)
 
     # Menghapus event menunggu dan mengirim respon “dibatalkan”.
-    async def _handle_cancel_matchmaking(self, writer: asyncio.StreamWriter):
-        username = self.player_usernames.get(writer)
-        
-        if writer in self.waiting_players:
-            self.waiting_players.remove(writer)
-            event = self.waiting_events.pop(writer, None)
+    async def _handle_cancel_matchmaking(self, session: Session):
+        if self.cluster and self.cluster.cancel(session):
+            logger.info("%s membatalkan matchmaking.", session.username)
+        elif self.matchmaker.remove(session):
+            event, session.waiting = session.waiting, None
             if event: 
                 event.set()
-            print(f"[SERVER] {username} membatalkan matchmaking.")
+            logger.info("%s membatalkan matchmaking.", session.username)
 
-        await self._safe_send(writer, {"type": "matchmaking_canceled"})
+        self._safe_send(session, {"type": "matchmaking_canceled"})
 
-    # Meneruskan ke handler relay progress atau penyelesaian game.
-    async def _process_game_play_message(self, writer: asyncio.StreamWriter, message: dict) -> None:
+    # Meneruskan ke handler input, relay progress, atau penyelesaian game.
+    # Pemain yang room-nya dijalankan worker lain: pesan diteruskan ke worker host.
+    # Dalam typing_mode "server", progress dan finish dari client diabaikan (dihitung sendiri dari input).
+    async def _process_game_play_message(self, session: Session, message: dict) -> None:
+        if session.host is not None:
+            self.cluster.play(session, message)
+            return
         msg_type = message.get("type")
-        if msg_type == "progress":
-            await self._relay_progress(writer, message)
+        if msg_type == "input":
+            await self._apply_input(session, message)
+        elif self.typing_mode == "server":
+            return
+        elif msg_type == "progress":
+            await self._relay_progress(session, message)
         elif msg_type == "finish":
-            print(f"[SERVER] {self.player_usernames.get(writer)} menyelesaikan game!")
-            await self._finish_game(writer, message)
+            logger.debug("%s menyelesaikan game!", session.username)
+            await self._finish_game(session, message)
 
     # Memasukkan pemain ke antrean, membuat event async, menunggu sampai dipasangkan lawan, atau dibatalkan.
-    async def _enqueue_player(self, writer: asyncio.StreamWriter) -> bool:
+    async def _enqueue_player(self, session: Session) -> bool:
         event = asyncio.Event()
-        self.waiting_players.append(writer)
-        self.waiting_events[writer] = event
+        self.matchmaker.add(session, self.ratings.get(session.username), asyncio.get_running_loop().time())
+        session.waiting = event
         
-        count = len(self.waiting_players)
-        print(f"[SERVER] {self.player_usernames.get(writer)} masuk antrian. Total antrian: {count}")
+        count = len(self.matchmaker)
+        logger.debug("%s masuk antrian. Total antrian: %d", session.username, count)
         
-        await self._safe_send(writer, {
+        self._safe_send(session, {
             "status": "waiting", 
             "message": "Menunggu pemain lain...",
             "waiting_count": count
@@ -197,7 +522,7 @@ class GameController:
         wait_task = asyncio.create_task(event.wait())
         try:
             await wait_task
-            if writer in self.opponents:
+            if session.room is not None:
                 return True
             else:
                 return False
@@ -205,248 +530,471 @@ class GameController:
             return False
         finally:
             if not event.is_set():
-                self._cleanup_waiting(writer)
-
-    # Membuat objek GameState baru, memilih teks acak, menetapkan progress awal, mencatat lawan masing-masing, lalu memulai countdown.
-    async def _begin_match(self, player1: asyncio.StreamWriter, player2: asyncio.StreamWriter) -> None:
-        target_text = random.choice(self.text_pool)
-        state = GameState(players=[player1, player2], target_text=target_text)
-        
-        state.progress_map[player1] = 0
-        state.progress_map[player2] = 0
-
-        self.game_states[player1] = state
-        self.game_states[player2] = state
-
-        p1_name = self.player_usernames.get(player1, "Unknown")
-        p2_name = self.player_usernames.get(player2, "Unknown")
+                self._cleanup_waiting(session)
+
+    # Membuat Room baru untuk pemain yang sudah dikeluarkan dari antrean, memilih teks acak, mencatat room setiap pemain,
+    # lalu membangunkan pemain yang sedang menunggu di _enqueue_player.
+    def _open_room(self, players: List[Session]) -> Room:
+        if self.metrics:
+            self.rooms_opened.inc()
+            if self.matchmaking_wait:
+                now = asyncio.get_running_loop().time()
+                for p in players:
+                    self.matchmaking_wait.observe(self.matchmaker.waited(p, now))
+        for p in players:
+            self.matchmaker.remove(p)
+        names = [p.username or "Unknown" for p in players]
+        room = Room(room_id=next(self.room_ids), players=players, names=names, target=self._pick_target(players))
+        self.rooms[room.room_id] = room
+        for p in players:
+            event = p.waiting
+            if event:
+                p.waiting = None
+                event.set()
+        return room
+
+    def _pick_target(self, players: List[Session]) -> TargetText:
+        if self.corpus is not None:
+            return self.corpus.target(self.corpus.pick(self._corpus_tier(players)))
+        text = random.choice(self.text_pool)
+        target = self.targets.get(text)
+        if target is None:
+            target = self.targets[text] = TargetText(text)
+        return target
+
+    def _corpus_tier(self, players: List[Session]) -> Optional[int]:
+        if self.corpus_tier != "auto":
+            return self.corpus_tier
+        tiers = len(self.corpus.tiers)
+        rating = sum(self.ratings.get(p.username) for p in players) / len(players)
+        return min(tiers - 1, max(0, int(rating * tiers / self.tier_wpm)))
+
+    # Memberi tahu setiap pemain daftar peserta room dan kursinya sendiri, lalu memulai countdown.
+    def _begin_match(self, room: Room) -> None:
+        logger.info("Memulai Match #%d: %s", room.room_id, " vs ".join(room.names))
+
+        for seat, p in enumerate(room.players):
+            self._safe_send(p, {
+                "status": "matched",
+                "opponent": ", ".join(name for i, name in enumerate(room.names) if i != seat),
+                "players": room.names,
+                "seat": seat
+            })
 
-        print(f"[SERVER] Memulai Match: {p1_name} vs {p2_name}")
+        self._countdown_tick(room, 3)
 
-        await self._safe_send(player1, {"status": "matched", "opponent": p2_name})
-        await self._safe_send(player2, {"status": "matched", "opponent": p1_name})
+    # Satu langkah hitungan mundur 3-2-1: mengirim angka ke semua pemain lalu menjadwalkan langkah berikutnya
+    # satu detik kemudian di timer wheel. Setelah angka 1, balapan dimulai.
+    def _countdown_tick(self, room: Room, number: int) -> None:
+        if room.finished:
+            return
+        if number > 0:
+            self._broadcast(room.active(), {"type": "countdown", "value": number})
+            room.timer = self.timers.schedule(1, self._countdown_tick, room, number - 1)
+        else:
+            self._start_race(room)
 
-        await self._run_countdown(state)
+    # Set waktu mulai, broadcast “start_game” lengkap dengan teks dan durasi, lalu menjadwalkan batas waktu balapan.
+    def _start_race(self, room: Room) -> None:
+        room.start_time = asyncio.get_running_loop().time()
+        logger.debug("GO! Game dimulai untuk %d pemain.", room.remaining)
 
-    # Mengirim hitungan mundur 3-2-1 ke kedua pemain, set waktu mulai, lalu broadcast “start_game” lengkap dengan teks dan durasi.
-    async def _run_countdown(self, state: GameState) -> None:
-        for number in (3, 2, 1):
-            await self._broadcast(state.players, {"type": "countdown", "value": number})
-            await asyncio.sleep(1)
-        
-        state.start_time = asyncio.get_running_loop().time()
-        print(f"[SERVER] GO! Game dimulai untuk {len(state.players)} pemain.")
-        
-        await self._broadcast(state.players, {
-            "type": "start_game", 
-            "text": state.target_text,
+        self._broadcast(room.active(), {
+            "type": "start_game",
+            "text": room.target_text,
             "duration": self.game_duration
         })
-        
-        asyncio.create_task(self._monitor_game_duration(state))
 
-    # Jika waktu habis dan belum ada pemenang → menilai progress kedua pemain, menentukan siapa lebih banyak mengetik, lalu menetapkan pemenang otomatis.
-    async def _monitor_game_duration(self, state: GameState):
+        room.timer = self.timers.schedule(self.game_duration + 2, self._game_timeout, room)
+
+    # Menandai room selesai dan membatalkan timer-nya (countdown atau batas waktu) agar tidak tertinggal di wheel.
+    def _close_room(self, room: Room) -> None:
+        room.finished = True
+        self.timers.cancel(room.timer)
+        room.timer = None
+        self.rooms.pop(room.room_id, None)
+
+    # Dipanggil timer wheel saat waktu habis dan belum ada pemenang → semua pemain diperingkat berdasarkan progress,
+    # pemenang adalah satu-satunya pemain dengan progress terjauh (seri jika lebih dari satu).
+    async def _game_timeout(self, room: Room) -> None:
         try:
-            await asyncio.sleep(self.game_duration + 2)
-            
-            if state.finished:
+            if room.finished:
                 return
-            print("[SERVER] Waktu habis! Menentukan pemenang...")
-            state.finished = True
-            
-            p1, p2 = state.players[0], state.players[1]
-            prog1 = state.progress_map.get(p1, 0)
-            prog2 = state.progress_map.get(p2, 0)
-            
-            winner_name = None
-            if prog1 > prog2:
-                winner_name = self.player_usernames.get(p1, "Unknown")
-                state.winner = winner_name
-            elif prog2 > prog1:
-                winner_name = self.player_usernames.get(p2, "Unknown")
-                state.winner = winner_name
-            
-            text_len = len(state.target_text)
-            char_p1 = int((prog1 / 100) * text_len)
-            char_p2 = int((prog2 / 100) * text_len)
-            
-            wpm_p1 = self._calculate_wpm(char_p1, self.game_duration)
-            wpm_p2 = self._calculate_wpm(char_p2, self.game_duration)
-            
-            lb_data = await self._get_leaderboard()
-            
-            await self._safe_send(p1, {
-                "type": "game_over",
-                "reason": "timeout",
-                "result": "won" if winner_name == self.player_usernames.get(p1) else ("lost" if winner_name else "draw"),
-                "wpm": wpm_p1,
-                "winner": winner_name,
-                "leaderboard": lb_data
-            })
-            
-            await self._safe_send(p2, {
-                "type": "game_over",
-                "reason": "timeout",
-                "result": "won" if winner_name == self.player_usernames.get(p2) else ("lost" if winner_name else "draw"),
-                "wpm": wpm_p2,
-                "winner": winner_name,
-                "leaderboard": lb_data
-            })
+            logger.info("Waktu habis! Menentukan pemenang room #%d...", room.room_id)
+            self._close_room(room)
+
+            standings = self._rank_room(room, self.game_duration)
+            self._send_results(room, standings, "timeout")
 
-            for p in state.players:
+            for p in list(room.active()):
                 await self._cleanup_player(p)
 
         except Exception as e:
-            print(f"[SERVER] Timer game error: {e}")
-
-    # Dipakai untuk memperbarui progress dan WPM pemain selama pertandingan, lalu mengirim data tersebut ke lawannya.
-    async def _relay_progress(self, writer: asyncio.StreamWriter, message: dict) -> None:
-        state = self.game_states.get(writer)
-        if state and not state.finished:
-            state.progress_map[writer] = message.get("progress", 0)
-            state.wpm_map[writer] = message.get("wpm", 0)
-
-        opponent = self.opponents.get(writer)
-        if opponent:
-            await self._safe_send(opponent, {
-                "type": "opponent_progress", 
-                "progress": message.get("progress"),
-                "wpm": message.get("wpm", 0) 
-            })
+            logger.error("Timer game error: %s", e)
+
+    # Dipakai untuk memperbarui progress dan WPM pemain selama pertandingan.
+    # Hanya nilai terbaru yang disimpan; pengiriman ke pemain lain dilakukan oleh _progress_scheduler.
+    async def _relay_progress(self, session: Session, message: dict) -> None:
+        self.progress_received += 1
+        room = session.room
+        if not room or room.finished:
+            return
+        seat = session.seat
+
+        room.progress[seat] = message.get("progress", 0)
+        room.wpm[seat] = message.get("wpm", 0)
+        self._mark_progress(room)
+
+    # Menerapkan satu delta input ke state ketikan pemain: progress dan WPM dihitung ulang dari prefix yang benar
+    # (O(panjang delta)), dan pemain yang sudah mengetik seluruh teks dengan benar langsung menyelesaikan balapan.
+    async def _apply_input(self, session: Session, message: dict) -> None:
+        self.progress_received += 1
+        room = session.room
+        if not room or room.finished or room.start_time is None:
+            return
+        seat = session.seat
+        state = room.typing[seat]
+        if not state.apply(room.target, message.get("pos"), message.get("text")):
+            self.typing_rejected += 1
+            return
+
+        elapsed = asyncio.get_running_loop().time() - room.start_time
+        room.progress[seat] = state.progress(room.target)
+        room.wpm[seat] = self._calculate_wpm(state.counted(room.target), elapsed)
+        if state.finished(room.target):
+            logger.debug("%s menyelesaikan game!", session.username)
+            await self._finish_game(session, message)
+        else:
+            self._mark_progress(room)
 
-    # Menghitung waktu balapan, menentukan WPM pemenang, menyimpan skor ke database, 
-    # mengirim hasil ke kedua pemain, memperbarui leaderboard, lalu membersihkan data match.
-    async def _finish_game(self, writer: asyncio.StreamWriter, message: dict) -> None:
-        state = self.game_states.get(writer)
-        if not state or state.finished: return
-        
-        opponent = self.opponents.get(writer)
-        username = self.player_usernames.get(writer, "Unknown")
+    def _mark_progress(self, room: Room) -> None:
+        room.dirty = True
+        if self.progress_hz > 0:
+            self.dirty_rooms.add(room)
+        else:
+            self._flush_progress(room)
+
+    # Satu task untuk semua room: setiap tick, room yang progress-nya berubah mengirim satu room_progress.
+    async def _progress_scheduler(self) -> None:
+        interval = 1 / self.progress_hz
+        while True:
+            await asyncio.sleep(interval)
+            if not self.dirty_rooms:
+                continue
+            rooms, self.dirty_rooms = self.dirty_rooms, set()
+            for room in rooms:
+                try:
+                    self._flush_progress(room)
+                except Exception as exc:
+                    logger.error("Gagal meneruskan progress: %s", exc)
+
+    # Mengirim progress seluruh kursi sebagai satu pesan ke semua pemain room (diserialisasi sekali).
+    # Selalu berisi snapshot lengkap sehingga pesan lama yang belum terkirim aman dibuang (coalesce).
+    def _flush_progress(self, room: Room) -> None:
+        if room.finished or not room.dirty:
+            room.dirty = False
+            return
+        room.dirty = False
+        self._broadcast(room.active(), {
+            "type": "room_progress",
+            "progress": room.progress,
+            "wpm": room.wpm
+        })
+        self.progress_forwarded += room.remaining
+
+    # Jumlah pesan progress yang diterima vs. yang benar-benar diteruskan ke pemain.
+    def progress_stats(self) -> dict:
+        return {
+            "received": self.progress_received,
+            "forwarded": self.progress_forwarded,
+            "rejected": self.typing_rejected,
+            "pending_rooms": len(self.dirty_rooms),
+        }
+
+    # Pemain pertama yang menyelesaikan teks menang dan balapan berakhir untuk seluruh room.
+    # Skor pemenang disimpan ke database, pemain lain diperingkat berdasarkan progress, lalu data match dibersihkan.
+    async def _finish_game(self, session: Session, message: dict) -> None:
+        room = session.room
+        if not room or room.finished: return
+        seat = session.seat
         
         now = asyncio.get_running_loop().time()
-        race_time = max(now - (state.start_time or now), 0.1)
-        
-        correct_chars = len(state.target_text)
-        winner_wpm = self._calculate_wpm(correct_chars, race_time)
-        
-        state.finished = True
-        state.winner = username
-        
-        print(f"[SERVER] Menyimpan skor untuk pemenang '{username}' (WPM: {winner_wpm})")
-        await self._record_score(username, winner_wpm)
-        new_leaderboard = await self._get_leaderboard()
-        await self._broadcast_leaderboard_update(new_leaderboard)
-
-        base_msg = {
-            "type": "game_over", 
-            "reason": "finish", 
-            "leaderboard": new_leaderboard
-        }
-        await self._safe_send(writer, {
-            **base_msg, 
-            "result": "won", 
-            "wpm": winner_wpm 
-        })
+        race_time = max(now - (room.start_time or now), 0.1)
+        self._close_room(room)
+
+        standings = self._rank_room(room, race_time, finisher=seat)
+        winner_wpm = standings[0][2]
         
-        if opponent:
-            opp_progress_pct = state.progress_map.get(opponent, 0)
-            opp_correct_chars = int((opp_progress_pct / 100) * len(state.target_text))
-            opponent_adjusted_wpm = self._calculate_wpm(opp_correct_chars, race_time)
-            
-            await self._safe_send(opponent, {
-                **base_msg, 
-                "result": "lost", 
-                "winner": username,
-                "wpm": opponent_adjusted_wpm 
+        logger.info("Menyimpan skor untuk pemenang '%s' (WPM: %d)", room.winner, winner_wpm)
+        await self._record_score(room.winner, winner_wpm)
+
+        self._send_results(room, standings, "finish")
+        for p in list(room.active()):
+            await self._cleanup_player(p)
+        await self._broadcast_leaderboard_update()
+
+    # Satu kali jalan untuk seluruh pemain yang masih terhubung: menghitung WPM dari jumlah karakter benar
+    # (mode server) atau dari progress yang dikirim client (mode client), memperbarui rating,
+    # lalu mengurutkan (pemain yang finish selalu pertama, sisanya berdasarkan progress).
+    # Mengembalikan list (kursi, progress, wpm, peringkat); pemain dengan progress sama mendapat peringkat yang sama.
+    def _rank_room(self, room: Room, elapsed: float, finisher: Optional[int] = None) -> List[Tuple[int, float, int, int]]:
+        text_len = room.target.length
+        entries = []
+        for seat in [p.seat for p in room.active()]:
+            progress = 100.0 if seat == finisher else room.progress[seat]
+            if seat == finisher:
+                chars = text_len
+            elif self.typing_mode == "server":
+                chars = room.typing[seat].counted(room.target)
+            else:
+                chars = int((progress / 100) * text_len)
+            wpm = self._calculate_wpm(chars, elapsed)
+            self.ratings.update(room.names[seat], wpm)
+            entries.append((seat, progress, wpm))
+        entries.sort(key=lambda e: (e[0] != finisher, -e[1]))
+
+        standings = []
+        for i, (seat, progress, wpm) in enumerate(entries):
+            tied = i > 0 and seat != finisher and progress == entries[i - 1][1] and entries[i - 1][0] != finisher
+            standings.append((seat, progress, wpm, standings[-1][3] if tied else i + 1))
+
+        if finisher is not None:
+            room.winner = room.names[finisher]
+        elif standings and (len(standings) == 1 or standings[1][3] > 1):
+            room.winner = room.names[standings[0][0]]
+        return standings
+
+    # Mengirim game_over ke setiap pemain: hasil (won/lost/draw), WPM dan peringkatnya sendiri,
+    # serta daftar peringkat room yang sama untuk semua pemain. Leaderboard tidak ikut dikirim, hanya versinya:
+    # perubahan leaderboard sampai ke semua pemain lewat leaderboard_update.
+    def _send_results(self, room: Room, standings: List[Tuple[int, float, int, int]], reason: str) -> None:
+        ranking = [{"username": room.names[seat], "progress": progress, "wpm": wpm, "rank": rank}
+                   for seat, progress, wpm, rank in standings]
+        for seat, _, wpm, rank in standings:
+            if room.winner is None:
+                result = "draw" if rank == 1 else "lost"
+            else:
+                result = "won" if room.names[seat] == room.winner and rank == 1 else "lost"
+            self._safe_send(room.players[seat], {
+                "type": "game_over",
+                "reason": reason,
+                "result": result,
+                "wpm": wpm,
+                "rank": rank,
+                "winner": room.winner,
+                "ranking": ranking,
+                "leaderboard_version": self.leaderboard_cache.version
             })
-            await self._cleanup_player(opponent)
-            
-        await self._cleanup_player(writer)
 
-    # Menyimpan skor pemain yang menang ke database.
+    # Mencatat skor pemain yang menang: cache leaderboard diperbarui langsung,
+    # penulisan ke database diserahkan ke ScoreWriter sehingga game_over tidak menunggu disk.
+    # Dalam mode worker, skor dikirim ke coordinator yang menulis ke database dan meneruskannya ke worker lain.
     async def _record_score(self, username: str, wpm: int) -> None:
-        try:
-            async with self.session_factory() as session:
-                async with session.begin():
-                    session.add(Score(username=username, wpm=wpm))
-            print(f"[SERVER] Skor disimpan: {username} = {wpm} WPM")
-        except Exception as exc:
-            print(f"[SERVER] Gagal menyimpan skor: {exc}")
+        self.leaderboard_cache.record(username, wpm)
+        if self.cluster:
+            self.cluster.send({"op": "score", "username": username, "wpm": wpm})
+        else:
+            await self.score_writer.submit(username, wpm)
 
-    # Mengambil 10 skor terbaik dari database, dihitung berdasarkan WPM tertinggi tiap pengguna.
+    # Mengambil top-N skor terbaik (N = leaderboard_cache.size, --leaderboard-size), dihitung berdasarkan WPM tertinggi tiap pengguna.
+    # Dilayani dari cache di memori; query ke database hanya dipakai jika cache belum berhasil dimuat.
     async def _get_leaderboard(self) -> List[dict]:
+        if self.leaderboard_cache.loaded:
+            return self.leaderboard_cache.top(self.leaderboard_cache.size)
         try:
-            async with self.session_factory() as session:
-                max_wpm = func.max(Score.wpm).label("max_wpm")
-                query = (select(Score.username, max_wpm).group_by(Score.username).order_by(max_wpm.desc()).limit(10))
+            async with self.read_session_factory() as session:
+                query = (select(UserBest.username, UserBest.best_wpm).order_by(UserBest.best_wpm.desc(), UserBest.username)
+                         .limit(self.leaderboard_cache.size))
                 result = await session.execute(query)
-                return [{"username": row.username, "wpm": row.max_wpm} for row in result.all()]
+                return [{"username": row.username, "wpm": row.best_wpm} for row in result.all()]
         except Exception as exc:
-            print(f"[SERVER] Error mengambil leaderboard: {exc}")
+            logger.error("Error mengambil leaderboard: %s", exc)
             return []
 
-    # Mengirim data leaderboard terbaru ke semua koneksi yang sedang aktif.
-    # Berguna setelah ada pertandingan selesai dan skor baru masuk.
-    async def _broadcast_leaderboard_update(self, data: List[dict]):
-        print(f"[SERVER] Mengirimkan data leaderboard terbaru ke {len(self.active_connections)} user.")
-        payload = {"type": "leaderboard_update", "leaderboard": data}
-        active = list(self.active_connections)
-        for writer in active:
-            await self._safe_send(writer, payload)
+    # Mengirim res_leaderboard ke satu session. Jika client menyebut versi yang sama dengan versi sekarang,
+    # cukup dibalas not_modified tanpa isi daftar. Selama cache aktif, daftar penuh dikirim dari hasil encode
+    # yang dipakai bersama semua session dengan codec yang sama.
+    async def _send_leaderboard(self, session: Session, known_version) -> None:
+        cache = self.leaderboard_cache
+        if cache.loaded and known_version == cache.version:
+            self._safe_send(session, {"type": "res_leaderboard", "version": cache.version, "not_modified": True})
+            return
+        if cache.loaded and session.outbound is not None:
+            logger.debug(">> Mengirim ke %s: res_leaderboard versi %d", session.username or "Unknown", cache.version)
+            session.outbound.push(cache.encoded(session.outbound.codec), "res_leaderboard")
+            return
+        data = await self._get_leaderboard()
+        reply = {"type": "res_leaderboard", "data": data}
+        if cache.loaded:
+            reply["version"] = cache.version
+        self._safe_send(session, reply)
+
+    # Mengirim perubahan leaderboard ke semua koneksi yang sedang aktif, setelah ada skor baru masuk.
+    # Yang dikirim hanya delta (removed/inserted) dari versi base ke version; client yang versinya bukan base
+    # meminta ulang daftar penuh dengan req_leaderboard. Tidak ada yang dikirim jika top-N tidak berubah.
+    async def _broadcast_leaderboard_update(self) -> None:
+        if self.leaderboard_cache.loaded:
+            delta = self.leaderboard_cache.delta()
+            if delta["base"] == delta["version"]:
+                return
+            payload = {"type": "leaderboard_update", **delta}
+        else:
+            payload = {"type": "leaderboard_update", "leaderboard": await self._get_leaderboard()}
+        logger.debug("Mengirimkan data leaderboard terbaru ke %d user.", self.sessions.logged_in)
+        self._broadcast(self.sessions.online(), payload)
 
     # Mengirim payload yang sama ke beberapa pemain sekaligus.
-    # Digunakan untuk broadcast event tertentu di dalam game.
-    async def _broadcast(self, players: List[asyncio.StreamWriter], payload: dict) -> None:
+    # Digunakan untuk broadcast event tertentu di dalam game (countdown, start_game).
+    # Pemain di worker lain (RemotePlayer) menerima payload lewat coordinator.
+    def _broadcast(self, players: Iterable[Session], payload: dict) -> None:
+        queues, remotes = [], []
         for p in players:
-            await self._safe_send(p, payload)
-
-    # Mengirim payload JSON ke satu pemain, sambil menangani kemungkinan error.
+            if p.outbound is not None:
+                queues.append(p.outbound)
+            elif isinstance(p, RemotePlayer):
+                remotes.append(p)
+        self.fanout.send(queues, payload)
+        if remotes:
+            self.cluster.deliver(remotes, payload)
+
+    # Memasukkan payload JSON ke antrean keluar milik satu pemain (tidak menunggu socket).
     # Juga menampilkan log server agar aliran pesan mudah dilacak.
-    async def _safe_send(self, writer: asyncio.StreamWriter, payload: dict) -> None:
-        try:
-            if writer.is_closing(): return
-            
-            username = self.player_usernames.get(writer, "Unknown")
-            msg_type = payload.get("type", "unknown")
-            if msg_type not in ["opponent_progress", "countdown"]:
-                print(f"[SERVER] >> Mengirim ke {username}: {json.dumps(payload)}")
-
-            data = json.dumps(payload) + "\n"
-            writer.write(data.encode())
-            await writer.drain()
-        except Exception as e:
-            print(f"[SERVER] Gagal mengirim data ke client: {e}")
-
-    # Menghapusnya dari semua daftar aktif, memberi tahu lawan jika sedang bertanding, 
-    # lalu membersihkan status pemain itu dari server.
-    async def _handle_disconnect(self, writer: asyncio.StreamWriter) -> None:
-        if writer in self.active_connections:
-            self.active_connections.remove(writer)
-        username = self.player_usernames.pop(writer, "Unknown")
-        print(f"[SERVER] User disconnect: {username}")
+    def _safe_send(self, session: Session, payload: dict) -> None:
+        queue = session.outbound
+        if queue is None:
+            if isinstance(session, RemotePlayer):
+                self.cluster.deliver([session], payload)
+            return
+
+        msg_type = message_type(payload)
+        channel = progress_logger if msg_type in ("room_progress", "countdown") else logger
+        channel.debug(">> Mengirim ke %s: %s", session.username or "Unknown", payload)
+
+        queue.push(queue.codec.encode(payload), msg_type)
+
+    # Mengeluarkan pemain dari antrean, memberi tahu pemain lain di room jika sedang bertanding,
+    # lalu menutup session-nya (satu operasi menghapus seluruh state koneksi).
+    async def _handle_disconnect(self, session: Session) -> None:
+        username = session.username or "Unknown"
+        logger.info("User disconnect: %s", username)
         
-        if writer in self.waiting_players:
-            self._cleanup_waiting(writer)
-        opponent = self.opponents.get(writer)
-        if opponent:
-            print(f"[SERVER] Memberitahu lawan bahwa {username} keluar.")
-            await self._safe_send(opponent, {"status": "opponent_disconnected", "message": f"{username} keluar."})
-            await self._cleanup_player(opponent)
-        await self._cleanup_player(writer)
+        if session in self.matchmaker:
+            self._cleanup_waiting(session)
+        if self.cluster:
+            self.cluster.cancel(session)
+            self.cluster.play(session, {"type": "leave"})
+        await self._leave_room(session, username)
+        self.sessions.close(session)
+
+    # Mengeluarkan pemain dari room-nya. Balapan tetap berjalan selama masih ada minimal 2 pemain;
+    # jika tinggal satu, pemain itu menerima opponent_disconnected.
+    async def _leave_room(self, session: Session, username: str) -> None:
+        room = session.room
+        seat = room.leave(session) if room else None
+        if room and seat is not None and not room.finished:
+            logger.debug("Memberitahu room #%d bahwa %s keluar.", room.room_id, username)
+            if room.remaining >= 2:
+                self._broadcast(room.active(), {"status": "player_left", "username": username, "seat": seat})
+            else:
+                self._close_room(room)
+                for p in list(room.active()):
+                    self._safe_send(p, {"status": "opponent_disconnected", "message": f"{username} keluar."})
+                    await self._cleanup_player(p)
 
     # Menghapus pemain dari antrean matchmaking, dan membebaskan event menunggu jika ada.
-    def _cleanup_waiting(self, writer: asyncio.StreamWriter) -> None:
-        if writer in self.waiting_players:
-            self.waiting_players.remove(writer)
-        event = self.waiting_events.pop(writer, None)
+    def _cleanup_waiting(self, session: Session) -> None:
+        self.matchmaker.remove(session)
+        event, session.waiting = session.waiting, None
         if event: event.set()
 
-    # Membersihkan semua jejak pemain dari server.
-    async def _cleanup_player(self, writer: asyncio.StreamWriter) -> None:
-        if not writer: return
-        self.opponents.pop(writer, None)
-        self.game_states.pop(writer, None)
+    # Melepas pemain dari room-nya setelah balapan selesai (koneksinya tetap terbuka).
+    async def _cleanup_player(self, session: Session) -> None:
+        if not session: return
+        if session.room:
+            session.room.leave(session)
+        if isinstance(session, RemotePlayer):
+            self.cluster.release(session)
+
+    # Menangani pesan dari coordinator (mode worker):
+    # - room / joined   : hasil matchmaking bersama; room dijalankan worker ini atau worker lain (host)
+    # - queued          : pemain masuk antrean bersama
+    # - deliver / release : pesan dari host untuk pemain lokal, dan pelepasan pemain dari room host
+    # - play            : progress/finish/leave dari pemain worker lain untuk room yang dijalankan di sini
+    # - score           : skor baru dari worker lain untuk cache leaderboard lokal
+    # - worker_down     : worker lain mati; room yang melibatkannya dianggap ditinggalkan
+    async def handle_cluster_message(self, msg: dict) -> None:
+        op = msg.get("op")
+        link = self.cluster
+
+        if op == "deliver":
+            sessions = [self.sessions.get(pid) for pid in msg.get("pids", ())]
+            self._broadcast([s for s in sessions if s is not None], msg.get("payload", {}))
+
+        elif op == "play":
+            player = link.remotes.get(tuple(msg.get("from", ())))
+            if player is None:
+                return
+            message = msg.get("message", {})
+            if message.get("type") == "leave":
+                await self._drop_remote(player)
+            else:
+                await self._process_game_play_message(player, message)
+
+        elif op == "room":
+            players = []
+            for worker, pid, name in msg.get("players", ()):
+                if worker == link.worker_id:
+                    player = self.sessions.get(pid)
+                    if player is None or player.is_closing():
+                        continue
+                    player.queued = False
+                else:
+                    player = link.remote(worker, pid)
+                    player.username = name or "Unknown"
+                players.append(player)
+            if len(players) < 2:
+                for p in players:
+                    self._safe_send(p, {"status": "opponent_disconnected", "message": "Lawan keluar."})
+                    await self._cleanup_player(p)
+                return
+            self._begin_match(self._open_room(players))
+
+        elif op == "joined":
+            session = self.sessions.get(msg.get("pid"))
+            if session is None or session.is_closing():
+                # Pemain sudah keluar sebelum room terbentuk
+                link.route(msg.get("host"), {"op": "play", "from": [link.worker_id, msg.get("pid")], "message": {"type": "leave"}})
+                return
+            session.queued = False
+            session.host = msg.get("host")
+
+        elif op == "queued":
+            session = self.sessions.get(msg.get("pid"))
+            if session is not None:
+                self._safe_send(session, {"status": "waiting", "message": "Menunggu pemain lain...", "waiting_count": msg.get("count", 1)})
+
+        elif op == "release":
+            session = self.sessions.get(msg.get("pid"))
+            if session is not None:
+                session.host = None
+
+        elif op == "score":
+            if self.leaderboard_cache.record(msg.get("username"), msg.get("wpm", 0)):
+                await self._broadcast_leaderboard_update()
+
+        elif op == "worker_down":
+            worker = msg.get("worker")
+            for session in [s for s in self.sessions if s.host == worker]:
+                session.host = None
+                self._safe_send(session, {"status": "opponent_disconnected", "message": "Server lawan terputus."})
+            for player in [p for p in link.remotes.values() if p.worker == worker]:
+                await self._drop_remote(player)
+
+    # Pemain dari worker lain keluar dari room yang dijalankan di sini.
+    async def _drop_remote(self, player: RemotePlayer) -> None:
+        player.closed = True
+        await self._leave_room(player, player.username or "Unknown")
+        await self._cleanup_player(player)
 
     # Menghitung Words Per Minute (WPM) pemain berdasarkan panjang teks yang sudah diketik dan waktu yang telah berlalu.
     def _calculate_wpm(self, correct_chars_count: int, elapsed_seconds: float) -> int:
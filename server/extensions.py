@@ -1,20 +1,76 @@
 import asyncio
+import logging
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import asynccontextmanager
 
 # Lokasi database SQLite untuk game typing_race
-DATABASE_URL = "sqlite+aiosqlite:///./database/typing_race.db"
+DATABASE_PATH = "./database/typing_race.db"
+DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
 
-# Engine async yang digunakan SQLAlchemy untuk berkomunikasi dengan SQLite
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Profil performa database. Setiap profil berisi PRAGMA yang dijalankan setiap kali koneksi baru dibuka.
+# - legacy : perilaku bawaan SQLite (rollback journal, synchronous FULL)
+# - wal    : WAL journal + synchronous NORMAL, cache dan mmap lebih besar (default)
+# - turbo  : seperti wal, tetapi synchronous OFF dan temp_store di memori (data terakhir bisa hilang jika OS crash)
+DB_PROFILES = {
+    "legacy": {"journal_mode": "DELETE", "synchronous": "FULL", "cache_size": -2000, "mmap_size": 0},
+    "wal": {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -16000, "mmap_size": 64 * 1024 * 1024},
+    "turbo": {"journal_mode": "WAL", "synchronous": "OFF", "cache_size": -64000, "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY"},
+}
+DEFAULT_DB_PROFILE = "wal"
+
+# Membuat engine penulis dan engine baca (read-only) untuk satu file database.
+# Engine baca memakai pool koneksi sendiri sehingga query leaderboard tidak mengantre di belakang transaksi tulis.
+def create_engines(path: str, profile: str = DEFAULT_DB_PROFILE, echo: bool = False, read_pool_size: int = 4):
+    pragmas = DB_PROFILES[profile]
+
+    writer = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=echo)
+    reader = create_async_engine(
+        f"sqlite+aiosqlite:///file:{path}?mode=ro&uri=true",
+        echo=echo,
+        pool_size=read_pool_size,
+        max_overflow=0
+    )
+
+    @event.listens_for(writer.sync_engine, "connect")
+    def _apply_writer_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(reader.sync_engine, "connect")
+    def _apply_reader_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            if name not in ("journal_mode", "synchronous"):
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return writer, reader
+
+# Engine async yang digunakan SQLAlchemy untuk berkomunikasi dengan SQLite (penulis dan pembaca)
+engine = None
+read_engine = None
 
 # Session factory yang menghasilkan session async setiap kali dibutuhkan
-AsyncSessionLocal = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+AsyncSessionLocal = None
+ReadSessionLocal = None
+
+# Mengatur ulang engine dan session factory sesuai profil yang dipilih (dipanggil dari CLI server.py).
+def configure_database(profile: str = DEFAULT_DB_PROFILE, echo: bool = False, read_pool_size: int = 4) -> None:
+    global engine, read_engine, AsyncSessionLocal, ReadSessionLocal
+
+    # Echo SQL disalurkan lewat logger "sqlalchemy.engine" agar ikut sistem logging non-blocking
+    if echo:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    engine, read_engine = create_engines(DATABASE_PATH, profile, False, read_pool_size)
+    AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    ReadSessionLocal = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+
+configure_database()
 
 # Base dari SQLAlchemy untuk membuat model tabel
 Base = declarative_base()
@@ -25,10 +81,47 @@ async def init_db():
     Membuat semua tabel di database.
     """
     import os
-    os.makedirs(os.path.dirname(DATABASE_URL.split("///")[-1]), exist_ok=True)
+    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+
+# Menutup semua koneksi di pool penulis dan pembaca.
+# Dipanggil sebelum fork worker agar proses anak tidak mewarisi koneksi SQLite yang sedang terbuka.
+async def dispose_engines():
+    """
+    Menutup koneksi database yang tersimpan di pool.
+    """
+    await engine.dispose()
+    await read_engine.dispose()
+
+# Migrasi untuk file typing_race.db lama:
+# 1) Membuat index baru pada tabel yang sudah ada (create_all tidak menyentuh tabel lama), dan menghapus
+#    index ix_scores_wpm_desc_username yang tidak lagi dipakai query mana pun sejak leaderboard dibaca dari user_best.
+# 2) Mengisi tabel user_best dari tabel scores jika user_best masih kosong.
+def run_migrations(sync_conn, force_backfill: bool = False) -> None:
+    """
+    Menjalankan migrasi skema dan backfill tabel user_best.
+    """
+    from sqlalchemy import insert, select, func, text
+    from models.score import Score
+    from models.user_best import UserBest
+
+    for table in (Score.__table__, UserBest.__table__):
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    sync_conn.execute(text("DROP INDEX IF EXISTS ix_scores_wpm_desc_username"))
+
+    has_best = sync_conn.execute(select(UserBest.username).limit(1)).first()
+    if has_best and not force_backfill:
+        return
+
+    if force_backfill:
+        sync_conn.execute(UserBest.__table__.delete())
+
+    aggregate = select(Score.username, func.max(Score.wpm)).where(Score.username.is_not(None)).group_by(Score.username)
+    sync_conn.execute(insert(UserBest).from_select(["username", "best_wpm"], aggregate))
 
 # Dependency injector untuk mengambil session database secara async
 @asynccontextmanager
@@ -44,4 +137,16 @@ async def get_async_session() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+# Session khusus baca dari pool read-only, dipakai untuk leaderboard.
+@asynccontextmanager
+async def get_read_session() -> AsyncSession:
+    """
+    Dependency injector untuk sesi database async read-only.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
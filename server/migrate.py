@@ -0,0 +1,22 @@
+import asyncio
+import argparse
+from extensions import engine, init_db, run_migrations
+from models.score import Score
+from models.user_best import UserBest
+
+# Skrip migrasi untuk file typing_race.db yang sudah ada.
+# Membuat tabel/index baru dan mengisi ulang tabel user_best dari riwayat tabel scores.
+async def main(rebuild: bool):
+    print("=== MIGRASI DATABASE ===")
+    await init_db()
+    if rebuild:
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations, True)
+        print("[MIGRATE] Tabel user_best dibangun ulang dari tabel scores.")
+    print("[MIGRATE] Selesai.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrasi database Typing Race')
+    parser.add_argument('--rebuild', action="store_true", dest="rebuild", help="Bangun ulang user_best walaupun sudah terisi")
+    given_args = parser.parse_args()
+    asyncio.run(main(given_args.rebuild))
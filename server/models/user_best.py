@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from extensions import Base # Impor Base dari extensions.py
+
+# Tabel denormalisasi: satu baris per user berisi WPM terbaiknya.
+# Diperbarui (upsert) bersamaan dengan penyimpanan skor agar leaderboard cukup membaca index, bukan agregasi seluruh tabel scores.
+class UserBest(Base):
+    __tablename__ = "user_best"
+
+    username = Column(String, primary_key=True)
+    best_wpm = Column(Integer, nullable=False)
+    achieved_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_user_best_rank", best_wpm.desc(), username),
+    )
@@ -1,11 +1,51 @@
 import asyncio
 import argparse
+import os
+import signal
+import socket
 import sys
-from extensions import init_db, get_async_session
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.logs import setup_logging, shutdown_logging, parse_sample_rates
+from extensions import init_db, dispose_engines, configure_database, get_async_session, get_read_session, DB_PROFILES, DEFAULT_DB_PROFILE
 from controllers.game_controller import GameController
+from services.cluster import Coordinator, WorkerLink
+from services.metrics import Metrics
+from services.corpus import Corpus
+from services.diagnostics import Diagnostics, PROFILE_FORMATS
 
 # Inisialisasi controller utama yang akan menangani seluruh koneksi TCP
-game_controller = GameController(get_async_session)
+game_controller = GameController(get_async_session, get_read_session)
+
+# Diisi jika --diagnostics: opsi watchdog event loop dan profiler SIGUSR1, dipakai setiap proses (server, worker, coordinator).
+diagnostics_options = None
+
+# Mengaktifkan metrik untuk controller/coordinator dan membuka endpoint /metrics (hanya jika --metrics-port diisi).
+async def start_metrics(component, host, port):
+    if not port:
+        return None
+    metrics = Metrics()
+    component.enable_metrics(metrics)
+    await metrics.start(host, port)
+    return metrics
+
+# Menjalankan watchdog event loop dan profiler on-demand di proses ini (hanya jika --diagnostics).
+def start_diagnostics(name, metrics):
+    if diagnostics_options is None:
+        return None
+    diagnostics = Diagnostics(name, **diagnostics_options)
+    if metrics:
+        diagnostics.enable_metrics(metrics)
+    diagnostics.start()
+    return diagnostics
+
+# SIGTERM (kill biasa) menghentikan proses seperti Ctrl+C: task serve dibatalkan sehingga blok finally tetap
+# menulis sisa antrean skor. Dipasang di event loop (bukan signal.default_int_handler) agar KeyboardInterrupt
+# tidak dilempar di tengah callback sembarang, yang bisa tertelan oleh except di handler koneksi.
+def stop_on_sigterm(task):
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
 
 # Fungsi utama yang dijalankan saat server dibuka
 # Tugasnya:
@@ -13,24 +53,147 @@ game_controller = GameController(get_async_session)
 # 2) Membuat TCP server
 # 3) Menunggu dan menangani koneksi client
 # Referensi Kode Python Implementasi AsyncIOServer.py dari mata kuliah Distributed Systems
-async def main(host, port):
+async def main(host, port, metrics_host="127.0.0.1", metrics_port=0):
     print("\n=== TCP GAME SERVER STARTUP ===")
     
     print("[SERVER] Memeriksa database...")
     await init_db()
+    await game_controller.start()
     print("[SERVER] Database siap.")
+    metrics = await start_metrics(game_controller, metrics_host, metrics_port)
+    diagnostics = start_diagnostics("server", metrics)
     
     server = await asyncio.start_server(
         game_controller.handle_connection, 
         host, 
-        port
+        port,
+        limit=game_controller.admission.max_line
     )
     
     print(f"[SERVER] Server berjalan di {host}:{port}")
     print("[SERVER] Menunggu koneksi client...\n")
     
-    async with server:
-        await server.serve_forever()
+    try:
+        async with server:
+            serve_task = asyncio.create_task(server.serve_forever())
+            stop_on_sigterm(serve_task)
+            await asyncio.wait([serve_task])
+    finally:
+        await game_controller.shutdown()
+        if diagnostics:
+            await diagnostics.close()
+        if metrics:
+            await metrics.close()
+
+# Dijalankan di setiap proses worker (--workers N).
+# Worker terhubung ke coordinator lalu membuka port yang sama dengan worker lain (SO_REUSEPORT),
+# sehingga kernel membagi koneksi baru ke semua worker. Worker berhenti jika coordinator mati.
+# Endpoint metrik worker ke-i ada di --metrics-port + 1 + i (port dasar dipakai coordinator).
+async def worker_main(host, port, worker_id, coordinator_path, metrics_host="127.0.0.1", metrics_port=0):
+    link = WorkerLink(worker_id)
+    game_controller.attach_cluster(link)
+    await link.connect(coordinator_path, game_controller.handle_cluster_message)
+    await game_controller.start()
+    metrics = await start_metrics(game_controller, metrics_host, metrics_port and metrics_port + 1 + worker_id)
+    diagnostics = start_diagnostics(f"worker{worker_id}", metrics)
+
+    server = await asyncio.start_server(
+        game_controller.handle_connection, 
+        host, 
+        port,
+        reuse_port=True,
+        limit=game_controller.admission.max_line
+    )
+    print(f"[WORKER {worker_id}] Berjalan di {host}:{port} (pid {os.getpid()})")
+
+    try:
+        async with server:
+            serve_task = asyncio.create_task(server.serve_forever())
+            stop_on_sigterm(serve_task)
+            await asyncio.wait([serve_task, link.task], return_when=asyncio.FIRST_COMPLETED)
+            serve_task.cancel()
+    finally:
+        await game_controller.shutdown()
+        if diagnostics:
+            await diagnostics.close()
+        if metrics:
+            await metrics.close()
+
+# Dijalankan di proses induk saat --workers N: coordinator matchmaking, leaderboard, dan penulisan skor.
+async def coordinator_main(coordinator, sock, metrics_host="127.0.0.1", metrics_port=0):
+    await coordinator.start(sock)
+    metrics = await start_metrics(coordinator, metrics_host, metrics_port)
+    diagnostics = start_diagnostics("coordinator", metrics)
+    try:
+        serve_task = asyncio.create_task(coordinator.serve_forever())
+        stop_on_sigterm(serve_task)
+        await asyncio.wait([serve_task])
+    finally:
+        await coordinator.shutdown()
+        if diagnostics:
+            await diagnostics.close()
+        if metrics:
+            await metrics.close()
+
+# Mode multi-proses:
+# 1) Database disiapkan sekali di proses induk, lalu semua koneksi ditutup sebelum fork
+# 2) Unix socket coordinator di-listen sebelum fork agar worker bisa langsung terhubung
+# 3) N worker di-fork; logging dan engine database dibuat ulang di setiap proses
+def run_workers(host, port, workers, args):
+    async def prepare_database():
+        await init_db()
+        await dispose_engines()
+
+    print(f"\n=== TCP GAME SERVER STARTUP ({workers} worker) ===")
+    print("[SERVER] Memeriksa database...")
+    asyncio.run(prepare_database())
+
+    coordinator_path = os.path.join(tempfile.gettempdir(), f"typing_race_{os.getpid()}.sock")
+    if os.path.exists(coordinator_path):
+        os.unlink(coordinator_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(coordinator_path)
+    sock.listen(workers)
+
+    children = []
+    for worker_id in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            code = 0
+            try:
+                setup_logging(args.log_level, parse_sample_rates(args.log_sample))
+                configure_database(args.db_profile, args.db_echo, args.db_read_pool)
+                asyncio.run(worker_main(host, port, worker_id, coordinator_path, args.metrics_host, args.metrics_port))
+            except KeyboardInterrupt:
+                pass
+            except Exception as e:
+                print(f"[WORKER {worker_id}] Fatal: {e}")
+                code = 1
+            finally:
+                shutdown_logging()
+            os._exit(code)
+        children.append(pid)
+
+    setup_logging(args.log_level, parse_sample_rates(args.log_sample))
+    configure_database(args.db_profile, args.db_echo, args.db_read_pool)
+    coordinator = Coordinator(get_async_session, get_read_session, game_controller.room_size,
+                              game_controller.min_room_size, game_controller.room_fill_after)
+    print(f"[SERVER] Coordinator berjalan (pid {os.getpid()}), {workers} worker di {host}:{port}")
+    try:
+        asyncio.run(coordinator_main(coordinator, sock, args.metrics_host, args.metrics_port))
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        os.unlink(coordinator_path)
 
 # fungsi yang mengganti variabel host dan port jikalau diisi.
 # bertujuan untuk memberikan ip dan port kepada server untuk berjalan
@@ -38,14 +201,80 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='TCP Game Server')
     parser.add_argument('--host', action="store", dest="host", required=True, help="Host IP address to bind")
     parser.add_argument('--port', action="store", dest="port", type=int, required=True, help="Port number to bind")
+    parser.add_argument('--db-profile', action="store", dest="db_profile", choices=sorted(DB_PROFILES), default=DEFAULT_DB_PROFILE, help="SQLite performance profile")
+    parser.add_argument('--db-echo', action="store_true", dest="db_echo", help="Log every SQL statement")
+    parser.add_argument('--db-read-pool', action="store", dest="db_read_pool", type=int, default=4, help="Size of the read-only connection pool")
+    parser.add_argument('--progress-hz', action="store", dest="progress_hz", type=float, default=10.0, help="Progress relay tick rate (0 = forward immediately)")
+    parser.add_argument('--typing-mode', action="store", dest="typing_mode", choices=("server", "client"), default="server", help="server validates input deltas and computes progress/WPM, client trusts progress/WPM/finish sent by clients")
+    parser.add_argument('--corpus', action="store", dest="corpus", help="Compiled text corpus (see build_corpus.py) instead of the built-in texts")
+    parser.add_argument('--corpus-tier', action="store", dest="corpus_tier", default="auto", help="Corpus difficulty tier: auto (from room rating), all, or a tier number")
+    parser.add_argument('--leaderboard-size', action="store", dest="leaderboard_size", type=int, default=10, help="Number of top players sent to clients")
+    parser.add_argument('--room-size', action="store", dest="room_size", type=int, default=2, help="Players per race room")
+    parser.add_argument('--min-room-size', action="store", dest="min_room_size", type=int, default=2, help="Smallest room started after --room-fill-after seconds of waiting")
+    parser.add_argument('--room-fill-after', action="store", dest="room_fill_after", type=float, default=10.0, help="Seconds before a partially filled room may start")
+    parser.add_argument('--max-connections', action="store", dest="max_connections", type=int, default=0, help="Maximum open connections per process (0 = unlimited)")
+    parser.add_argument('--max-per-ip', action="store", dest="max_per_ip", type=int, default=0, help="Maximum open connections per client IP per process (0 = unlimited)")
+    parser.add_argument('--accept-rate', action="store", dest="accept_rate", type=float, default=0.0, help="New connections accepted per second per process, token bucket (0 = unlimited)")
+    parser.add_argument('--accept-burst', action="store", dest="accept_burst", type=int, default=100, help="Token bucket size for --accept-rate")
+    parser.add_argument('--login-timeout', action="store", dest="login_timeout", type=float, default=10.0, help="Seconds a new connection has to send its login line (0 = no limit)")
+    parser.add_argument('--idle-timeout', action="store", dest="idle_timeout", type=float, default=0.0, help="Disconnect logged-in players that are not racing or queued after this many idle seconds (0 = never)")
+    parser.add_argument('--max-line', action="store", dest="max_line", type=int, default=16384, help="Maximum length of one JSON line in bytes")
+    parser.add_argument('--workers', action="store", dest="workers", type=int, default=1, help="Number of worker processes sharing the port (Linux, SO_REUSEPORT)")
+    parser.add_argument('--metrics-port', action="store", dest="metrics_port", type=int, default=0, help="Serve Prometheus metrics on this port (0 = disabled)")
+    parser.add_argument('--metrics-host', action="store", dest="metrics_host", default="127.0.0.1", help="Address for the metrics endpoint")
+    parser.add_argument('--diagnostics', action="store_true", dest="diagnostics", help="Log event loop stalls with stack traces and enable SIGUSR1 profiling")
+    parser.add_argument('--stall-threshold', action="store", dest="stall_threshold", type=float, default=100.0, help="Event loop stall threshold in milliseconds (--diagnostics)")
+    parser.add_argument('--profile-format', action="store", dest="profile_format", choices=PROFILE_FORMATS, default="collapsed", help="SIGUSR1 profile format: collapsed stacks (sampling) or pstats (cProfile)")
+    parser.add_argument('--profile-seconds', action="store", dest="profile_seconds", type=float, default=30.0, help="Length of a SIGUSR1 profile in seconds")
+    parser.add_argument('--profile-hz', action="store", dest="profile_hz", type=float, default=100.0, help="Samples per second for collapsed profiles")
+    parser.add_argument('--profile-dir', action="store", dest="profile_dir", default=".", help="Directory for profile files")
+    parser.add_argument('--log-level', action="store", dest="log_level", default="INFO", help="Log level (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument('--log-sample', action="append", dest="log_sample", metavar="CATEGORY=RATE", help="Sample a log category, e.g. server.progress=0.01")
     
     try:
         given_args = parser.parse_args()
         host = given_args.host
         port = given_args.port
-        
-        asyncio.run(main(host, port))
+
+        game_controller.progress_hz = given_args.progress_hz
+        game_controller.typing_mode = given_args.typing_mode
+        if given_args.corpus:
+            # Dibuka sebelum worker di-fork sehingga mmap korpus dipakai bersama oleh semua worker
+            game_controller.corpus = Corpus(given_args.corpus)
+            tier = given_args.corpus_tier
+            game_controller.corpus_tier = None if tier == "all" else tier if tier == "auto" else int(tier)
+            print(f"[SERVER] Korpus: {given_args.corpus} ({len(game_controller.corpus)} teks, {len(game_controller.corpus.tiers)} tier)")
+        game_controller.leaderboard_cache.size = max(1, given_args.leaderboard_size)
+        admission = game_controller.admission
+        admission.max_connections = max(0, given_args.max_connections)
+        admission.max_per_ip = max(0, given_args.max_per_ip)
+        admission.accept_rate = max(0.0, given_args.accept_rate)
+        admission.accept_burst = admission.tokens = max(1, given_args.accept_burst)
+        admission.login_timeout = max(0.0, given_args.login_timeout)
+        admission.idle_timeout = max(0.0, given_args.idle_timeout)
+        admission.max_line = max(1024, given_args.max_line)
+        game_controller.room_size = max(2, given_args.room_size)
+        game_controller.min_room_size = max(2, min(given_args.min_room_size, game_controller.room_size))
+        game_controller.room_fill_after = given_args.room_fill_after
+        if given_args.diagnostics:
+            diagnostics_options = {
+                "threshold": max(given_args.stall_threshold, 1.0) / 1000,
+                "profile_dir": given_args.profile_dir,
+                "profile_format": given_args.profile_format,
+                "profile_seconds": max(given_args.profile_seconds, 1.0),
+                "profile_hz": max(given_args.profile_hz, 1.0),
+            }
+        print(f"[SERVER] Profil database: {given_args.db_profile}")
+
+        configure_database(given_args.db_profile, given_args.db_echo, given_args.db_read_pool)
+        if given_args.workers > 1:
+            run_workers(host, port, given_args.workers, given_args)
+        else:
+            setup_logging(given_args.log_level, parse_sample_rates(given_args.log_sample))
+            asyncio.run(main(host, port, given_args.metrics_host, given_args.metrics_port))
     except KeyboardInterrupt:
         print("\n[SERVER] Server dihentikan")
     except Exception as e:
-        print(f"[ERROR] Fatal: {e}")
\ No newline at end of file
+        print(f"[ERROR] Fatal: {e}")
+    finally:
+        shutdown_logging()
\ No newline at end of file
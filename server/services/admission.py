@@ -0,0 +1,102 @@
+import asyncio
+from typing import Dict, List, Optional
+
+# Admission control untuk koneksi TCP yang masuk ke server:
+# - max_connections / max_per_ip : batas koneksi terbuka bersamaan, global dan per alamat IP (0 = tanpa batas)
+# - accept_rate / accept_burst   : token bucket untuk laju koneksi baru per detik (0 = tanpa batas)
+# - login_timeout                : batas detik untuk mengirim baris login setelah connect
+# - idle_timeout                 : session yang sudah login diputus jika tidak mengirim pesan selama ini (0 = nonaktif,
+#                                  default karena browser tidak mengirim apa pun selama pemain diam di menu/leaderboard)
+# - max_line                     : panjang maksimal satu baris JSON (limit StreamReader)
+# Koneksi yang ditolak langsung ditutup sebelum ada yang dibaca. Semua batas berlaku per proses
+# (per worker dalam mode --workers N). Pemeriksaan batas waktu dilakukan oleh satu task reaper di GameController.
+class Admission:
+
+    def __init__(self, max_connections: int = 0, max_per_ip: int = 0, accept_rate: float = 0.0, accept_burst: int = 100,
+                 login_timeout: float = 10.0, idle_timeout: float = 0.0, max_line: int = 16384):
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.accept_rate = accept_rate
+        self.accept_burst = accept_burst
+        self.login_timeout = login_timeout
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+
+        self.open = 0
+        self.per_ip: Dict[str, int] = {}
+        self.tokens = float(accept_burst)
+        self.refilled: Optional[float] = None
+        # Koneksi yang belum login -> waktu connect, diperiksa reaper terhadap login_timeout
+        self.pending: Dict[asyncio.StreamWriter, float] = {}
+
+        self.accepted = 0
+        self.rejected: Dict[str, int] = {"capacity": 0, "per_ip": 0, "rate": 0}
+        self.login_timeouts = 0
+        self.oversized = 0
+        self.reaped = 0
+
+    # Jeda antar pemeriksaan reaper: cukup rapat untuk batas waktu terpendek, maksimal 5 detik.
+    @property
+    def sweep_interval(self) -> float:
+        limits = [t for t in (self.login_timeout, self.idle_timeout) if t > 0]
+        return min([5.0] + [t / 4 for t in limits])
+
+    # Mengembalikan alasan penolakan ("capacity", "per_ip", "rate"), atau None jika koneksi diterima.
+    # Koneksi yang diterima dihitung sampai release() dipanggil; token hanya dipakai oleh koneksi yang lolos batas lain.
+    def admit(self, ip: str, now: float) -> Optional[str]:
+        if self.max_connections and self.open >= self.max_connections:
+            reason = "capacity"
+        elif self.max_per_ip and self.per_ip.get(ip, 0) >= self.max_per_ip:
+            reason = "per_ip"
+        elif not self._take_token(now):
+            reason = "rate"
+        else:
+            self.open += 1
+            self.per_ip[ip] = self.per_ip.get(ip, 0) + 1
+            self.accepted += 1
+            return None
+        self.rejected[reason] += 1
+        return reason
+
+    def release(self, ip: str) -> None:
+        self.open -= 1
+        count = self.per_ip.get(ip, 0) - 1
+        if count > 0:
+            self.per_ip[ip] = count
+        else:
+            self.per_ip.pop(ip, None)
+
+    # Koneksi yang melewati login_timeout tanpa login; dikeluarkan dari pending dan dihitung sebagai login_timeouts.
+    def expired_logins(self, now: float) -> List[asyncio.StreamWriter]:
+        if not self.login_timeout:
+            return []
+        cutoff = now - self.login_timeout
+        expired = [writer for writer, opened in self.pending.items() if opened < cutoff]
+        for writer in expired:
+            del self.pending[writer]
+        self.login_timeouts += len(expired)
+        return expired
+
+    def stats(self) -> dict:
+        return {
+            "open": self.open,
+            "pending_login": len(self.pending),
+            "accepted": self.accepted,
+            "rejected_capacity": self.rejected["capacity"],
+            "rejected_per_ip": self.rejected["per_ip"],
+            "rejected_rate": self.rejected["rate"],
+            "login_timeouts": self.login_timeouts,
+            "oversized": self.oversized,
+            "reaped": self.reaped,
+        }
+
+    def _take_token(self, now: float) -> bool:
+        if self.accept_rate <= 0:
+            return True
+        if self.refilled is not None:
+            self.tokens = min(float(self.accept_burst), self.tokens + (now - self.refilled) * self.accept_rate)
+        self.refilled = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
@@ -0,0 +1,310 @@
+import asyncio
+import itertools
+import json
+import socket
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.leaderboard_cache import LeaderboardCache
+from services.matchmaking_engine import MatchmakingEngine, RatingBook
+from services.score_writer import ScoreWriter
+from services.session import Session
+from services.metrics import Metrics, WAIT_BUCKETS
+from common.logs import get_logger
+
+logger = get_logger("server.cluster")
+
+# Mode multi-proses (--workers N):
+# - N proses worker berbagi port TCP yang sama (SO_REUSEPORT), masing-masing menjalankan GameController sendiri.
+# - Proses induk menjadi coordinator: memegang antrean matchmaking, rating, leaderboard, dan satu-satunya ScoreWriter.
+# - Worker terhubung ke coordinator lewat Unix socket, satu pesan JSON per baris dengan field "op".
+#
+# Satu room dijalankan oleh satu worker (host). Pemain yang terhubung ke worker lain diwakili RemotePlayer di host,
+# dan pesan di antara keduanya diteruskan oleh coordinator (op "route"):
+#   host -> worker pemain : deliver (payload untuk pemain), release (pemain sudah keluar dari room)
+#   worker pemain -> host : play (progress/finish/leave dari pemain)
+
+PlayerKey = Tuple[int, int]
+
+def encode(msg: dict) -> bytes:
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+# Wakil pemain yang socket-nya berada di worker lain. Dipakai host di Room seperti Session biasa
+# (username, room, seat), tetapi tanpa antrean keluar: pesan untuknya dikirim lewat WorkerLink.deliver().
+class RemotePlayer:
+    __slots__ = ("worker", "pid", "closed", "username", "room", "seat")
+    outbound = None
+    waiting = None
+    host = None
+
+    def __init__(self, worker: int, pid: int):
+        self.worker = worker
+        self.pid = pid
+        self.closed = False
+        self.username: Optional[str] = None
+        self.room = None
+        self.seat: Optional[int] = None
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+# Koneksi sebuah worker ke coordinator. Pemain lokal diidentifikasi dengan id Session-nya (sid);
+# status antrean dan worker host-nya disimpan di Session itu sendiri (queued, host).
+class WorkerLink:
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.task: Optional[asyncio.Task] = None
+
+        self.remotes: Dict[PlayerKey, RemotePlayer] = {}
+
+    async def connect(self, path: str, handler: Callable[[dict], Awaitable[None]]) -> None:
+        self.reader, self.writer = await asyncio.open_unix_connection(path)
+        self.send({"op": "hello", "worker": self.worker_id})
+        self.task = asyncio.create_task(self._run(handler))
+
+    async def close(self) -> None:
+        if self.task:
+            self.task.cancel()
+        if self.writer:
+            self.writer.close()
+
+    async def _run(self, handler: Callable[[dict], Awaitable[None]]) -> None:
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                logger.warning("Koneksi worker %d ke coordinator terputus.", self.worker_id)
+                return
+            try:
+                await handler(json.loads(line))
+            except Exception as exc:
+                logger.error("Gagal memproses pesan cluster: %s", exc)
+
+    # Unix socket lokal: write tanpa await, buffer dikosongkan oleh transport.
+    def send(self, msg: dict) -> None:
+        if self.writer and not self.writer.is_closing():
+            self.writer.write(encode(msg))
+
+    def route(self, worker: int, msg: dict) -> None:
+        self.send({"op": "route", "to": worker, "msg": msg})
+
+    def enqueue(self, session: Session) -> None:
+        session.queued = True
+        self.send({"op": "enqueue", "pid": session.sid, "username": session.username})
+
+    def cancel(self, session: Session) -> bool:
+        if not session.queued:
+            return False
+        session.queued = False
+        self.send({"op": "cancel", "pid": session.sid})
+        return True
+
+    # Mengirim satu payload ke beberapa RemotePlayer: satu pesan per worker tujuan.
+    def deliver(self, players: Iterable[RemotePlayer], payload: dict) -> None:
+        by_worker: Dict[int, List[int]] = defaultdict(list)
+        for player in players:
+            if not player.closed:
+                by_worker[player.worker].append(player.pid)
+        for worker, pids in by_worker.items():
+            self.route(worker, {"op": "deliver", "pids": pids, "payload": payload})
+
+    # Meneruskan pesan permainan pemain lokal ke worker yang menjalankan room-nya.
+    def play(self, session: Session, message: dict) -> None:
+        if session.host is not None:
+            self.route(session.host, {"op": "play", "from": [self.worker_id, session.sid], "message": message})
+
+    def remote(self, worker: int, pid: int) -> RemotePlayer:
+        player = self.remotes.get((worker, pid))
+        if player is None:
+            player = self.remotes[(worker, pid)] = RemotePlayer(worker, pid)
+        return player
+
+    # Host melepas RemotePlayer dari room-nya dan memberi tahu worker pemilik socket.
+    def release(self, player: RemotePlayer) -> None:
+        if self.remotes.pop((player.worker, player.pid), None) is not None:
+            self.route(player.worker, {"op": "release", "pid": player.pid})
+
+# RatingBook milik worker: perubahan rating juga dikirim ke coordinator yang menjalankan matchmaking.
+class LinkedRatingBook(RatingBook):
+
+    def __init__(self, link: WorkerLink):
+        super().__init__()
+        self.link = link
+
+    def update(self, username: Optional[str], wpm: int) -> None:
+        super().update(username, wpm)
+        if username is not None:
+            self.link.send({"op": "rating", "username": username, "wpm": wpm})
+
+# Proses coordinator: antrean matchmaking bersama, rating, leaderboard, penulisan skor, dan router pesan antar worker.
+class Coordinator:
+
+    def __init__(self, session_factory: Callable, read_session_factory: Optional[Callable] = None,
+                 room_size: int = 2, min_room_size: int = 2, room_fill_after: float = 10.0, sweep_interval: float = 1.0):
+        self.read_session_factory = read_session_factory or session_factory
+        self.room_size = room_size
+        self.min_room_size = min_room_size
+        self.room_fill_after = room_fill_after
+        self.sweep_interval = sweep_interval
+
+        self.matchmaker: MatchmakingEngine[PlayerKey] = MatchmakingEngine()
+        self.ratings = RatingBook()
+        self.leaderboard = LeaderboardCache()
+        self.score_writer = ScoreWriter(session_factory)
+        self.workers: Dict[int, asyncio.StreamWriter] = {}
+        self.names: Dict[PlayerKey, Optional[str]] = {}
+        self.room_ids = itertools.count(1)
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.sweep_task: Optional[asyncio.Task] = None
+        self.rooms = 0
+        self.routed = 0
+        self.matchmaking_wait = None
+
+    # Metrik coordinator: lama menunggu di antrean bersama, statistik routing, leaderboard, dan penulisan skor.
+    def enable_metrics(self, metrics: Metrics) -> None:
+        self.matchmaking_wait = metrics.histogram(
+            "matchmaking_wait_seconds", "Time a player spent in the shared matchmaking queue before a room was opened", WAIT_BUCKETS)
+        metrics.stats("coordinator", "Coordinator statistics", self.stats, counters=("rooms", "routed"))
+        metrics.stats("leaderboard_cache", "Leaderboard cache statistics", self.leaderboard.stats,
+                      counters=("hits", "misses", "rebuilds"))
+        metrics.stats("score_writer", "Background score writer statistics", self.score_writer.stats,
+                      counters=("written", "failed", "retries", "commits"))
+
+    # Memuat rating dan leaderboard dari database lalu menerima koneksi worker pada socket yang sudah di-listen.
+    async def start(self, sock: socket.socket) -> None:
+        await self.ratings.load(self.read_session_factory)
+        await self.leaderboard.load(self.read_session_factory)
+        self.score_writer.start()
+        self.server = await asyncio.start_unix_server(self._handle_worker, sock=sock)
+        self.sweep_task = asyncio.create_task(self._sweeper())
+        logger.info("Coordinator siap: %d rating, %d user leaderboard.", len(self.ratings.ratings), len(self.leaderboard.best))
+
+    async def serve_forever(self) -> None:
+        await self.server.serve_forever()
+
+    # Menutup koneksi worker lebih dulu agar handler-nya selesai dengan normal, lalu menulis sisa antrean skor.
+    async def shutdown(self) -> None:
+        if self.sweep_task:
+            self.sweep_task.cancel()
+        if self.server:
+            self.server.close()
+        for writer in list(self.workers.values()):
+            writer.close()
+        logger.info("Menulis sisa antrean skor (%d)...", self.score_writer.queue.qsize())
+        await self.score_writer.close()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        worker = None
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            worker = hello.get("worker")
+            if hello.get("op") != "hello" or worker is None:
+                return
+            self.workers[worker] = writer
+            logger.info("Worker %d terhubung ke coordinator.", worker)
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    await self._dispatch(worker, json.loads(line))
+                except Exception as exc:
+                    logger.error("Pesan worker %d gagal diproses: %s", worker, exc)
+        except asyncio.CancelledError:
+            # Coordinator sedang berhenti
+            pass
+        finally:
+            if worker is not None and self.workers.get(worker) is writer:
+                del self.workers[worker]
+                for key in [key for key in self.names if key[0] == worker]:
+                    self.matchmaker.remove(key)
+                    self.names.pop(key, None)
+                for other in self.workers:
+                    self._send(other, {"op": "worker_down", "worker": worker})
+                logger.warning("Worker %d terputus dari coordinator.", worker)
+            writer.close()
+
+    def _send(self, worker: int, msg: dict) -> None:
+        writer = self.workers.get(worker)
+        if writer is not None and not writer.is_closing():
+            writer.write(encode(msg))
+
+    async def _dispatch(self, worker: int, msg: dict) -> None:
+        op = msg.get("op")
+        if op == "route":
+            self.routed += 1
+            self._send(msg["to"], msg["msg"])
+        elif op == "enqueue":
+            key = (worker, msg["pid"])
+            self.names[key] = msg.get("username")
+            self._enqueue(key)
+        elif op == "cancel":
+            key = (worker, msg["pid"])
+            self.matchmaker.remove(key)
+            self.names.pop(key, None)
+        elif op == "rating":
+            self.ratings.update(msg.get("username"), msg.get("wpm", 0))
+        elif op == "score":
+            # Leaderboard bersama: skor yang mengubah ranking diteruskan ke worker lain agar cache mereka ikut berubah
+            username, wpm = msg.get("username"), msg.get("wpm", 0)
+            if self.leaderboard.record(username, wpm):
+                for other in self.workers:
+                    if other != worker:
+                        self._send(other, {"op": "score", "username": username, "wpm": wpm})
+            await self.score_writer.submit(username, wpm)
+
+    def _enqueue(self, key: PlayerKey) -> None:
+        if key in self.matchmaker:
+            return
+        now = asyncio.get_running_loop().time()
+        rating = self.ratings.get(self.names.get(key))
+        partners = self.matchmaker.find_group(rating, now, self.room_size - 1)
+        if len(partners) == self.room_size - 1:
+            self._open_room([*partners, key])
+            return
+        self.matchmaker.add(key, rating, now)
+        self._send(key[0], {"op": "queued", "pid": key[1], "count": len(self.matchmaker)})
+
+    # Room dijalankan oleh worker yang memiliki pemain terbanyak di grup, sehingga pesan yang harus di-proxy paling sedikit.
+    def _open_room(self, members: List[PlayerKey]) -> None:
+        if self.matchmaking_wait:
+            now = asyncio.get_running_loop().time()
+            for key in members:
+                self.matchmaking_wait.observe(self.matchmaker.waited(key, now))
+        for key in members:
+            self.matchmaker.remove(key)
+        host = Counter(worker for worker, _ in members).most_common(1)[0][0]
+        room_id = next(self.room_ids)
+        self.rooms += 1
+
+        for worker, pid in members:
+            if worker != host:
+                self._send(worker, {"op": "joined", "pid": pid, "host": host})
+        self._send(host, {"op": "room", "room": room_id,
+                          "players": [[worker, pid, self.names.pop((worker, pid), None)] for worker, pid in members]})
+        logger.debug("Room #%d dibentuk di worker %d (%d pemain, %d dari worker lain).",
+                     room_id, host, len(members), sum(1 for worker, _ in members if worker != host))
+
+    async def _sweeper(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            if len(self.matchmaker) < self.min_room_size:
+                continue
+            try:
+                for group in self.matchmaker.sweep(loop.time(), self.room_size, self.min_room_size, self.room_fill_after):
+                    self._open_room(group)
+            except Exception as exc:
+                logger.error("Matchmaking sweep error: %s", exc)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self.workers),
+            "waiting": len(self.matchmaker),
+            "rooms": self.rooms,
+            "routed": self.routed,
+        }
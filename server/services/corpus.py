@@ -0,0 +1,190 @@
+import mmap
+import os
+import random
+import struct
+import tempfile
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from services.typing_engine import TargetText
+
+# Korpus teks balapan yang dikompilasi ke satu file biner lalu dibaca lewat mmap, sehingga memori server tetap datar
+# berapa pun jumlah teksnya dan startup hanya membaca header (bukan seluruh teks).
+#
+# Format file (little-endian):
+#   header  : magic "TTCORP1\0", u32 jumlah teks, u32 jumlah tier, u64 offset tabel spasi, u64 offset blob
+#   tier    : per tier u32 indeks teks pertama, u32 jumlah teks (teks diurutkan per tier, jadi satu tier = satu rentang)
+#   entri   : per teks u64 offset di blob, u32 panjang byte, u32 panjang karakter, u32 indeks spasi pertama,
+#             u32 jumlah spasi (= jumlah kata - 1), f32 skor kesulitan, u32 tier
+#   spasi   : u16 posisi karakter setiap spasi (batas kata TargetText = akhir kata dan setelah spasi) untuk semua teks
+#   blob    : teks UTF-8 tanpa pemisah
+# Spasi disimpan sebagai u16, jadi satu teks maksimal MAX_LENGTH karakter.
+# Pemilihan acak per tier O(1): indeks acak di rentang tier, lalu satu lookup entri.
+
+MAGIC = b"TTCORP1\0"
+MAX_LENGTH = 0xFFFF
+HEADER = struct.Struct("<8sIIQQ")
+TIER = struct.Struct("<II")
+ENTRY = struct.Struct("<QIIIIfI")
+
+# Teks bawaan server, dipakai jika server berjalan tanpa --corpus (dan oleh build_corpus.py --builtin).
+BUILTIN_TEXTS = (
+    "Sometimes the problem isn't about time. Not everyone picks the right path for themselves on the first try, and that can be pretty harmful. If you find a path that matches your strengths, you'll go really fast and really far. But the truth is, not everyone can figure that out right away.",
+    "Animal birds are also necessary for environmental balance. Their numbers are decreasing due to hunting and other reasons. This has added to the mess in the food chain. The balance is disturbed and natural imbalance is encouraged.",
+    "Rivers of the Himalayas are perennial, with water usually obtained from melting ice. There is a smooth flow throughout the year. The Himalayas receive heavy rainfall during the monsoon month, causing frequent flooding due to increased water in the rivers.",
+    "Summer is the hottest season of the year although children enjoy it a lot due to the long holiday. It is a very interesting andentertaining season for them as they get a chance to go swimming and enjoy the hilly areas and eat ice cream and theirfavourite fruits.",
+    "Honey bees are a fascinating and important species that play a crucial role in our ecosystem. These small creatures may seem insignificant but they are responsible for the pollination of a significant portion of the worlds food crops.",
+    "Climate change stands as one of the most pressing issues of our time wielding a profound impact on the delicate balance of ecosystems worldwide. One of the most significant consequences of this global phenomenon is its far-reaching effects on biodiversity.",
+    "Water is the lifeblood of our planet essential for all living beings. Yet despite its fundamental importance the world faces an impending water crisis of unprecedented scale. The Global Water Crisis encapsulates a myriad of challenges scarcity pollution unequal distribution and inadequate access to safe drinking water.",
+    "In recent decades, fossil fuels such as coal, oil, and natural gas have remained the primary sources of energy across the globe. However, growing environmental concerns and the finite nature of these resources have prompted several countries to promote alternative, renewable energy sources like solar.",
+    "In true friendship there is skill and determination like that of a best doctor, patience and tenderness like that of a best mother. Every person should try to make such friendship. A scholar believes that if we get a reliable friend, then our life remains safe.",
+    "Literature has been considered as the repast of the elite and the educated. Literature most commonly refers to works of the creative imagination. The literary author is assumed to inhabit the legendary ivory tower which is far removed from the practical concerns of everyday life.",
+    "Discipline is the invisible framework that supports every long-term ambition, and it grows stronger each time we choose consistent effort over comfortable excuses. People often wait for motivation, imagining a burst of energy that will carry them to success, yet motivation is like weather-pleasant when it appears.",
+    "Globalisation has intensified economic and cultural interactions among nations. While some argue that this phenomenon promotes mutual understanding and development, others fear it threatens traditional values and cultural identity. Both perspectives have validity.",
+    "Technology has become an inseparable part of our daily lives, influencing the way we work, communicate, learn, and even think. From the moment we wake up and check our smartphones to the time we go to bed scrolling through social media or watching videos online, technology surrounds us in every possible form. ",
+    "I believe that history should be made a compulsory course in high school because history serves as a window to the past, enabling students to understand the roots of society, the evolution of cultures, and the forces that have shaped the world we live in today.",
+    "Modern communication has transformed dramatically with the rise of digital technology and global connectivity. Every organization now depends on effective collaboration and constant innovation to maintain competitiveness.",
+    "Barbados is an island nation in the eastern Caribbean, known for its white sand beaches, coral reefs, and rich cultural traditions. The capital city, Bridgetown, serves as the political, commercial, and cultural heart of the country.",
+    "Minecraft is a popular sandbox game that allows players to explore, build, and survive in a blocky, pixelated world. Its open-ended gameplay encourages creativity and experimentation, making it one of the most beloved games worldwide.",
+    "The boy's name was Santiago. Dusk was falling as the boy arrived with his herd at an abandoned church. The roof had fallen in long ago, and an enormous sycamore had grown on the spot where the sacristy had once stood.",
+    "Artificial Intelligence has rapidly transforming the functioning of the financial market globally. From high-speed algorithm trading to fraud detection and risk management, AI has become the essential part of the market infrastructure.",
+    "The real task is to observe the storm within: the urge to upgrade, to compare, to display. That same storm heats both the atmosphere and the psyche. When awareness deepens, manipulation loses its hold. The person who knows his phone works perfectly will not bow to an advertisement promising completion through an upgrade.",
+)
+
+# Skor kesulitan sederhana: kata panjang, huruf besar, angka, dan tanda baca membuat teks lebih sulit diketik.
+def difficulty(text: str) -> float:
+    words = text.split()
+    if not words:
+        return 0.0
+    avg_word = sum(len(w) for w in words) / len(words)
+    special = sum(1 for c in text if not (c.islower() or c == " "))
+    return round(avg_word + 10 * special / len(text), 3)
+
+def space_positions(text: str) -> List[int]:
+    return [i for i, char in enumerate(text) if char == " "]
+
+# Posisi batas kata untuk TargetText: 0, akhir setiap kata (sebelum spasi), setelah setiap spasi, dan akhir teks.
+def word_boundaries(spaces: Sequence[int], length: int) -> List[int]:
+    bounds = [0]
+    for i in spaces:
+        if bounds[-1] != i:
+            bounds.append(i)
+        bounds.append(i + 1)
+    if bounds[-1] != length:
+        bounds.append(length)
+    return bounds
+
+# Satu teks per baris; baris kosong diabaikan dan spasi berlebih dirapikan.
+def read_passages(paths: Iterable[str]) -> Iterable[str]:
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                text = " ".join(line.split())
+                if text:
+                    yield text
+
+# Mengompilasi teks menjadi file korpus. Teks dan batas kata ditulis bertahap ke file sementara, yang disimpan
+# di memori hanya entri kecil per teks; tier dibagi berdasarkan kuantil skor kesulitan (tier 0 = paling mudah).
+def compile_corpus(passages: Iterable[str], output: str, tiers: int = 3) -> Tuple[int, List[int]]:
+    tiers = max(1, tiers)
+    entries = []
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryFile(dir=directory) as blob, tempfile.TemporaryFile(dir=directory) as spaces_file:
+        blob_size = 0
+        space_count = 0
+        for text in passages:
+            if len(text) > MAX_LENGTH:
+                raise ValueError(f"teks lebih dari {MAX_LENGTH} karakter: {text[:40]}...")
+            data = text.encode("utf-8")
+            spaces = space_positions(text)
+            blob.write(data)
+            spaces_file.write(struct.pack(f"<{len(spaces)}H", *spaces))
+            entries.append([blob_size, len(data), len(text), space_count, len(spaces), difficulty(text), 0])
+            blob_size += len(data)
+            space_count += len(spaces)
+
+        if not entries:
+            raise ValueError("tidak ada teks untuk dikompilasi")
+        entries.sort(key=lambda e: e[5])
+        table = []
+        for tier in range(tiers):
+            start = len(entries) * tier // tiers
+            end = len(entries) * (tier + 1) // tiers
+            for entry in entries[start:end]:
+                entry[6] = tier
+            table.append((start, end - start))
+
+        spaces_offset = HEADER.size + TIER.size * tiers + ENTRY.size * len(entries)
+        blob_offset = spaces_offset + 2 * space_count
+        with open(output, "wb") as out:
+            out.write(HEADER.pack(MAGIC, len(entries), tiers, spaces_offset, blob_offset))
+            for start, count in table:
+                out.write(TIER.pack(start, count))
+            for entry in entries:
+                out.write(ENTRY.pack(*entry))
+            for source in (spaces_file, blob):
+                source.seek(0)
+                while True:
+                    chunk = source.read(1 << 20)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+    return len(entries), [count for _, count in table]
+
+# File korpus yang sudah dikompilasi, dibaca lewat mmap. TargetText yang sering dipakai disimpan di cache LRU kecil.
+class Corpus:
+
+    def __init__(self, path: str, cache_size: int = 1024):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, tier_count, self.spaces_offset, self.blob_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.map.close()
+            self.file.close()
+            raise ValueError(f"{path} bukan file korpus")
+        self.tiers = [TIER.unpack_from(self.map, HEADER.size + TIER.size * i) for i in range(tier_count)]
+        self.entries_offset = HEADER.size + TIER.size * tier_count
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[int, TargetText]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def entry(self, index: int) -> tuple:
+        return ENTRY.unpack_from(self.map, self.entries_offset + ENTRY.size * index)
+
+    def text(self, index: int) -> str:
+        offset, size = self.entry(index)[:2]
+        start = self.blob_offset + offset
+        return self.map[start:start + size].decode("utf-8")
+
+    def difficulty(self, index: int) -> float:
+        return self.entry(index)[5]
+
+    # Indeks teks acak, dari satu tier atau seluruh korpus (tier None atau di luar rentang).
+    def pick(self, tier: Optional[int] = None, rng: random.Random = random) -> int:
+        if tier is not None and 0 <= tier < len(self.tiers) and self.tiers[tier][1]:
+            start, count = self.tiers[tier]
+            return start + rng.randrange(count)
+        return rng.randrange(self.count)
+
+    def target(self, index: int) -> TargetText:
+        target = self.cache.get(index)
+        if target is not None:
+            self.cache.move_to_end(index)
+            return target
+        offset, size, length, first, space_count, _, _ = self.entry(index)
+        start = self.blob_offset + offset
+        text = self.map[start:start + size].decode("utf-8")
+        spaces = struct.unpack_from(f"<{space_count}H", self.map, self.spaces_offset + 2 * first)
+        target = TargetText(text, word_boundaries(spaces, length))
+        self.cache[index] = target
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return target
+
+    def close(self) -> None:
+        self.cache.clear()
+        self.map.close()
+        self.file.close()
@@ -0,0 +1,194 @@
+import asyncio
+import cProfile
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, Optional
+
+from common.logs import get_logger
+from services.metrics import LAG_BUCKETS, Metrics
+
+logger = get_logger("server.diagnostics")
+
+PROFILE_FORMATS = ("collapsed", "pstats")
+MAX_STACK = 40
+
+# Diagnostik event loop untuk satu proses (server tunggal, worker, atau coordinator), aktif dengan --diagnostics.
+#
+# Watchdog: callback heartbeat di event loop memperbarui timestamp setiap threshold/4 detik, dan thread watchdog
+# memeriksanya dengan interval yang sama. Jika heartbeat terlambat lebih dari threshold, loop sedang diblokir oleh
+# satu callback; stack thread loop diambil saat itu juga (sys._current_frames) bersama task yang sedang berjalan,
+# lalu dicatat ke log sebagai WARNING begitu loop jalan lagi, lengkap dengan lama blokirnya.
+#
+# Profiler: SIGUSR1 memulai profil selama profile_seconds detik (SIGUSR1 berikutnya menghentikannya lebih awal).
+# - collapsed: thread sampler mengambil stack thread loop profile_hz kali per detik, ditulis sebagai collapsed stacks
+#              ("fungsi (file:baris);... jumlah" per baris) untuk flamegraph.pl / speedscope
+# - pstats   : cProfile dinyalakan di thread loop (deterministik, overhead lebih besar), ditulis dengan dump_stats
+# File ditulis ke profile_dir dengan nama <name>-<pid>-<waktu>.<format>.
+class Diagnostics:
+
+    def __init__(self, name: str = "server", threshold: float = 0.1, profile_dir: str = ".", profile_format: str = "collapsed",
+                 profile_seconds: float = 30.0, profile_hz: float = 100.0):
+        self.name = name
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.005)
+        self.profile_dir = profile_dir
+        self.profile_format = profile_format
+        self.profile_seconds = profile_seconds
+        self.profile_hz = profile_hz
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.heartbeat = 0.0
+        self.beat_handle: Optional[asyncio.TimerHandle] = None
+        self.stop_event = threading.Event()
+        self.watchdog: Optional[threading.Thread] = None
+
+        # Stall terakhir (maksimal 20) untuk pemeriksaan manual: (waktu, durasi, task, stack)
+        self.stalls: Deque[tuple] = deque(maxlen=20)
+        self.stall_count = 0
+        self.stall_seconds = None
+        self.stall_counter = None
+
+        self.profile_stop: Optional[threading.Event] = None
+        self.sampler: Optional[threading.Thread] = None
+        self.profile_timer: Optional[asyncio.TimerHandle] = None
+        self.profiler: Optional[cProfile.Profile] = None
+        self.profile_path: Optional[str] = None
+
+    # Dipanggil dari dalam event loop yang akan diawasi.
+    def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self._beat()
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+        self.loop.add_signal_handler(signal.SIGUSR1, self.toggle_profile)
+        logger.info("Diagnostik aktif (pid %d): stall > %.0f ms dicatat, SIGUSR1 = profil %s %.0f detik ke %s",
+                    os.getpid(), self.threshold * 1000, self.profile_format, self.profile_seconds, os.path.abspath(self.profile_dir))
+
+    def enable_metrics(self, metrics: Metrics) -> None:
+        self.stall_counter = metrics.counter("loop_stalls", "Event loop stalls longer than the diagnostics threshold")
+        self.stall_seconds = metrics.histogram("loop_stall_seconds", "Duration of event loop stalls", LAG_BUCKETS)
+        metrics.gauge("profile_running", "1 while an on-demand profile is being captured", lambda: self.profiling)
+
+    async def close(self) -> None:
+        if self.profiling:
+            self.stop_profile()
+        if self.sampler is not None:
+            await asyncio.to_thread(self.sampler.join, 5)
+        self.stop_event.set()
+        if self.beat_handle:
+            self.beat_handle.cancel()
+        if self.loop:
+            self.loop.remove_signal_handler(signal.SIGUSR1)
+
+    @property
+    def profiling(self) -> bool:
+        return self.profile_path is not None
+
+    # --- Watchdog ---
+
+    def _beat(self) -> None:
+        self.heartbeat = time.monotonic()
+        self.beat_handle = self.loop.call_later(self.interval, self._beat)
+
+    # Thread watchdog: stack diambil sekali per stall, saat heartbeat pertama kali terlambat melewati threshold.
+    def _watch(self) -> None:
+        stalled_since = None
+        stack = task = None
+        while not self.stop_event.wait(self.interval):
+            beat = self.heartbeat
+            if stalled_since is None:
+                if time.monotonic() - beat - self.interval > self.threshold:
+                    stalled_since = beat
+                    frame = sys._current_frames().get(self.loop_thread)
+                    stack = "".join(traceback.format_stack(frame, limit=MAX_STACK)) if frame else ""
+                    current = asyncio.current_task(self.loop)
+                    task = current.get_name() if current else "-"
+                    coro = current.get_coro() if current else None
+                    if coro is not None:
+                        task = f"{task} ({getattr(coro, '__qualname__', coro)})"
+                    del frame
+            elif beat != stalled_since:
+                self._record_stall(beat - stalled_since - self.interval, task, stack)
+                stalled_since = None
+
+    def _record_stall(self, duration: float, task: str, stack: str) -> None:
+        self.stall_count += 1
+        self.stalls.append((time.time(), duration, task, stack))
+        if self.stall_counter is not None:
+            self.stall_counter.inc()
+            self.stall_seconds.observe(duration)
+        logger.warning("Event loop tertahan %.0f ms, task: %s\n%s", duration * 1000, task, stack.rstrip())
+
+    # --- Profiler on-demand ---
+
+    # Handler SIGUSR1 (dijalankan di thread loop).
+    def toggle_profile(self) -> None:
+        if self.profiling:
+            self.stop_profile()
+        else:
+            self.start_profile()
+
+    def start_profile(self, seconds: Optional[float] = None) -> None:
+        if self.profiling:
+            return
+        seconds = seconds or self.profile_seconds
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.profile_path = os.path.join(self.profile_dir, f"{self.name}-{os.getpid()}-{stamp}.{self.profile_format}")
+        if self.profile_format == "pstats":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profile_stop = threading.Event()
+            self.sampler = threading.Thread(target=self._sample, args=(self.profile_stop, self.profile_path),
+                                            name="profile-sampler", daemon=True)
+            self.sampler.start()
+        self.profile_timer = self.loop.call_later(seconds, self.stop_profile)
+        logger.info("Profil %s dimulai selama %.0f detik -> %s", self.profile_format, seconds, self.profile_path)
+
+    def stop_profile(self) -> None:
+        if not self.profiling:
+            return
+        path, self.profile_path = self.profile_path, None
+        if self.profile_timer:
+            self.profile_timer.cancel()
+            self.profile_timer = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(path)
+            self.profiler = None
+            logger.info("Profil pstats ditulis ke %s", path)
+        else:
+            # File ditulis oleh thread sampler setelah berhenti
+            self.profile_stop.set()
+            self.profile_stop = None
+
+    # Thread sampler: stack thread loop diambil profile_hz kali per detik dan dihitung per stack unik.
+    def _sample(self, stop: threading.Event, path: str) -> None:
+        counts: Dict[str, int] = Counter()
+        period = 1 / self.profile_hz
+        samples = 0
+        while not stop.wait(period):
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            counts[";".join(reversed(names))] += 1
+            samples += 1
+        try:
+            with open(path, "w", encoding="utf-8") as out:
+                for stack, count in sorted(counts.items()):
+                    out.write(f"{stack} {count}\n")
+            logger.info("Profil collapsed ditulis ke %s (%d sampel, %d stack unik)", path, samples, len(counts))
+        except OSError as exc:
+            logger.error("Gagal menulis profil %s: %s", path, exc)
@@ -0,0 +1,33 @@
+from typing import Iterable
+
+from services.outbound import OutboundQueue
+
+# Tipe pesan dipakai untuk memilih kebijakan antrean (pesan status tidak punya field "type").
+def message_type(payload: dict) -> str:
+    return payload.get("type") or payload.get("status") or "unknown"
+
+# Pengirim satu payload ke banyak koneksi sekaligus.
+# Payload diserialisasi sekali per codec (json/binary) lalu dimasukkan ke antrean keluar setiap koneksi tanpa await;
+# drain berjalan paralel di task penulis masing-masing, dan client lambat diputus oleh OutboundQueue.
+class Fanout:
+
+    def __init__(self):
+        self.messages = 0
+        self.deliveries = 0
+
+    def send(self, queues: Iterable[OutboundQueue], payload: dict) -> None:
+        self.messages += 1
+        msg_type = message_type(payload)
+        encoded = {}
+        for queue in queues:
+            data = encoded.get(queue.codec.name)
+            if data is None:
+                data = encoded[queue.codec.name] = queue.codec.encode(payload)
+            queue.push(data, msg_type)
+            self.deliveries += 1
+
+    def stats(self) -> dict:
+        return {
+            "messages": self.messages,
+            "deliveries": self.deliveries,
+        }
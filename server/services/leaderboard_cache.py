@@ -0,0 +1,125 @@
+import bisect
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.future import select
+from models.user_best import UserBest
+
+# Cache leaderboard di memori.
+# Menyimpan WPM terbaik tiap user (dict) dan daftar terurut (-wpm, username) agar top-N bisa diambil tanpa query ke database.
+# Hasil top-N disimpan sampai ada skor baru yang mengubah urutan; res_leaderboard top-size disimpan dalam bentuk
+# sudah diserialisasi per codec sampai versinya naik.
+# version hanya naik jika isi top-size (daftar yang dikirim ke client) berubah, sehingga client yang mengirim versinya
+# bisa dijawab "not modified". Versi awal diambil dari jam (milidetik) agar tetap naik setelah server restart;
+# setiap proses (worker) menomori versinya sendiri.
+class LeaderboardCache:
+
+    def __init__(self, size: int = 10):
+        self.best: Dict[str, int] = {}
+        self.ranking: List[Tuple[int, str]] = []
+        self.loaded = False
+        self.size = size
+        self.version = time.time_ns() // 1_000_000
+
+        self._top_memo: Dict[int, List[dict]] = {}
+        self._encoded_memo: Dict[str, bytes] = {}
+        # (versi, top-size) terakhir yang diterbitkan lewat delta()
+        self._published: Optional[Tuple[int, List[dict]]] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    # Memuat ulang seluruh isi cache dari database (dipanggil sekali saat server start).
+    async def load(self, session_factory: Callable) -> None:
+        async with session_factory() as session:
+            result = await session.execute(select(UserBest.username, UserBest.best_wpm))
+            rows = [(row.username, row.best_wpm) for row in result.all()]
+        self.rebuild(rows)
+
+    # Membangun ulang struktur cache dari pasangan (username, best_wpm).
+    def rebuild(self, rows) -> None:
+        self.best = {username: wpm for username, wpm in rows if username is not None and wpm is not None}
+        self.ranking = sorted((-wpm, username) for username, wpm in self.best.items())
+        self.loaded = True
+        self.rebuilds += 1
+        self._invalidate(True)
+        self._published = (self.version, self.top(self.size))
+
+    # Mencatat skor baru. Cache hanya diubah jika skor ini lebih tinggi dari rekor user tersebut.
+    # Mengembalikan True jika urutan leaderboard berubah.
+    def record(self, username: str, wpm: int) -> bool:
+        old = self.best.get(username)
+        if old is not None and wpm <= old:
+            return False
+
+        rank = len(self.ranking)
+        if old is not None:
+            idx = bisect.bisect_left(self.ranking, (-old, username))
+            if idx < len(self.ranking) and self.ranking[idx] == (-old, username):
+                del self.ranking[idx]
+                rank = idx
+
+        self.best[username] = wpm
+        idx = bisect.bisect_left(self.ranking, (-wpm, username))
+        self.ranking.insert(idx, (-wpm, username))
+        self._invalidate(min(rank, idx) < self.size)
+        return True
+
+    # Mengambil top-N dalam bentuk list dict; memakai hasil memo jika belum ada perubahan.
+    def top(self, limit: int = 10) -> List[dict]:
+        cached = self._top_memo.get(limit)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        data = [{"username": username, "wpm": -neg_wpm} for neg_wpm, username in self.ranking[:limit]]
+        self._top_memo[limit] = data
+        return data
+
+    # Pesan res_leaderboard top-size yang sudah di-encode, diserialisasi sekali per codec per versi leaderboard.
+    def encoded(self, codec) -> bytes:
+        cached = self._encoded_memo.get(codec.name)
+        if cached is None:
+            cached = codec.encode({"type": "res_leaderboard", "data": self.top(self.size), "version": self.version})
+            self._encoded_memo[codec.name] = cached
+        return cached
+
+    # Perubahan top-size sejak versi terakhir yang diterbitkan, lalu versi sekarang menjadi versi terbit.
+    # removed berisi username yang keluar dari daftar atau WPM-nya berubah (dihapus lebih dulu),
+    # inserted berisi entri baru beserta peringkatnya (1 = teratas), diurutkan naik sehingga bisa disisipkan satu per satu.
+    # Ukurannya mengikuti jumlah entri yang berubah, bukan size. base == version berarti top-size tidak berubah.
+    def delta(self) -> dict:
+        current = self.top(self.size)
+        base, previous = self._published or (None, [])
+        self._published = (self.version, current)
+        if base == self.version:
+            return {"base": base, "version": self.version, "removed": [], "inserted": []}
+
+        before = {(entry["username"], entry["wpm"]) for entry in previous}
+        after = {(entry["username"], entry["wpm"]) for entry in current}
+        return {
+            "base": base,
+            "version": self.version,
+            "removed": [entry["username"] for entry in previous if (entry["username"], entry["wpm"]) not in after],
+            "inserted": [{"rank": rank, "username": entry["username"], "wpm": entry["wpm"]}
+                         for rank, entry in enumerate(current, 1) if (entry["username"], entry["wpm"]) not in before],
+        }
+
+    # Angka hit/miss/rebuild untuk monitoring.
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "users": len(self.best),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+        }
+
+    def _invalidate(self, bump: bool) -> None:
+        if bump:
+            self.version += 1
+            self._encoded_memo.clear()
+        self._top_memo.clear()
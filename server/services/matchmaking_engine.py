@@ -0,0 +1,162 @@
+import bisect
+import heapq
+from itertools import islice
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+from models.score import Score
+from services.matchmaking_queue import MatchQueue
+
+T = TypeVar("T", bound=Hashable)
+
+# Rating (perkiraan WPM) setiap username.
+# Diisi dari rata-rata WPM di tabel scores saat server start, lalu diperbarui dengan rata-rata bergerak (EWMA) setiap hasil game.
+class RatingBook:
+
+    def __init__(self, default_rating: float = 40.0, alpha: float = 0.3):
+        self.default_rating = default_rating
+        self.alpha = alpha
+        self.ratings: Dict[str, float] = {}
+
+    async def load(self, session_factory: Callable) -> None:
+        async with session_factory() as session:
+            avg_wpm = func.avg(Score.wpm).label("avg_wpm")
+            result = await session.execute(select(Score.username, avg_wpm).group_by(Score.username))
+            self.ratings = {row.username: float(row.avg_wpm) for row in result.all() if row.username is not None}
+
+    def get(self, username: Optional[str]) -> float:
+        return self.ratings.get(username, self.default_rating)
+
+    def update(self, username: Optional[str], wpm: int) -> None:
+        if username is None:
+            return
+        old = self.ratings.get(username)
+        self.ratings[username] = float(wpm) if old is None else old + self.alpha * (wpm - old)
+
+# Mesin matchmaking berbasis rating, membentuk grup (room) berisi satu atau lebih lawan.
+# Pemain yang menunggu dikelompokkan ke bucket selebar bucket_width WPM; kunci bucket yang tidak kosong disimpan terurut
+# sehingga bucket terdekat dicari dengan bisect (O(log n)). Jendela toleransi selisih rating melebar seiring lama menunggu:
+# window = base_window + widen_per_second * detik_menunggu (maksimal max_window).
+class MatchmakingEngine(Generic[T]):
+
+    def __init__(self, bucket_width: float = 10.0, base_window: float = 10.0, widen_per_second: float = 5.0,
+                 max_window: float = 1000.0, sweep_limit: int = 1000, scan_per_bucket: int = 8):
+        self.bucket_width = bucket_width
+        self.base_window = base_window
+        self.widen_per_second = widen_per_second
+        self.max_window = max_window
+        self.sweep_limit = sweep_limit
+        self.scan_per_bucket = scan_per_bucket
+
+        self.buckets: Dict[int, MatchQueue[T]] = {}
+        self.bucket_keys: List[int] = []
+        self.entries: Dict[T, Tuple[float, float, int]] = {}
+        self.arrivals: MatchQueue[T] = MatchQueue()
+
+    def __contains__(self, player: T) -> bool:
+        return player in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # Lama pemain sudah menunggu di antrean (0 jika tidak sedang antre).
+    def waited(self, player: T, now: float) -> float:
+        entry = self.entries.get(player)
+        return now - entry[1] if entry else 0.0
+
+    def window(self, waited: float) -> float:
+        return min(self.max_window, self.base_window + self.widen_per_second * max(waited, 0))
+
+    # Memasukkan pemain ke bucket sesuai rating-nya.
+    def add(self, player: T, rating: float, now: float) -> None:
+        if player in self.entries:
+            return
+        key = int(rating // self.bucket_width)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = MatchQueue()
+            bisect.insort(self.bucket_keys, key)
+        bucket.push(player)
+        self.entries[player] = (rating, now, key)
+        self.arrivals.push(player)
+
+    # Mengeluarkan pemain dari antrean (batal, disconnect, atau sudah dipasangkan).
+    def remove(self, player: T) -> bool:
+        entry = self.entries.pop(player, None)
+        if entry is None:
+            return False
+        key = entry[2]
+        bucket = self.buckets[key]
+        bucket.discard(player)
+        self.arrivals.discard(player)
+        if not bucket:
+            del self.buckets[key]
+            self.bucket_keys.pop(bisect.bisect_left(self.bucket_keys, key))
+        return True
+
+    # Mencari satu lawan untuk rating tertentu (pemain baru dengan waited=0, atau pemain lama saat sweep).
+    def find(self, rating: float, now: float, waited: float = 0.0, exclude: Optional[T] = None) -> Optional[T]:
+        group = self.find_group(rating, now, 1, waited, exclude)
+        return group[0] if group else None
+
+    # Mencari sampai `count` lawan dengan rating terdekat, diurutkan dari selisih terkecil.
+    # Kandidat diterima jika selisih rating <= jendela salah satu dari kedua pemain. Kandidat tidak dikeluarkan dari antrean.
+    def find_group(self, rating: float, now: float, count: int, waited: float = 0.0, exclude: Optional[T] = None) -> List[T]:
+        if not self.bucket_keys or count <= 0:
+            return []
+
+        own_window = self.window(waited)
+        key = int(rating // self.bucket_width)
+        right = bisect.bisect_left(self.bucket_keys, key)
+        left = right - 1
+        # Max-heap (selisih negatif) berisi `count` kandidat terbaik sejauh ini
+        best: List[Tuple[float, int, T]] = []
+        order = 0
+
+        # Menyisir bucket ke kiri dan kanan secara bergantian, dari yang terdekat
+        while left >= 0 or right < len(self.bucket_keys):
+            gap_left = (key - self.bucket_keys[left]) * self.bucket_width if left >= 0 else None
+            gap_right = (self.bucket_keys[right] - key) * self.bucket_width if right < len(self.bucket_keys) else None
+            if gap_right is None or (gap_left is not None and gap_left < gap_right):
+                bucket_key, bucket_gap, left = self.bucket_keys[left], gap_left, left - 1
+            else:
+                bucket_key, bucket_gap, right = self.bucket_keys[right], gap_right, right + 1
+
+            min_gap = bucket_gap - self.bucket_width
+            if min_gap > self.max_window or (len(best) == count and min_gap > -best[0][0]):
+                break
+
+            # Bucket FIFO: hanya beberapa pemain terlama yang diperiksa
+            for candidate in islice(self.buckets[bucket_key], self.scan_per_bucket + count):
+                if candidate == exclude:
+                    continue
+                cand_rating, cand_since, _ = self.entries[candidate]
+                gap = abs(cand_rating - rating)
+                if gap > max(own_window, self.window(now - cand_since)):
+                    continue
+                order += 1
+                if len(best) < count:
+                    heapq.heappush(best, (-gap, -order, candidate))
+                elif gap < -best[0][0]:
+                    heapq.heapreplace(best, (-gap, -order, candidate))
+        return [candidate for _, _, candidate in sorted(best, reverse=True)]
+
+    # Membentuk grup berisi `size` pemain dari pemain yang sudah lama menunggu karena jendela mereka sudah melebar.
+    # Pemain yang sudah menunggu lebih dari fill_after detik boleh mendapat grup yang belum penuh (minimal min_size).
+    # Memeriksa paling banyak sweep_limit pemain tertua per panggilan.
+    def sweep(self, now: float, size: int = 2, min_size: Optional[int] = None, fill_after: float = 10.0) -> List[List[T]]:
+        min_size = size if min_size is None else min(min_size, size)
+        groups = []
+        for player in list(islice(self.arrivals, self.sweep_limit)):
+            if player not in self.entries:
+                continue
+            rating, since, _ = self.entries[player]
+            waited = now - since
+            partners = self.find_group(rating, now, size - 1, waited, exclude=player)
+            if len(partners) + 1 == size or (len(partners) + 1 >= min_size and waited >= fill_after):
+                group = [player, *partners]
+                for member in group:
+                    self.remove(member)
+                groups.append(group)
+        return groups
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+# Antrean matchmaking FIFO berbasis OrderedDict.
+# enqueue, dequeue, cancel, dan cek keanggotaan semuanya O(1), menggantikan list yang butuh scan O(n)
+# untuk "in", pop(0), dan remove().
+class MatchQueue(Generic[T]):
+
+    def __init__(self):
+        self._entries: "OrderedDict[T, None]" = OrderedDict()
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._entries)
+
+    # Menambahkan pemain di ujung antrean (tidak berubah posisi jika sudah ada).
+    def push(self, item: T) -> None:
+        self._entries.setdefault(item, None)
+
+    # Mengambil pemain paling lama menunggu, atau None jika antrean kosong.
+    def popleft(self) -> Optional[T]:
+        if not self._entries:
+            return None
+        item, _ = self._entries.popitem(last=False)
+        return item
+
+    # Menghapus pemain dari mana pun posisinya. Mengembalikan True jika pemain memang ada di antrean.
+    def discard(self, item: T) -> bool:
+        if item in self._entries:
+            del self._entries[item]
+            return True
+        return False
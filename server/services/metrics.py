@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import functools
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from common.logs import get_logger
+
+logger = get_logger("server.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Batas bucket histogram (detik): latensi fungsi hot path, lama menunggu matchmaking, dan lag event loop.
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+WAIT_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _fmt(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class Counter:
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        yield f"{self.name} {_fmt(self.value)}"
+
+# Histogram dengan bucket tetap. observe() hanya satu bisect + dua penjumlahan;
+# jumlah per bucket disimpan terpisah dan baru dibuat kumulatif saat di-render.
+class Histogram:
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            yield f'{self.name}_bucket{{le="{_fmt(bound)}"}} {total}'
+        yield f"{self.name}_sum {_fmt(self.sum)}"
+        yield f"{self.name}_count {total}"
+
+# Gauge yang nilainya dibaca dari callback saat scrape, sehingga tidak ada biaya di hot path.
+class Gauge:
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_fmt(self.read())}"
+
+# Mengekspor dict dari method stats() yang sudah ada (outbound, fanout, score writer, dll) apa adanya.
+# Key yang terdaftar di counters diekspor sebagai counter (akhiran _total), sisanya sebagai gauge.
+class StatsCollector:
+
+    def __init__(self, prefix: str, help_text: str, read: Callable[[], dict], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.help = help_text
+        self.read = read
+        self.counters = set(counters)
+
+    def render(self) -> Iterable[str]:
+        for key, value in self.read().items():
+            if key in self.counters:
+                name, kind = f"{self.prefix}_{key}_total", "counter"
+            else:
+                name, kind = f"{self.prefix}_{key}", "gauge"
+            yield f"# HELP {name} {self.help} ({key})"
+            yield f"# TYPE {name} {kind}"
+            yield f"{name} {_fmt(value)}"
+
+# Registry metrik milik satu proses (server tunggal, worker, atau coordinator).
+# Metrik hanya dibuat jika --metrics-port diisi; tanpa itu komponen tidak memegang registry sama sekali
+# dan fungsi hot path tidak dibungkus, sehingga biaya saat nonaktif hanya satu pengecekan None di jalur yang jarang.
+# Endpoint: HTTP GET /metrics (format teks Prometheus) pada port lokal terpisah.
+class Metrics:
+
+    def __init__(self, prefix: str = "typing_race", lag_interval: float = 0.5):
+        self.prefix = prefix
+        self.lag_interval = lag_interval
+        self.metrics: Dict[str, object] = {}
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.lag_task: Optional[asyncio.Task] = None
+        self.loop_lag = self.histogram("event_loop_lag_seconds", "Delay between a scheduled wakeup and the actual wakeup", LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample", lambda: self.last_lag)
+        self.scrapes = self.counter("metrics_scrapes", "Number of /metrics requests served")
+
+    def _register(self, key: str, metric):
+        self.metrics[key] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        name = f"{self.prefix}_{name}_total"
+        return self._register(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        name = f"{self.prefix}_{name}"
+        return self._register(name, Histogram(name, help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        name = f"{self.prefix}_{name}"
+        return self._register(name, Gauge(name, help_text, read))
+
+    def stats(self, prefix: str, help_text: str, read: Callable[[], dict], counters: Iterable[str] = ()) -> StatsCollector:
+        prefix = f"{self.prefix}_{prefix}"
+        return self._register(prefix, StatsCollector(prefix, help_text, read, counters))
+
+    # Membungkus fungsi (biasa maupun coroutine) agar durasinya dicatat ke histogram.
+    # Dipasang pada instance saat metrik diaktifkan, bukan pada class, sehingga mode nonaktif tidak terpengaruh.
+    @staticmethod
+    def timed(func: Callable, histogram: Histogram) -> Callable:
+        clock = time.perf_counter
+        observe = histogram.observe
+        if asyncio.iscoroutinefunction(func):
+            async def wrapper(*args, **kwargs):
+                started = clock()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(clock() - started)
+        else:
+            def wrapper(*args, **kwargs):
+                started = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    observe(clock() - started)
+        return functools.wraps(func)(wrapper)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for key, metric in self.metrics.items():
+            try:
+                lines.extend(metric.render())
+            except Exception as exc:
+                logger.error("Gagal membaca metrik %s: %s", key, exc)
+        lines.append("")
+        return "\n".join(lines)
+
+    # Membuka endpoint HTTP metrik dan menjalankan pengukur lag event loop.
+    async def start(self, host: str, port: int) -> None:
+        self.server = await asyncio.start_server(self._handle_http, host, port)
+        self.lag_task = asyncio.create_task(self._measure_loop_lag())
+        logger.info("Metrik tersedia di http://%s:%d/metrics", host, port)
+
+    async def close(self) -> None:
+        if self.lag_task:
+            self.lag_task.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # Tidur selama lag_interval lalu mengukur seberapa terlambat loop membangunkan task ini.
+    # Lag besar berarti ada callback yang memblokir event loop terlalu lama.
+    async def _measure_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            self.loop_lag.observe(self.last_lag)
+
+    # HTTP/1.0 minimal: satu request per koneksi, hanya GET /metrics (atau /).
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request.split()
+            path = parts[1].split(b"?")[0] if len(parts) >= 2 else b""
+            if parts and parts[0] == b"GET" and path in (b"/metrics", b"/"):
+                self.scrapes.inc()
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(f"HTTP/1.0 {status}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Callable
+
+from common.mux import SESSION_CLOSED, encode_frame
+
+# Pengganti StreamWriter untuk satu session logis di dalam koneksi multiplex bridge (lihat common/mux.py).
+# OutboundQueue menulis ke channel ini seperti ke socket biasa; setiap pesan diberi awalan id channel
+# lalu ditulis ke StreamWriter bersama. Ukuran buffer transport tidak dihitung per channel (selalu 0),
+# dan abort() hanya menutup channel ini, bukan koneksi bersama.
+class MuxChannel:
+    __slots__ = ("writer", "cid", "prefix", "closed", "on_close")
+
+    def __init__(self, writer: asyncio.StreamWriter, cid: int, on_close: Callable[[int], None]):
+        self.writer = writer
+        self.cid = cid
+        self.prefix = b"%d " % cid
+        self.closed = False
+        self.on_close = on_close
+
+    # OutboundQueue memakai writer.transport untuk ukuran buffer dan abort saat client terlalu lambat
+    @property
+    def transport(self) -> "MuxChannel":
+        return self
+
+    def get_write_buffer_size(self) -> int:
+        return 0
+
+    def abort(self) -> None:
+        self.close()
+
+    def write(self, data: bytes) -> None:
+        if not self.closed:
+            self.writer.write(self.prefix + data)
+
+    async def drain(self) -> None:
+        if not self.writer.is_closing():
+            await self.writer.drain()
+
+    def is_closing(self) -> bool:
+        return self.closed or self.writer.is_closing()
+
+    # Ditutup oleh bridge (disconnect): tidak ada lagi yang dikirim untuk channel ini.
+    def detach(self) -> None:
+        self.closed = True
+
+    # Ditutup oleh server: bridge diberi tahu lewat session_closed, lalu session dibersihkan lewat on_close.
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if not self.writer.is_closing():
+            self.writer.write(encode_frame(self.cid, SESSION_CLOSED))
+        self.on_close(self.cid)
+
+    async def wait_closed(self) -> None:
+        pass
+
+    def get_extra_info(self, name: str, default=None):
+        return self.writer.get_extra_info(name, default)
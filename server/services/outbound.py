@@ -0,0 +1,204 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from common.codec import DEFAULT_CODEC
+from common.logs import get_logger
+
+logger = get_logger("server.outbound")
+
+# Kebijakan antrean per tipe pesan:
+# - COALESCE   : hanya pesan terbaru yang disimpan, pesan lama bertipe sama yang belum terkirim dibuang (drop-oldest)
+# - NORMAL     : selalu dimasukkan ke antrean
+# - NEVER_DROP : selalu dimasukkan, tidak dihitung terhadap batas antrean, dan tetap ditulis ke socket
+#                saat koneksi diputus karena terlalu lambat (mis. game_over)
+COALESCE = "coalesce"
+NORMAL = "normal"
+NEVER_DROP = "never_drop"
+
+# leaderboard_update tidak di-coalesce: isinya delta berantai (base -> version), membuang satu delta memaksa client meminta ulang daftar penuh.
+DEFAULT_POLICIES = {
+    "room_progress": COALESCE,
+    "game_over": NEVER_DROP,
+}
+
+# Statistik gabungan semua antrean keluar, dipakai untuk monitoring.
+class OutboundStats:
+
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.evicted = 0
+        self.peak_bytes = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "evicted": self.evicted,
+            "peak_bytes": self.peak_bytes,
+        }
+
+# Antrean keluar milik satu koneksi, sekaligus menyimpan codec (json/binary) yang dipakai koneksi tersebut.
+# push() tidak pernah menunggu; task penulis khusus menulis isi antrean ke socket lalu menunggu drain().
+# Dengan begitu socket lawan yang macet tidak menahan loop baca pemain lain.
+# Jika antrean tetap di atas batas lebih lama dari evict_after detik, koneksi diputus paksa; pesan NEVER_DROP
+# yang masih mengantre ditulis dulu dan diberi evict_grace detik untuk terkirim sebelum transport di-abort.
+class OutboundQueue:
+
+    def __init__(self, writer: asyncio.StreamWriter, stats: OutboundStats, policies: Optional[Dict[str, str]] = None,
+                 max_messages: int = 256, high_water: int = 256 * 1024, evict_after: float = 5.0,
+                 evict_grace: float = 1.0):
+        self.writer = writer
+        self.stats = stats
+        self.codec = DEFAULT_CODEC
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self.max_messages = max_messages
+        self.high_water = high_water
+        self.evict_after = evict_after
+        self.evict_grace = evict_grace
+
+        # Setiap item adalah list [data, alive, never_drop] agar pesan yang di-coalesce cukup ditandai mati (O(1))
+        self.items: Deque[List] = deque()
+        self.latest: Dict[str, List] = {}
+        self.queued_bytes = 0
+        # Bagian antrean yang berupa pesan NEVER_DROP, dikecualikan dari pemeriksaan batas
+        self.kept_count = 0
+        self.kept_bytes = 0
+        self.over_since: Optional[float] = None
+        self.closed = False
+        self.evicted = False
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, data: bytes, msg_type: str) -> None:
+        if self.closed or self.writer.is_closing():
+            return
+
+        policy = self.policies.get(msg_type, NORMAL)
+        if policy == COALESCE:
+            previous = self.latest.get(msg_type)
+            if previous is not None and previous[1]:
+                previous[1] = False
+                self.queued_bytes -= len(previous[0])
+                self.stats.coalesced += 1
+
+        item = [data, True, policy == NEVER_DROP]
+        if policy == COALESCE:
+            self.latest[msg_type] = item
+        elif policy == NEVER_DROP:
+            self.kept_count += 1
+            self.kept_bytes += len(data)
+        self.items.append(item)
+        self.queued_bytes += len(data)
+        self.stats.enqueued += 1
+        if self.queued_bytes > self.stats.peak_bytes:
+            self.stats.peak_bytes = self.queued_bytes
+
+        self._check_limits()
+        self._wakeup.set()
+
+    # Jumlah byte yang menunggu: isi antrean + buffer transport.
+    def pending_bytes(self) -> int:
+        transport = self.writer.transport
+        return self.queued_bytes + (transport.get_write_buffer_size() if transport else 0)
+
+    # Menutup antrean. Sisa pesan tetap dikirim (mis. game_over) dengan batas waktu, lalu task penulis selesai.
+    async def close(self, timeout: float = 1.0) -> None:
+        self.closed = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._task.cancel()
+        except Exception:
+            pass
+
+    def _check_limits(self) -> None:
+        over = (self.pending_bytes() - self.kept_bytes > self.high_water
+                or len(self.items) - self.kept_count > self.max_messages)
+        if not over:
+            self.over_since = None
+            return
+
+        now = asyncio.get_running_loop().time()
+        if self.over_since is None:
+            self.over_since = now
+        elif now - self.over_since > self.evict_after:
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.evicted:
+            return
+        self.evicted = True
+        self.closed = True
+        self.stats.evicted += 1
+        logger.warning("Client %s terlalu lambat (%d byte tertunda), koneksi diputus.",
+                       self.writer.get_extra_info('peername'), self.pending_bytes())
+        kept = [item[0] for item in self.items if item[1] and item[2]]
+        self.items.clear()
+        self.latest.clear()
+        self.queued_bytes = self.kept_count = self.kept_bytes = 0
+        self._wakeup.set()
+        transport = self.writer.transport
+        if not transport:
+            return
+        if not kept:
+            transport.abort()
+            return
+        for data in kept:
+            self.writer.write(data)
+        self.stats.sent += len(kept)
+        transport.close()
+        asyncio.get_running_loop().call_later(self.evict_grace, transport.abort)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if not self.items:
+                    if self.closed:
+                        return
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                while self.items:
+                    data, alive, _ = self.items.popleft()
+                    if alive:
+                        self.writer.write(data)
+                        self.stats.sent += 1
+                self.latest.clear()
+                self.queued_bytes = self.kept_count = self.kept_bytes = 0
+                await self._drain()
+                self._check_limits()
+        except (ConnectionError, RuntimeError) as exc:
+            logger.debug("Penulis antrean berhenti: %s", exc)
+        except Exception:
+            # Error lain tidak boleh membuat task mati diam-diam sementara session masih terdaftar:
+            # koneksi ditutup agar loop baca pemain ini menjalankan proses disconnect biasa.
+            logger.exception("Penulis antrean %s gagal, koneksi ditutup.", self.writer.get_extra_info('peername'))
+            self.closed = True
+            transport = self.writer.transport
+            if transport:
+                transport.abort()
+
+    # drain() yang memeriksa batas secara berkala, sehingga client yang berhenti membaca tetap diputus
+    # setelah evict_after detik walaupun tidak ada push() baru.
+    async def _drain(self) -> None:
+        drain = asyncio.ensure_future(self.writer.drain())
+        interval = max(self.evict_after / 4, 0.05)
+        try:
+            while True:
+                done, _ = await asyncio.wait((drain,), timeout=interval)
+                if done:
+                    drain.result()
+                    return
+                self._check_limits()
+                if self.evicted:
+                    return
+        finally:
+            if not drain.done():
+                drain.cancel()
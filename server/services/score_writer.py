@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.score import Score
+from models.user_best import UserBest
+from common.logs import get_logger
+
+logger = get_logger("server.db")
+
+# Penulis skor di background.
+# Skor dimasukkan ke antrean asyncio berbatas, lalu digabung menjadi satu transaksi (group commit)
+# setiap kali terkumpul max_batch baris atau setelah flush_interval detik sejak baris pertama masuk.
+# Batch yang gagal ditulis (misalnya database terkunci) dicoba ulang max_retries kali dengan jeda yang berlipat.
+class ScoreWriter:
+
+    def __init__(self, session_factory: Callable, max_batch: int = 200, flush_interval: float = 0.05, max_queue: int = 10000,
+                 max_retries: int = 3, retry_delay: float = 0.2):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.task: Optional[asyncio.Task] = None
+
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.commits = 0
+
+    # Menjalankan task penulis di event loop yang sedang berjalan.
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    # Memasukkan skor ke antrean. Hanya menunggu jika antrean penuh (backpressure), tidak menunggu disk.
+    async def submit(self, username: str, wpm: int) -> None:
+        await self.queue.put((username, wpm, datetime.now(timezone.utc)))
+
+    # Menghentikan penulis setelah seluruh isi antrean ditulis ke database.
+    async def close(self) -> None:
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                try:
+                    item = self.queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    # Menulis satu batch; jika gagal dicoba ulang, dan baru dibuang (dicatat di log dan "failed") setelah max_retries.
+    async def _flush(self, batch: List[Tuple[str, int, datetime]]) -> None:
+        best = {}
+        for username, wpm, achieved_at in batch:
+            if username not in best or wpm > best[username][0]:
+                best[username] = (wpm, achieved_at)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(batch, best)
+                break
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    logger.error("Gagal menyimpan %d skor setelah %d percobaan, batch dibuang: %s", len(batch), attempt + 1, exc)
+                    return
+                self.retries += 1
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning("Gagal menyimpan %d skor (percobaan %d), dicoba lagi dalam %.1f detik: %s",
+                               len(batch), attempt + 1, delay, exc)
+                await asyncio.sleep(delay)
+        self.written += len(batch)
+        self.commits += 1
+        logger.debug("Skor disimpan: %d baris dalam 1 commit", len(batch))
+
+    # Satu transaksi: insert ke scores lalu upsert ke user_best.
+    async def _write(self, batch: List[Tuple[str, int, datetime]], best: dict) -> None:
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(insert(Score), [{"username": u, "wpm": w} for u, w, _ in batch])
+                await session.execute(upsert_best_stmt(), [
+                    {"username": u, "best_wpm": w, "achieved_at": at} for u, (w, at) in best.items()
+                ])
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "commits": self.commits,
+        }
+
+# Statement upsert untuk tabel user_best (INSERT ... ON CONFLICT DO UPDATE milik SQLite).
+# Baris lama hanya diganti jika WPM baru lebih tinggi.
+def upsert_best_stmt():
+    stmt = sqlite_insert(UserBest)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserBest.username],
+        set_={"best_wpm": stmt.excluded.best_wpm, "achieved_at": stmt.excluded.achieved_at},
+        where=UserBest.best_wpm < stmt.excluded.best_wpm
+    )
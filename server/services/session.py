@@ -0,0 +1,95 @@
+import asyncio
+from typing import Iterator, List, Optional
+
+from services.outbound import OutboundQueue
+
+# Seluruh state satu koneksi TCP dalam satu record (__slots__, tanpa __dict__):
+# - sid      : id integer koneksi, berisi nomor slot di registry (juga dipakai sebagai id pemain di mode worker)
+# - outbound : antrean keluar + codec koneksi; None setelah koneksi ditutup
+# - username : None sampai login berhasil
+# - room/seat: room yang sedang diikuti dan nomor kursinya (progress/WPM ada di list per kursi milik Room)
+# - waiting  : event yang ditunggu _enqueue_player selama pemain ada di antrean matchmaking
+# - queued/host : khusus mode worker, pemain ada di antrean coordinator / id worker yang menjalankan room-nya
+# - last_seen: waktu loop saat pesan terakhir diterima, dipakai reaper untuk memutus session idle
+class Session:
+    __slots__ = ("sid", "writer", "outbound", "username", "room", "seat", "waiting", "queued", "host", "last_seen")
+
+    def __init__(self, sid: int, writer: asyncio.StreamWriter, outbound: OutboundQueue):
+        self.sid = sid
+        self.writer = writer
+        self.outbound: Optional[OutboundQueue] = outbound
+        self.username: Optional[str] = None
+        self.room = None
+        self.seat: Optional[int] = None
+        self.waiting: Optional[asyncio.Event] = None
+        self.queued = False
+        self.host: Optional[int] = None
+        self.last_seen = 0.0
+
+    def is_closing(self) -> bool:
+        return self.outbound is None or self.writer.is_closing()
+
+# Registry semua koneksi berbasis slot: session disimpan di list, slot yang kosong dipakai ulang lewat free list.
+# Id session = (nomor urut << SLOT_BITS) | slot, sehingga get() cukup mengindeks list tanpa hashing,
+# dan id lama dari slot yang sudah dipakai ulang (misalnya pesan cluster yang terlambat) tidak cocok lagi.
+# close() mengosongkan slot sekaligus melepas referensi ke room, antrean keluar, dan event menunggu.
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+class SessionRegistry:
+
+    def __init__(self):
+        self.slots: List[Optional[Session]] = []
+        self.free: List[int] = []
+        self.serial = 0
+        self.count = 0
+        self.logged_in = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Session]:
+        return (s for s in self.slots if s is not None)
+
+    def get(self, sid) -> Optional[Session]:
+        if not isinstance(sid, int):
+            return None
+        slot = sid & SLOT_MASK
+        if slot >= len(self.slots):
+            return None
+        session = self.slots[slot]
+        return session if session is not None and session.sid == sid else None
+
+    # Session yang sudah login (penerima leaderboard_update).
+    def online(self) -> Iterator[Session]:
+        return (s for s in self.slots if s is not None and s.username is not None)
+
+    def open(self, writer: asyncio.StreamWriter, outbound: OutboundQueue) -> Session:
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.slots)
+            self.slots.append(None)
+        self.serial += 1
+        session = self.slots[slot] = Session((self.serial << SLOT_BITS) | slot, writer, outbound)
+        self.count += 1
+        return session
+
+    def login(self, session: Session, username: str) -> None:
+        if session.username is None:
+            self.logged_in += 1
+        session.username = username
+
+    def close(self, session: Session) -> None:
+        slot = session.sid & SLOT_MASK
+        if slot < len(self.slots) and self.slots[slot] is session:
+            self.slots[slot] = None
+            self.free.append(slot)
+            self.count -= 1
+            if session.username is not None:
+                self.logged_in -= 1
+        session.outbound = None
+        session.room = None
+        session.waiting = None
+        session.queued = False
+        session.host = None
@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+import math
+from typing import Callable, List, Optional, Set
+
+from common.logs import get_logger
+
+logger = get_logger("server")
+
+# Satu timer terjadwal. slot disimpan agar cancel cukup menghapus dari satu set (O(1)).
+class Timer:
+    __slots__ = ("due", "slot", "callback", "args", "active")
+
+    def __init__(self, due: int, slot: int, callback: Callable, args: tuple):
+        self.due = due
+        self.slot = slot
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+# Hashed timer wheel: satu task untuk semua timer (countdown dan batas waktu seluruh room).
+# Waktu dibagi menjadi tick berukuran tetap; timer dengan jatuh tempo tick T disimpan di slot T % slots.
+# Setiap tick hanya satu slot yang diperiksa, dan timer yang jatuh temponya beberapa putaran lagi dibiarkan di slot-nya.
+# schedule dan cancel O(1); saat tidak ada timer, task menunggu Event sehingga tidak ada wakeup sia-sia.
+# Callback boleh fungsi biasa atau coroutine (dijalankan sebagai task yang referensinya disimpan sampai selesai,
+# dan error-nya dicatat ke log).
+class TimerWheel:
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots: List[Set[Timer]] = [set() for _ in range(slots)]
+        self.current = 0
+        self.pending = 0
+        self.origin: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+        self.running: Set[asyncio.Task] = set()
+
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+
+    def __len__(self) -> int:
+        return self.pending
+
+    # Menjadwalkan callback(*args) pada batas tick pertama setelah delay detik (tidak pernah lebih awal).
+    def schedule(self, delay: float, callback: Callable, *args) -> Timer:
+        now = asyncio.get_running_loop().time()
+        if not self.pending:
+            # Wheel sedang diam: jam tick dimulai ulang dari sekarang
+            self.origin = now - self.current * self.tick
+        due = max(self.current + 1, math.ceil((now + delay - self.origin) / self.tick - 1e-9))
+        timer = Timer(due, due % len(self.slots), callback, args)
+        self.slots[timer.slot].add(timer)
+        self.pending += 1
+        self.scheduled += 1
+        self.wakeup.set()
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> bool:
+        if timer is None or not timer.active:
+            return False
+        timer.active = False
+        self.slots[timer.slot].discard(timer)
+        self.pending -= 1
+        self.cancelled += 1
+        return True
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        # Callback coroutine yang masih berjalan (mis. _game_timeout yang menyimpan skor) diberi waktu untuk selesai
+        if self.running:
+            await asyncio.wait(set(self.running), timeout=1.0)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.pending:
+                # Tidak ada timer: tidur sampai ada schedule() baru
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            await asyncio.sleep(max(0.0, self.origin + (self.current + 1) * self.tick - loop.time()))
+            # Jika loop sempat tertahan, semua tick yang terlewat diproses agar tidak ada timer yang meleset satu putaran
+            target = int((loop.time() - self.origin) / self.tick)
+            while self.current < target and self.pending:
+                self.current += 1
+                self._expire(self.current)
+            self.current = max(self.current, target)
+
+    def _expire(self, now: int) -> None:
+        slot = self.slots[now % len(self.slots)]
+        if not slot:
+            return
+        due = [timer for timer in slot if timer.due <= now]
+        for timer in due:
+            slot.discard(timer)
+            timer.active = False
+            self.pending -= 1
+            self.fired += 1
+            try:
+                result = timer.callback(*timer.args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self.running.add(task)
+                    task.add_done_callback(self._task_done)
+            except Exception as exc:
+                logger.error("Timer error: %s", exc)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self.running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Timer error: %s", task.exception(), exc_info=task.exception())
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "running": len(self.running),
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+        }
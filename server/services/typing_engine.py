@@ -0,0 +1,82 @@
+from array import array
+from itertools import repeat
+from typing import Optional, Sequence
+
+# Validasi ketikan di sisi server. Client tidak lagi mengirim progress/WPM, melainkan delta input
+#   {"type": "input", "pos": p, "text": "..."}
+# yang berarti: isi kotak ketik mulai posisi p diganti dengan text (mengetik 1 huruf: pos = panjang input lama,
+# backspace: pos = panjang baru dengan text kosong). Server tidak menyimpan isi input pemain, cukup panjangnya
+# dan panjang prefix yang benar: jika pos <= prefix benar, semua karakter sebelum pos sudah pasti benar,
+# sehingga hanya text yang dibandingkan dengan teks target (O(panjang delta)); jika pos di belakang kesalahan,
+# prefix benar tidak berubah. Berbeda dengan hitungan per kata di browser lama, kata setelah kesalahan yang belum
+# diperbaiki tidak dihitung.
+
+# Batas satu delta dan seberapa jauh input boleh melewati panjang teks target (karakter salah di akhir).
+MAX_DELTA = 64
+MAX_OVERRUN = 32
+
+# Teks target yang dikompilasi sekali per teks (bukan per room). counted[i] adalah jumlah karakter yang dihitung
+# untuk progress/WPM jika i karakter pertama diketik benar: dibulatkan ke batas kata terakhir (akhir kata, atau
+# setelah spasi), sama seperti perhitungan per kata di browser sebelumnya. Lookup-nya O(1).
+# bounds (daftar batas kata terurut, dari korpus yang sudah dikompilasi) membuat teks tidak perlu dipindai ulang.
+class TargetText:
+    __slots__ = ("text", "length", "counted")
+
+    def __init__(self, text: str, bounds: Optional[Sequence[int]] = None):
+        self.text = text
+        self.length = len(text)
+        if bounds is not None:
+            self.counted = array("I")
+            for start, end in zip(bounds, [*bounds[1:], self.length + 1]):
+                self.counted.extend(repeat(start, end - start))
+            return
+        self.counted = array("I", bytes(4 * (self.length + 1)))
+        boundary = 0
+        for i in range(self.length + 1):
+            if i == self.length or text[i] == " " or (i > 0 and text[i - 1] == " "):
+                boundary = i
+            self.counted[i] = boundary
+
+# State ketikan satu pemain di satu room: panjang input, prefix yang benar, dan jumlah karakter yang diketik.
+class TypingState:
+    __slots__ = ("length", "correct", "keystrokes")
+
+    def __init__(self):
+        self.length = 0
+        self.correct = 0
+        self.keystrokes = 0
+
+    # Menerapkan satu delta; False jika delta tidak valid (posisi di luar input, terlalu panjang, dsb.).
+    def apply(self, target: TargetText, pos, text) -> bool:
+        if type(pos) is not int or type(text) is not str:
+            return False
+        size = len(text)
+        if pos < 0 or pos > self.length or size > MAX_DELTA or pos + size > target.length + MAX_OVERRUN:
+            return False
+
+        if pos <= self.correct:
+            if target.text.startswith(text, pos):
+                self.correct = pos + size
+            else:
+                matched = pos
+                limit = min(pos + size, target.length)
+                source = target.text
+                while matched < limit and source[matched] == text[matched - pos]:
+                    matched += 1
+                self.correct = matched
+        self.length = pos + size
+        self.keystrokes += size
+        return True
+
+    # Kata yang sudah benar tapi langsung diikuti karakter salah (mis. "kata#") belum dihitung.
+    def counted(self, target: TargetText) -> int:
+        correct = self.correct
+        if self.length > correct > 0 and (correct == target.length or target.text[correct] == " "):
+            return target.counted[correct - 1]
+        return target.counted[correct]
+
+    def finished(self, target: TargetText) -> bool:
+        return self.correct == target.length and self.length == target.length
+
+    def progress(self, target: TargetText) -> float:
+        return self.counted(target) / target.length * 100 if target.length else 100.0
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT_DIR, "server")
+
+# Modul diimpor seperti saat server.py dijalankan dari folder server/ (services.*, models.*) dan common.* dari root repo.
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, ROOT_DIR)
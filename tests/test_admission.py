@@ -0,0 +1,71 @@
+from services.admission import Admission
+
+def test_unlimited_by_default():
+    admission = Admission()
+    assert all(admission.admit("10.0.0.1", 0.0) is None for _ in range(500))
+    assert admission.open == admission.accepted == 500
+    assert admission.rejected == {"capacity": 0, "per_ip": 0, "rate": 0}
+
+def test_capacity_and_release():
+    admission = Admission(max_connections=2)
+    assert admission.admit("10.0.0.1", 0.0) is None
+    assert admission.admit("10.0.0.2", 0.0) is None
+    assert admission.admit("10.0.0.3", 0.0) == "capacity"
+    admission.release("10.0.0.1")
+    assert admission.admit("10.0.0.3", 0.0) is None
+    assert admission.stats()["rejected_capacity"] == 1
+    assert admission.open == 2
+
+def test_per_ip_limit_is_per_address():
+    admission = Admission(max_per_ip=2)
+    assert admission.admit("10.0.0.1", 0.0) is None
+    assert admission.admit("10.0.0.1", 0.0) is None
+    assert admission.admit("10.0.0.1", 0.0) == "per_ip"
+    assert admission.admit("10.0.0.2", 0.0) is None
+    admission.release("10.0.0.1")
+    admission.release("10.0.0.1")
+    # Entri IP dihapus begitu tidak ada koneksi terbuka
+    assert "10.0.0.1" not in admission.per_ip
+    assert admission.admit("10.0.0.1", 0.0) is None
+    assert admission.rejected["per_ip"] == 1
+
+def test_rate_limit_refills_over_time():
+    admission = Admission(accept_rate=10.0, accept_burst=3)
+    assert [admission.admit("10.0.0.1", 0.0) for _ in range(4)] == [None, None, None, "rate"]
+    # 0.25 detik pada 10/detik = 2.5 token
+    assert admission.admit("10.0.0.1", 0.25) is None
+    assert admission.admit("10.0.0.1", 0.25) is None
+    assert admission.admit("10.0.0.1", 0.25) == "rate"
+    # Token tidak pernah melebihi accept_burst walau lama diam
+    admission.admit("10.0.0.1", 100.0)
+    assert admission.tokens == 2.0
+
+def test_rejected_by_other_limit_keeps_token():
+    admission = Admission(max_per_ip=1, accept_rate=1.0, accept_burst=2)
+    assert admission.admit("10.0.0.1", 0.0) is None
+    assert admission.admit("10.0.0.1", 0.0) == "per_ip"
+    assert admission.admit("10.0.0.2", 0.0) is None
+    assert admission.admit("10.0.0.3", 0.0) == "rate"
+
+def test_expired_logins():
+    admission = Admission(login_timeout=10.0)
+    early, late = object(), object()
+    admission.pending[early] = 0.0
+    admission.pending[late] = 8.0
+    assert admission.expired_logins(5.0) == []
+    assert admission.expired_logins(12.0) == [early]
+    assert list(admission.pending) == [late]
+    assert admission.stats()["login_timeouts"] == 1
+    assert admission.stats()["pending_login"] == 1
+
+def test_login_timeout_disabled():
+    admission = Admission(login_timeout=0)
+    admission.pending[object()] = 0.0
+    assert admission.expired_logins(1e9) == []
+    assert admission.login_timeouts == 0
+
+def test_sweep_interval():
+    assert Admission().sweep_interval == 2.5
+    assert Admission(login_timeout=0).sweep_interval == 5.0
+    assert Admission(login_timeout=60.0, idle_timeout=0).sweep_interval == 5.0
+    assert Admission(login_timeout=10.0, idle_timeout=2.0).sweep_interval == 0.5
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from common.codec import BinaryCodec, JsonCodec, LineTooLong, get_codec, HEADER, MAX_FRAME, TYPE_INPUT, TYPE_JSON
+
+def read_all(codec, data: bytes, limit: int = 2 ** 16):
+    async def run():
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        messages = []
+        while True:
+            message = await codec.read(reader)
+            if message is None:
+                return messages
+            messages.append(message)
+    return asyncio.run(run())
+
+def test_json_round_trip():
+    codec = JsonCodec()
+    payload = {"type": "res_leaderboard", "data": [{"username": "amy", "wpm": 80}], "version": 3}
+    encoded = codec.encode(payload)
+    assert encoded.endswith(b"\n")
+    assert codec.decode(encoded) == payload
+    assert read_all(codec, encoded * 2) == [payload, payload]
+
+# Baris JSON yang melebihi limit StreamReader (max_line admission) menjadi LineTooLong, bukan ValueError mentah.
+def test_json_line_over_limit_raises():
+    codec = JsonCodec()
+    with pytest.raises(LineTooLong):
+        read_all(codec, codec.encode({"type": "input", "text": "x" * 200}), limit=64)
+    assert read_all(codec, codec.encode({"type": "input", "text": "x" * 20}), limit=64) == [{"type": "input", "text": "x" * 20}]
+
+@pytest.mark.parametrize("payload", [
+    {"type": "progress", "progress": 42.5, "wpm": 61},
+    {"type": "opponent_progress", "progress": 100.0, "wpm": 0},
+    {"type": "room_progress", "progress": [12.25, 99.99, 0.0], "wpm": [40, 55, 0]},
+    {"type": "finish", "wpm": 73},
+    {"type": "countdown", "value": 3},
+    {"type": "req_matchmaking"},
+    {"type": "req_leaderboard"},
+    {"type": "cancel_matchmaking"},
+    {"type": "match_found", "players": ["amy", "ben"], "text": "halo dunia"},
+    {"type": "input", "pos": 0, "text": "a"},
+    {"type": "input", "pos": 312, "text": "kopi ☕ panas"},
+    {"type": "input", "pos": 5, "text": ""},
+])
+def test_binary_round_trip(payload):
+    codec = BinaryCodec()
+    assert read_all(codec, codec.encode(payload)) == [payload]
+
+def test_binary_fixed_width_frames_are_small():
+    codec = BinaryCodec()
+    assert len(codec.encode({"type": "progress", "progress": 50, "wpm": 60})) == HEADER.size + 4
+    assert len(codec.encode({"type": "req_matchmaking"})) == HEADER.size
+
+def test_binary_input_frame_is_compact():
+    codec = BinaryCodec()
+    frame = codec.encode({"type": "input", "pos": 41, "text": "k"})
+    assert frame == HEADER.pack(4, TYPE_INPUT) + b"\x00\x29k"
+
+# Input yang tidak muat di frame TYPE_INPUT dikirim utuh sebagai JSON, validasinya tetap di server.
+@pytest.mark.parametrize("payload", [
+    {"type": "input", "pos": 70000, "text": "a"},
+    {"type": "input", "pos": -1, "text": "a"},
+    {"type": "input", "pos": "3", "text": "a"},
+    {"type": "input", "pos": 3, "text": None},
+    {"type": "input", "pos": 3, "text": "a", "seq": 9},
+])
+def test_binary_unusual_input_falls_back_to_json(payload):
+    codec = BinaryCodec()
+    assert codec.encode(payload)[HEADER.size - 1] == TYPE_JSON
+    assert read_all(codec, codec.encode(payload)) == [payload]
+
+def test_binary_clamps_out_of_range_values():
+    codec = BinaryCodec()
+    frame = codec.encode({"type": "progress", "progress": 1000, "wpm": -5})
+    assert read_all(codec, frame) == [{"type": "progress", "progress": 655.35, "wpm": 0}]
+
+def test_binary_request_with_extra_fields_falls_back_to_json():
+    codec = BinaryCodec()
+    payload = {"type": "req_leaderboard", "version": 7}
+    assert read_all(codec, codec.encode(payload)) == [payload]
+
+def test_binary_rejects_oversized_and_invalid_frames():
+    codec = BinaryCodec()
+    with pytest.raises(ValueError):
+        codec.encode({"type": "chat", "text": "x" * MAX_FRAME})
+    with pytest.raises(ValueError):
+        read_all(codec, HEADER.pack(0, 0))
+    with pytest.raises(ValueError):
+        read_all(codec, HEADER.pack(2, 0x7E) + b"\x00")
+    with pytest.raises(ValueError):
+        read_all(codec, HEADER.pack(2, TYPE_INPUT) + b"\x00")
+    with pytest.raises(ValueError):
+        read_all(codec, HEADER.pack(4, TYPE_INPUT) + b"\x00\x01\xff")
+
+def test_binary_truncated_frame_reads_as_closed():
+    codec = BinaryCodec()
+    frame = codec.encode({"type": "finish", "wpm": 90})
+    assert read_all(codec, frame[:-1]) == []
+
+def test_get_codec_falls_back_to_json():
+    assert get_codec("binary").name == "binary"
+    assert get_codec(None).name == "json"
+    assert get_codec("msgpack").name == "json"
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from services.corpus import BUILTIN_TEXTS, Corpus, compile_corpus, read_passages
+from services.typing_engine import TargetText
+
+PASSAGES = [
+    "the cat sat on the mat",
+    "Quick, Brown Foxes (2024) jump over 17 lazy dogs!",
+    "kopi susu gula aren",
+    "Naïve café owners serve crème brûlée daily",
+    "sun and sea",
+    "Extraordinarily complicated vocabulary demonstrates typing proficiency",
+]
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "korpus.bin"
+    count, per_tier = compile_corpus(PASSAGES, str(path), tiers=3)
+    assert count == len(PASSAGES) and sum(per_tier) == count
+    corpus = Corpus(str(path), cache_size=2)
+    yield corpus
+    corpus.close()
+
+def test_all_texts_survive_compilation(corpus):
+    assert len(corpus) == len(PASSAGES)
+    assert sorted(corpus.text(i) for i in range(len(corpus))) == sorted(PASSAGES)
+
+def test_tiers_are_contiguous_and_ordered_by_difficulty(corpus):
+    start = 0
+    for tier_start, count in corpus.tiers:
+        assert tier_start == start
+        start += count
+    assert start == len(corpus)
+    difficulties = [corpus.difficulty(i) for i in range(len(corpus))]
+    assert difficulties == sorted(difficulties)
+
+def test_pick_stays_inside_tier(corpus):
+    rng = random.Random(1)
+    for tier, (start, count) in enumerate(corpus.tiers):
+        for _ in range(20):
+            assert start <= corpus.pick(tier, rng) < start + count
+    assert 0 <= corpus.pick(None, rng) < len(corpus)
+
+def test_target_matches_target_text_built_from_scratch(corpus):
+    for i in range(len(corpus)):
+        target = corpus.target(i)
+        expected = TargetText(corpus.text(i))
+        assert target.text == expected.text and target.length == expected.length
+        assert list(target.counted) == list(expected.counted)
+    assert len(corpus.cache) == 2
+
+def test_read_passages_normalizes_whitespace(tmp_path):
+    path = tmp_path / "teks.txt"
+    path.write_text("  satu   dua\n\n\t\ntiga\tempat  \n", encoding="utf-8")
+    assert list(read_passages([str(path)])) == ["satu dua", "tiga empat"]
+
+def test_builtin_texts_compile(tmp_path):
+    path = tmp_path / "bawaan.bin"
+    count, _ = compile_corpus((" ".join(text.split()) for text in BUILTIN_TEXTS), str(path))
+    assert count == len(BUILTIN_TEXTS)
+
+def test_rejects_file_that_is_not_a_corpus(tmp_path):
+    path = tmp_path / "bukan.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        Corpus(str(path))
@@ -0,0 +1,94 @@
+from common.codec import BinaryCodec, JsonCodec
+from services.leaderboard_cache import LeaderboardCache
+
+def make_cache(size=3):
+    cache = LeaderboardCache(size)
+    cache.rebuild([("amy", 90), ("ben", 80), ("cal", 70), ("dan", 60)])
+    return cache
+
+def test_top_is_sorted_by_wpm_then_username():
+    cache = LeaderboardCache(3)
+    cache.rebuild([("ben", 80), ("amy", 80), ("cal", 95), (None, 100), ("dan", None)])
+    assert cache.top(3) == [{"username": "cal", "wpm": 95}, {"username": "amy", "wpm": 80}, {"username": "ben", "wpm": 80}]
+
+def test_record_only_keeps_personal_best():
+    cache = make_cache()
+    assert cache.record("ben", 75) is False
+    assert cache.record("ben", 95) is True
+    assert cache.best["ben"] == 95
+    assert [entry["username"] for entry in cache.top(4)] == ["ben", "amy", "cal", "dan"]
+    assert len(cache.ranking) == 4
+
+def test_top_is_memoized_until_a_change():
+    cache = make_cache()
+    first = cache.top(3)
+    hits = cache.stats()["hits"]
+    assert cache.top(3) is first
+    assert cache.stats()["hits"] == hits + 1
+    cache.record("eve", 100)
+    assert cache.top(3) is not first
+
+def test_encoded_reply_is_shared_per_codec_and_version():
+    cache = make_cache()
+    json_codec, binary_codec = JsonCodec(), BinaryCodec()
+    encoded = cache.encoded(json_codec)
+    assert cache.encoded(json_codec) is encoded
+    assert json_codec.decode(encoded) == {"type": "res_leaderboard", "data": cache.top(3), "version": cache.version}
+    assert cache.encoded(binary_codec) != encoded
+    cache.record("eve", 100)
+    assert json_codec.decode(cache.encoded(json_codec))["data"][0] == {"username": "eve", "wpm": 100}
+
+# Menerapkan leaderboard_update ke daftar milik client, seperti updateLeaderboard() di app.js.
+# Mengembalikan None jika base bukan versi client (client harus meminta daftar penuh).
+def apply_delta(client_version, entries, delta):
+    if delta["base"] != client_version:
+        return None
+    removed = set(delta["removed"])
+    entries = [entry for entry in entries if entry["username"] not in removed]
+    for item in delta["inserted"]:
+        entries.insert(item["rank"] - 1, {"username": item["username"], "wpm": item["wpm"]})
+    return entries
+
+def test_version_only_moves_when_top_n_changes():
+    cache = make_cache()
+    version = cache.version
+    cache.record("dan", 65)
+    assert cache.version == version
+    delta = cache.delta()
+    assert delta["base"] == delta["version"] == version
+    assert delta["removed"] == delta["inserted"] == []
+    cache.record("dan", 85)
+    assert cache.version == version + 1
+
+def test_delta_rebuilds_client_list():
+    cache = make_cache()
+    version, entries = cache.version, list(cache.top(3))
+    cache.record("eve", 85)
+    cache.record("amy", 99)
+    delta = cache.delta()
+    assert delta["removed"] == ["amy", "cal"]
+    assert delta["inserted"] == [{"rank": 1, "username": "amy", "wpm": 99}, {"rank": 2, "username": "eve", "wpm": 85}]
+    assert apply_delta(version, entries, delta) == cache.top(3)
+
+def test_client_on_older_version_must_refetch():
+    cache = make_cache()
+    stale_version, stale_entries = cache.version, list(cache.top(3))
+    cache.record("eve", 85)
+    cache.delta()
+    cache.record("fay", 95)
+    delta = cache.delta()
+    assert delta["base"] != stale_version
+    assert apply_delta(stale_version, stale_entries, delta) is None
+
+def test_chained_deltas_stay_consistent():
+    cache = LeaderboardCache(5)
+    cache.rebuild([])
+    version, entries = cache.version, []
+    for i, wpm in enumerate((40, 70, 55, 90, 65, 80, 100, 45, 75)):
+        cache.record(f"p{i % 6}", wpm)
+        delta = cache.delta()
+        if delta["base"] == delta["version"]:
+            continue
+        entries = apply_delta(version, entries, delta)
+        version = delta["version"]
+        assert entries == cache.top(5)
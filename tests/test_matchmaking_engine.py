@@ -0,0 +1,61 @@
+from services.matchmaking_engine import MatchmakingEngine, RatingBook
+
+def test_rating_book_default_and_moving_average():
+    book = RatingBook(default_rating=40.0, alpha=0.5)
+    assert book.get("amy") == 40.0
+    book.update("amy", 80)
+    assert book.get("amy") == 80.0
+    book.update("amy", 40)
+    assert book.get("amy") == 60.0
+    book.update(None, 100)
+    assert None not in book.ratings
+
+def test_find_picks_closest_rating_within_window():
+    engine = MatchmakingEngine(base_window=10.0, widen_per_second=5.0)
+    engine.add("slow", 20, now=0.0)
+    engine.add("close", 52, now=0.0)
+    engine.add("far", 95, now=0.0)
+    assert engine.find(50, now=0.0) == "close"
+    assert engine.find(75, now=0.0) is None
+
+def test_window_widens_with_waiting_time():
+    engine = MatchmakingEngine(base_window=10.0, widen_per_second=5.0)
+    engine.add("amy", 30, now=0.0)
+    assert engine.find(60, now=0.0) is None
+    # Setelah 4 detik jendela amy 30 WPM, cukup untuk selisih 30
+    assert engine.find(60, now=4.0) == "amy"
+
+def test_find_group_sorted_by_gap_and_excludes_self():
+    engine = MatchmakingEngine(base_window=50.0)
+    for name, rating in (("a", 40), ("b", 48), ("c", 55), ("d", 44)):
+        engine.add(name, rating, now=0.0)
+    assert engine.find_group(45, now=0.0, count=3, exclude="d") == ["b", "a", "c"]
+
+def test_remove_cleans_up_buckets():
+    engine = MatchmakingEngine()
+    engine.add("amy", 30, now=0.0)
+    engine.add("ben", 35, now=0.0)
+    assert engine.remove("amy") is True
+    assert engine.remove("amy") is False
+    assert engine.remove("ben") is True
+    assert len(engine) == 0
+    assert engine.buckets == {}
+    assert engine.bucket_keys == []
+    assert list(engine.arrivals) == []
+
+def test_sweep_pairs_players_once_windows_overlap():
+    engine = MatchmakingEngine(base_window=10.0, widen_per_second=5.0)
+    engine.add("amy", 30, now=0.0)
+    engine.add("ben", 70, now=0.0)
+    assert engine.sweep(now=1.0) == []
+    groups = engine.sweep(now=6.0)
+    assert [sorted(group) for group in groups] == [["amy", "ben"]]
+    assert len(engine) == 0
+
+def test_sweep_fills_partial_room_after_waiting():
+    engine = MatchmakingEngine(base_window=100.0)
+    engine.add("amy", 50, now=0.0)
+    engine.add("ben", 55, now=0.0)
+    assert engine.sweep(now=1.0, size=4, min_size=2, fill_after=10.0) == []
+    groups = engine.sweep(now=11.0, size=4, min_size=2, fill_after=10.0)
+    assert [sorted(group) for group in groups] == [["amy", "ben"]]
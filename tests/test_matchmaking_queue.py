@@ -0,0 +1,22 @@
+from services.matchmaking_queue import MatchQueue
+
+def test_fifo_order_and_duplicates():
+    queue = MatchQueue()
+    for player in ("amy", "ben", "amy", "cal"):
+        queue.push(player)
+    assert list(queue) == ["amy", "ben", "cal"]
+    assert queue.popleft() == "amy"
+    assert queue.popleft() == "ben"
+    assert len(queue) == 1
+
+def test_discard_reports_membership():
+    queue = MatchQueue()
+    queue.push("amy")
+    queue.push("ben")
+    assert queue.discard("amy") is True
+    assert queue.discard("amy") is False
+    assert "amy" not in queue
+    assert list(queue) == ["ben"]
+
+def test_popleft_on_empty_queue():
+    assert MatchQueue().popleft() is None
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from common.mux import DISCONNECT, MuxStream, decode_frame, encode_frame
+
+# Pengganti MuxLink: cukup menyimpan stream terdaftar dan frame yang ditulis.
+class FakeLink:
+
+    def __init__(self):
+        self.streams = {}
+        self.written = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+def open_stream(link, cid=7, max_pending=1024):
+    stream = MuxStream(link, cid, max_pending)
+    link.streams[cid] = stream
+    return stream
+
+def test_frame_round_trip():
+    frame = encode_frame(12, b'{"type": "login"}\n')
+    assert frame == b'12 {"type": "login"}\n'
+    assert decode_frame(frame) == (12, b'{"type": "login"}\n')
+
+def test_decode_frame_rejects_missing_channel_id():
+    with pytest.raises(ValueError):
+        decode_frame(b'{"type": "login"}\n')
+
+def test_send_prefixes_channel_id():
+    link = FakeLink()
+    stream = open_stream(link)
+    stream.send({"type": "req_matchmaking"})
+    stream.send_text('{"type":"input","pos":0,"text":"a"}')
+    assert link.written == [b'7 {"type": "req_matchmaking"}\n', b'7 {"type":"input","pos":0,"text":"a"}\n']
+
+def test_recv_many_batches_and_keeps_close_marker():
+    async def scenario():
+        stream = open_stream(FakeLink())
+        for text in ("a", "b", None):
+            stream.feed(text)
+        return await stream.recv_many(), await stream.recv_many()
+    assert asyncio.run(scenario()) == (["a", "b"], None)
+
+def test_slow_stream_is_closed_when_over_max_pending():
+    async def scenario():
+        link = FakeLink()
+        stream = open_stream(link, max_pending=2)
+        for text in ("a", "b", "c"):
+            stream.feed(text)
+        return link, stream, await stream.recv_many(), await stream.recv()
+    link, stream, lines, marker = asyncio.run(scenario())
+    assert stream.closed and 7 not in link.streams
+    assert link.written == [encode_frame(7, DISCONNECT)]
+    assert lines == ["a", "b"] and marker is None
+
+def test_close_notifies_server_once():
+    async def scenario():
+        link = FakeLink()
+        stream = open_stream(link)
+        stream.close()
+        stream.close()
+        stream.send({"type": "req_leaderboard"})
+        return link, await stream.recv()
+    link, marker = asyncio.run(scenario())
+    assert link.written == [encode_frame(7, DISCONNECT)] and link.streams == {}
+    assert marker is None
@@ -0,0 +1,140 @@
+import asyncio
+
+from services.outbound import COALESCE, NEVER_DROP, OutboundQueue, OutboundStats
+
+# Pengganti StreamWriter: write() dicatat, drain() menunggu sampai client "membaca" (blocked = False).
+class FakeWriter:
+
+    def __init__(self, blocked=False):
+        self.written = []
+        self.blocked = blocked
+        self.buffered = 0
+        self.closed = False
+        self.aborted = False
+        self.readable = asyncio.Event()
+        if not blocked:
+            self.readable.set()
+
+    @property
+    def transport(self):
+        return self
+
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+        if self.blocked:
+            self.buffered += len(data)
+
+    async def drain(self) -> None:
+        await self.readable.wait()
+
+    def unblock(self) -> None:
+        self.blocked = False
+        self.buffered = 0
+        self.readable.set()
+
+    def is_closing(self) -> bool:
+        return self.closed or self.aborted
+
+    def close(self) -> None:
+        self.closed = True
+
+    def abort(self) -> None:
+        self.aborted = True
+
+    def get_extra_info(self, name, default=None):
+        return ("127.0.0.1", 4000) if name == "peername" else default
+
+POLICIES = {"room_progress": COALESCE, "game_over": NEVER_DROP}
+
+def test_messages_are_written_in_order():
+    async def scenario():
+        writer, stats = FakeWriter(), OutboundStats()
+        queue = OutboundQueue(writer, stats, POLICIES)
+        for data in (b"a", b"b", b"c"):
+            queue.push(data, "chat")
+        await queue.close()
+        return writer, stats
+    writer, stats = asyncio.run(scenario())
+    assert writer.written == [b"a", b"b", b"c"]
+    assert stats.enqueued == stats.sent == 3
+
+def test_coalesce_keeps_only_latest_while_blocked():
+    async def scenario():
+        writer, stats = FakeWriter(blocked=True), OutboundStats()
+        queue = OutboundQueue(writer, stats, POLICIES)
+        queue.push(b"first", "room_progress")
+        await asyncio.sleep(0)
+        # Penulis sekarang menunggu drain; pesan berikut mengantre
+        for i in range(5):
+            queue.push(b"p%d" % i, "room_progress")
+        queue.push(b"chat", "chat")
+        assert queue.queued_bytes == len(b"p4") + len(b"chat")
+        writer.unblock()
+        await queue.close()
+        return writer, stats
+    writer, stats = asyncio.run(scenario())
+    assert writer.written == [b"first", b"p4", b"chat"]
+    assert stats.coalesced == 4
+    assert stats.sent == 3
+
+def test_slow_client_is_evicted_without_new_pushes():
+    async def scenario():
+        writer, stats = FakeWriter(blocked=True), OutboundStats()
+        queue = OutboundQueue(writer, stats, POLICIES, max_messages=2, high_water=10, evict_after=0.1)
+        queue.push(b"x" * 64, "chat")
+        await asyncio.sleep(0.5)
+        return writer, stats, queue
+    writer, stats, queue = asyncio.run(scenario())
+    assert queue.evicted and writer.aborted
+    assert stats.evicted == 1
+
+def test_never_drop_not_counted_toward_limit():
+    async def scenario():
+        writer = FakeWriter(blocked=True)
+        queue = OutboundQueue(writer, OutboundStats(), POLICIES, max_messages=2, evict_after=0.0)
+        queue.push(b"start", "chat")
+        await asyncio.sleep(0)
+        for i in range(4):
+            queue.push(b"over%d" % i, "game_over")
+        await asyncio.sleep(0.05)
+        return queue
+    queue = asyncio.run(scenario())
+    assert queue.over_since is None and not queue.evicted
+
+def test_eviction_writes_never_drop_before_abort():
+    async def scenario():
+        writer, stats = FakeWriter(blocked=True), OutboundStats()
+        queue = OutboundQueue(writer, stats, POLICIES, max_messages=1, evict_after=0.05, evict_grace=0.5)
+        queue.push(b"start", "chat")
+        await asyncio.sleep(0)
+        queue.push(b"c1", "chat")
+        queue.push(b"game_over", "game_over")
+        queue.push(b"c2", "chat")
+        await asyncio.sleep(0.2)
+        # Batas terlewati: pesan biasa dibuang, game_over tetap ditulis lalu transport ditutup
+        assert queue.evicted and writer.closed and not writer.aborted
+        await asyncio.sleep(0.5)
+        return writer, stats
+    writer, stats = asyncio.run(scenario())
+    assert writer.written == [b"start", b"game_over"]
+    assert writer.aborted
+    assert stats.evicted == 1
+
+def test_close_flushes_remaining_messages():
+    async def scenario():
+        writer = FakeWriter(blocked=True)
+        queue = OutboundQueue(writer, OutboundStats(), POLICIES)
+        queue.push(b"a", "chat")
+        await asyncio.sleep(0)
+        queue.push(b"game_over", "game_over")
+        closing = asyncio.ensure_future(queue.close())
+        await asyncio.sleep(0.01)
+        writer.unblock()
+        await closing
+        return writer, queue
+    writer, queue = asyncio.run(scenario())
+    assert writer.written == [b"a", b"game_over"]
+    assert queue._task.done()
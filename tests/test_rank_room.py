@@ -0,0 +1,88 @@
+from controllers.game_controller import GameController, Room
+from services.session import Session
+from services.typing_engine import TargetText
+
+# 20 kata dipisah spasi: 99 karakter
+TEXT = " ".join(["kata"] * 20)
+
+def make_room(names, progress=None, typing_mode="client"):
+    controller = GameController(session_factory=None)
+    controller.typing_mode = typing_mode
+    players = []
+    for sid, name in enumerate(names):
+        session = Session(sid, None, None)
+        session.username = name
+        players.append(session)
+    room = Room(1, players, list(names), TargetText(TEXT))
+    if progress is not None:
+        room.progress = list(progress)
+    return controller, room
+
+def ranks(room, standings):
+    return [(room.names[seat], rank) for seat, _, _, rank in standings]
+
+def test_finisher_is_first_and_wins():
+    controller, room = make_room(["amy", "ben", "cal"], [100.0, 40.0, 90.0])
+    standings = controller._rank_room(room, elapsed=60.0, finisher=1)
+    assert ranks(room, standings) == [("ben", 1), ("amy", 2), ("cal", 3)]
+    # Finisher dihitung mengetik seluruh teks: 99 karakter / 5 dalam 1 menit
+    assert standings[0][1] == 100.0 and standings[0][2] == 20
+    assert room.winner == "ben"
+
+def test_timeout_winner_is_highest_progress():
+    controller, room = make_room(["amy", "ben", "cal"], [30.0, 75.0, 50.0])
+    standings = controller._rank_room(room, elapsed=90.0)
+    assert ranks(room, standings) == [("ben", 1), ("cal", 2), ("amy", 3)]
+    assert room.winner == "ben"
+
+def test_ties_share_rank_and_keep_seat_order():
+    controller, room = make_room(["amy", "ben", "cal", "dan"], [50.0, 80.0, 80.0, 50.0])
+    standings = controller._rank_room(room, elapsed=90.0)
+    assert ranks(room, standings) == [("ben", 1), ("cal", 1), ("amy", 3), ("dan", 3)]
+    # Seri di peringkat pertama: tidak ada pemenang (draw)
+    assert room.winner is None
+
+def test_finisher_not_tied_with_player_at_same_progress():
+    controller, room = make_room(["amy", "ben"], [100.0, 0.0])
+    standings = controller._rank_room(room, elapsed=30.0, finisher=1)
+    assert ranks(room, standings) == [("ben", 1), ("amy", 2)]
+    assert room.winner == "ben"
+
+def test_players_who_left_are_excluded():
+    controller, room = make_room(["amy", "ben", "cal"], [90.0, 60.0, 30.0])
+    room.leave(room.players[0])
+    standings = controller._rank_room(room, elapsed=90.0)
+    assert ranks(room, standings) == [("ben", 1), ("cal", 2)]
+    assert room.winner == "ben"
+    assert "amy" not in controller.ratings.ratings
+
+def test_last_player_standing_wins_on_timeout():
+    controller, room = make_room(["amy", "ben"], [10.0, 0.0])
+    room.leave(room.players[0])
+    standings = controller._rank_room(room, elapsed=90.0)
+    assert ranks(room, standings) == [("ben", 1)]
+    assert room.winner == "ben"
+
+def test_empty_room_has_no_winner():
+    controller, room = make_room(["amy", "ben"])
+    for player in list(room.players):
+        room.leave(player)
+    assert controller._rank_room(room, elapsed=90.0) == []
+    assert room.winner is None
+
+def test_client_mode_wpm_from_reported_progress():
+    controller, room = make_room(["amy", "ben"], [50.0, 0.0])
+    standings = controller._rank_room(room, elapsed=60.0)
+    # int(0.5 * 99) = 49 karakter -> 9.8 kata per menit
+    assert [(seat, wpm) for seat, _, wpm, _ in standings] == [(0, 10), (1, 0)]
+    assert controller.ratings.get("amy") == 10
+    assert controller.ratings.get("ben") == 0
+
+def test_server_mode_wpm_from_validated_input():
+    # Progress kiriman client (90%) diabaikan; yang dihitung karakter benar hasil validasi (5 kata = 25 karakter)
+    controller, room = make_room(["amy", "ben"], [90.0, 0.0], typing_mode="server")
+    assert room.typing[0].apply(room.target, 0, TEXT[:25])
+    assert room.typing[1].apply(room.target, 0, "kata kota")
+    standings = controller._rank_room(room, elapsed=60.0)
+    assert [(seat, wpm) for seat, _, wpm, _ in standings] == [(0, 5), (1, 1)]
+    assert controller.ratings.get("amy") == 5
@@ -0,0 +1,105 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from extensions import Base
+from models.score import Score
+from models.user_best import UserBest
+from services.score_writer import ScoreWriter
+
+# Database SQLite di memori; StaticPool agar semua session memakai koneksi (dan isi database) yang sama.
+async def open_database():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+async def read_rows(factory):
+    async with factory() as session:
+        scores = (await session.execute(select(Score.username, Score.wpm).order_by(Score.id))).all()
+        best = (await session.execute(select(UserBest.username, UserBest.best_wpm).order_by(UserBest.username))).all()
+    return [tuple(row) for row in scores], dict(best)
+
+# Session factory yang gagal pada `failures` pemanggilan pertama, seperti database yang sedang terkunci.
+class FlakyFactory:
+
+    def __init__(self, factory, failures):
+        self.factory = factory
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("database is locked")
+        return self.factory()
+
+def run_writer(scores, factory_wrapper=None, **options):
+    async def scenario():
+        engine, factory = await open_database()
+        writer = ScoreWriter(factory_wrapper(factory) if factory_wrapper else factory, **options)
+        writer.start()
+        for username, wpm in scores:
+            await writer.submit(username, wpm)
+        await writer.close()
+        rows = await read_rows(factory)
+        await engine.dispose()
+        return writer, rows
+    return asyncio.run(scenario())
+
+def test_submits_are_grouped_into_one_commit():
+    scores = [("amy", 60), ("ben", 70), ("amy", 80), ("cal", 50), ("amy", 75)]
+    writer, (rows, best) = run_writer(scores, flush_interval=0.2)
+    assert writer.commits == 1
+    assert writer.written == 5
+    assert rows == scores
+    assert best == {"amy": 80, "ben": 70, "cal": 50}
+
+def test_user_best_only_moves_up_across_batches():
+    async def scenario():
+        engine, factory = await open_database()
+        writer = ScoreWriter(factory, flush_interval=0.01)
+        writer.start()
+        for wpm in (70, 50, 90, 60):
+            await writer.submit("amy", wpm)
+            await asyncio.sleep(0.05)
+        await writer.close()
+        rows = await read_rows(factory)
+        await engine.dispose()
+        return writer, rows
+    writer, (rows, best) = asyncio.run(scenario())
+    assert writer.commits == 4
+    assert len(rows) == 4
+    assert best == {"amy": 90}
+
+def test_failed_batch_is_retried_not_lost():
+    flaky = {}
+    def wrap(factory):
+        flaky["factory"] = FlakyFactory(factory, failures=2)
+        return flaky["factory"]
+    writer, (rows, best) = run_writer([("amy", 60), ("ben", 70)], wrap, flush_interval=0.05, retry_delay=0.01)
+    assert flaky["factory"].calls == 3
+    assert writer.retries == 2
+    assert writer.failed == 0
+    assert writer.written == 2 and writer.commits == 1
+    assert rows == [("amy", 60), ("ben", 70)]
+
+def test_batch_dropped_after_max_retries():
+    writer, (rows, best) = run_writer([("amy", 60)], lambda f: FlakyFactory(f, failures=10),
+                                      max_retries=2, retry_delay=0.01)
+    assert writer.retries == 2
+    assert writer.failed == 1
+    assert writer.written == 0
+    assert rows == [] and best == {}
+
+def test_close_flushes_everything_queued():
+    # flush_interval panjang: tanpa penanda close, batch terakhir baru ditulis 10 detik kemudian
+    scores = [(f"p{i}", 40 + i) for i in range(7)]
+    writer, (rows, best) = run_writer(scores, max_batch=3, flush_interval=10.0)
+    assert writer.written == 7
+    assert writer.commits == 3
+    assert rows == scores
+    assert writer.stats()["queued"] == 0
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+from services.timer_wheel import TimerWheel
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_timer_fires_on_first_tick_after_delay():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(tick=0.01)
+        wheel.start()
+        fired = []
+        started = loop.time()
+        wheel.schedule(0.05, lambda: fired.append(loop.time() - started))
+        await asyncio.sleep(0.03)
+        assert fired == []
+        await asyncio.sleep(0.1)
+        await wheel.close()
+        return fired, wheel.stats()
+    fired, stats = run(scenario())
+    assert len(fired) == 1 and fired[0] >= 0.05
+    assert stats["fired"] == 1 and stats["pending"] == 0
+
+def test_cancelled_timer_never_fires():
+    async def scenario():
+        wheel = TimerWheel(tick=0.01)
+        wheel.start()
+        fired = []
+        timer = wheel.schedule(0.03, fired.append, "batal")
+        wheel.schedule(0.03, fired.append, "jalan")
+        assert wheel.cancel(timer) is True
+        assert wheel.cancel(timer) is False
+        await asyncio.sleep(0.08)
+        await wheel.close()
+        return fired, wheel.stats()
+    fired, stats = run(scenario())
+    assert fired == ["jalan"]
+    assert stats["cancelled"] == 1 and stats["pending"] == 0
+
+def test_timers_beyond_one_rotation_wait_their_turn():
+    async def scenario():
+        wheel = TimerWheel(tick=0.01, slots=4)
+        wheel.start()
+        fired = []
+        wheel.schedule(0.01, fired.append, "dekat")
+        wheel.schedule(0.09, fired.append, "jauh")
+        await asyncio.sleep(0.05)
+        early = list(fired)
+        await asyncio.sleep(0.08)
+        await wheel.close()
+        return early, fired
+    early, fired = run(scenario())
+    assert early == ["dekat"]
+    assert fired == ["dekat", "jauh"]
+
+def test_coroutine_callback_is_tracked_and_errors_are_logged(caplog):
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def finish(done):
+        await asyncio.sleep(0.2)
+        done.append(True)
+
+    async def scenario():
+        wheel = TimerWheel(tick=0.01)
+        wheel.start()
+        done = []
+        wheel.schedule(0.01, fail)
+        wheel.schedule(0.01, finish, done)
+        await asyncio.sleep(0.04)
+        running = wheel.stats()["running"]
+        # close() menunggu callback coroutine yang masih berjalan
+        await wheel.close()
+        return running, done, wheel.stats()["running"]
+
+    with caplog.at_level(logging.ERROR):
+        running, done, remaining = run(scenario())
+    assert running == 1
+    assert done == [True] and remaining == 0
+    assert any("boom" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,74 @@
+import pytest
+
+from services.typing_engine import MAX_DELTA, MAX_OVERRUN, TargetText, TypingState
+
+TEXT = "the quick fox"
+
+def type_all(state, target, value, start=0):
+    for i, char in enumerate(value, start):
+        assert state.apply(target, i, char)
+
+def test_counted_rounds_down_to_word_boundary():
+    target = TargetText(TEXT)
+    assert target.length == len(TEXT)
+    assert target.counted[2] == 0        # "th": kata pertama belum selesai
+    assert target.counted[3] == 3        # "the"
+    assert target.counted[4] == 4        # "the "
+    assert target.counted[8] == 4        # "the quic"
+    assert target.counted[len(TEXT)] == len(TEXT)
+
+def test_correct_typing_reaches_finish():
+    target = TargetText(TEXT)
+    state = TypingState()
+    type_all(state, target, TEXT)
+    assert state.correct == state.length == target.length
+    assert state.finished(target)
+    assert state.progress(target) == 100.0
+    assert state.keystrokes == len(TEXT)
+
+def test_characters_after_a_typo_are_not_counted_until_fixed():
+    target = TargetText(TEXT)
+    state = TypingState()
+    type_all(state, target, "the qx")
+    type_all(state, target, "ick", start=6)
+    assert state.correct == 5 and state.length == 9
+    assert state.counted(target) == 4
+    # Backspace ke posisi salah (text kosong), lalu ketik ulang dengan benar
+    assert state.apply(target, 5, "")
+    type_all(state, target, "uick fox", start=5)
+    assert state.finished(target)
+
+def test_word_followed_by_wrong_character_is_not_counted():
+    target = TargetText(TEXT)
+    state = TypingState()
+    type_all(state, target, "the#")
+    assert state.correct == 3
+    assert state.counted(target) == 0
+
+def test_multi_character_delta_matches_partially():
+    target = TargetText(TEXT)
+    state = TypingState()
+    assert state.apply(target, 0, "the quack")
+    assert state.correct == 6 and state.length == 9
+    assert state.apply(target, 6, "ick")
+    assert state.correct == 9
+
+@pytest.mark.parametrize("pos, text", [
+    (1, "t"),                                # lompat melewati panjang input
+    (-1, "t"),
+    ("0", "t"),
+    (0, b"t"),
+    (0, "x" * (MAX_DELTA + 1)),
+])
+def test_invalid_deltas_are_rejected(pos, text):
+    target = TargetText(TEXT)
+    state = TypingState()
+    assert not state.apply(target, pos, text)
+    assert state.length == 0 and state.keystrokes == 0
+
+def test_input_may_not_overrun_target_too_far():
+    target = TargetText("ab")
+    state = TypingState()
+    assert state.apply(target, 0, "ab" + "x" * MAX_OVERRUN)
+    assert not state.apply(target, state.length, "x")
+    assert not state.finished(target)